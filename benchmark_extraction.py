@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import yaml
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "literature_autopilot", ".env"))
+
+from literature_autopilot.extractor import SLRExtractor
+
+def run_mode(mode, pdf_paths, config):
+    """Extracts every PDF in the given mode and returns per-paper results plus usage totals."""
+    extractor = SLRExtractor(
+        model_name=config["extraction"]["model"],
+        prescreening_prompt_path=config.get("prompts", {}).get("prescreening"),
+        extraction_prompt_path=config.get("prompts", {}).get("extraction"),
+        pdf_mode=config["extraction"].get("pdf_mode", "upload"),
+        extraction_mode=mode
+    )
+    results = {}
+    start = time.time()
+    for path in pdf_paths:
+        results[path] = extractor.process_paper(path)
+    usage = dict(extractor.usage, wall_seconds=time.time() - start)
+    return results, usage
+
+def compare(staged, fused):
+    """Per-paper agreement between the two modes."""
+    rows = []
+    for path, staged_result in staged.items():
+        fused_result = fused.get(path, {})
+        rows.append({
+            "pdf": os.path.basename(path),
+            "same_decision": staged_result.get("screening_decision") == fused_result.get("screening_decision"),
+            "same_amstar_score": (staged_result.get("amstar_2_assessment") or {}).get("overall_score")
+                                 == (fused_result.get("amstar_2_assessment") or {}).get("overall_score"),
+            "field_agreement": round(SLRExtractor.field_agreement(staged_result, fused_result), 3),
+        })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare staged vs. fused extraction (tokens, latency, agreement)")
+    parser.add_argument("pdfs", nargs="*", help="PDFs to extract (default: a sample from pdfs/store)")
+    parser.add_argument("--config", type=str, default="literature_autopilot/config.yaml")
+    parser.add_argument("--limit", type=int, default=5, help="Sample size when no PDFs are given")
+    parser.add_argument("--output", type=str, default="benchmark_extraction.json")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        config = yaml.safe_load(f)
+
+    pdf_paths = args.pdfs or sorted(glob.glob(os.path.join("pdfs", "store", "*.pdf")))[:args.limit]
+    if not pdf_paths:
+        print("No PDFs found. Run the download step first or pass PDF paths.")
+        sys.exit(1)
+
+    print(f"Benchmarking {len(pdf_paths)} PDFs...")
+    staged, staged_usage = run_mode("staged", pdf_paths, config)
+    fused, fused_usage = run_mode("fused", pdf_paths, config)
+    rows = compare(staged, fused)
+
+    print(f"\n{'Mode':<8} {'Calls':>6} {'Prompt tok':>11} {'Output tok':>11} {'Seconds':>8}")
+    for mode, usage in [("staged", staged_usage), ("fused", fused_usage)]:
+        print(f"{mode:<8} {usage['calls']:>6} {usage['prompt_tokens']:>11} {usage['output_tokens']:>11} {usage['wall_seconds']:>8.1f}")
+
+    print("\nAgreement (fused vs. staged):")
+    for row in rows:
+        print(f"  {row['pdf'][:40]:<40} decision={row['same_decision']} amstar={row['same_amstar_score']} fields={row['field_agreement']:.0%}")
+    if rows:
+        mean = sum(r["field_agreement"] for r in rows) / len(rows)
+        print(f"  Mean field agreement: {mean:.0%}")
+
+    with open(args.output, "w") as f:
+        json.dump({"staged": staged_usage, "fused": fused_usage, "papers": rows}, f, indent=2)
+    print(f"\nSaved report to {args.output}")
+
+if __name__ == "__main__":
+    main()
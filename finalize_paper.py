@@ -1,32 +1,23 @@
 import json
 import os
 
-import requests
+from literature_autopilot.venue_normalizer import VenueNormalizer
+
+_venues = None
+
+def get_venue_normalizer():
+    """Shared, disk-cached venue lookups (same cache as the pipeline's PaperWriter)."""
+    global _venues
+    if _venues is None:
+        _venues = VenueNormalizer()
+    return _venues
 
 def get_official_venue(title):
     """
     Attempts to find the official publication venue (e.g. 'NeurIPS 2024') 
     using Semantic Scholar, to replace 'ArXiv' citations.
     """
-    try:
-        url = "https://api.semanticscholar.org/graph/v1/paper/search"
-        params = {"query": title, "limit": 1, "fields": "venue,year,publicationVenue"}
-        
-        response = requests.get(url, params=params, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("data"):
-                paper = data["data"][0]
-                # Prefer full venue name
-                venue = paper.get("publicationVenue", {}).get("name")
-                if not venue:
-                    venue = paper.get("venue")
-                
-                if venue and venue.lower() != "arxiv":
-                    return f"{venue}"
-    except Exception:
-        pass
-    return None
+    return get_venue_normalizer().lookup(title)
 
 def generate_apa_citation(paper_data):
     """Generates an APA citation string from paper data."""
@@ -90,6 +81,11 @@ def main():
         data = json.load(f)
         
     print(f"Generating bibliography for {len(data)} papers...")
+    # Resolve all venues in one batch up front
+    get_venue_normalizer().resolve([
+        paper.get("data", {}).get("study_details", {}).get("title", "Unknown Title")
+        for paper in data if paper.get("screening_decision") == "INCLUDE"
+    ])
     citations = []
     for paper in data:
         if paper.get("screening_decision") == "INCLUDE":
@@ -1,7 +1,8 @@
 import json
 import pandas as pd
+from literature_autopilot.venue_normalizer import VenueNormalizer
 
-def generate_apa_citation(data):
+def generate_apa_citation(data, venues=None):
     # Authors
     authors = data.get('Authors', [])
     if isinstance(authors, list):
@@ -25,6 +26,9 @@ def generate_apa_citation(data):
     
     # Venue/Journal
     venue = data.get('Source', '')
+    # Replace preprint venues with the official one when it is known
+    if venues and (not venue or "arxiv" in str(venue).lower()):
+        venue = venues.lookup(title) or venue
     if not venue or venue == '':
         venue = "arXiv preprint"
     
@@ -49,9 +53,15 @@ def generate_bibliography_string(json_path="slr_extracted_data.json"):
 
     bibliography = "\n# Bibliography\n\n"
     
+    venues = VenueNormalizer()
+    venues.resolve(
+        [entry.get('Title', '') for entry in data if not entry.get('Source') or "arxiv" in str(entry.get('Source')).lower()],
+        {entry.get('Title', ''): VenueNormalizer.arxiv_id_from(entry.get('URL'), entry.get('DOI')) for entry in data}
+    )
+
     citations = []
     for entry in data:
-        citations.append(generate_apa_citation(entry))
+        citations.append(generate_apa_citation(entry, venues))
     
     # Sort alphabetically
     citations.sort()
@@ -1,12 +1,7 @@
 import json
-import matplotlib.pyplot as plt
-import seaborn as sns
-import os
-
-def generate_mechanism_figure():
-    if not os.path.exists("images"):
-        os.makedirs("images")
+from literature_autopilot.figure_renderer import FigureRenderer
 
+def generate_mechanism_figure(fmt: str = "png"):
     try:
         with open("slr_extracted_data.json", "r") as f:
             data = json.load(f)
@@ -33,15 +28,12 @@ def generate_mechanism_figure():
     labels = list(counts.keys())
     sizes = list(counts.values())
 
-    # Plot
-    sns.set_theme(style="whitegrid")
-    plt.figure(figsize=(8, 8))
-    plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140, colors=sns.color_palette("pastel"))
-    plt.title("Distribution of Self-Improvement Mechanisms", fontsize=16)
-    plt.tight_layout()
-    plt.savefig("images/figure_2_mechanism_distribution.png", dpi=300)
-    print("Generated images/figure_2_mechanism_distribution.png")
-    plt.close()
+    # Plot (skipped if the counts have not changed since the last render)
+    FigureRenderer("images", fmt=fmt).render({
+        "figure_2_mechanism_distribution": ("pie", {
+            "labels": labels, "counts": sizes, "title": "Distribution of Self-Improvement Mechanisms"
+        })
+    })
 
 if __name__ == "__main__":
     generate_mechanism_figure()
@@ -1,82 +1,254 @@
+import os
 import re
+import json
+import bisect
+import hashlib
+import threading
+import unicodedata
+from collections import defaultdict
 from typing import List, Dict, Tuple, Any
 
+# Lowercase surname particles that belong to the last name ("van der Berg", "de la Cruz")
+SURNAME_PARTICLES = {"van", "von", "der", "den", "de", "del", "della", "di", "da", "du", "dos", "la", "le", "ten", "ter", "zu", "st."}
+
+_NAME = r"[A-ZÀ-ÖØ-Þ](?:[^\W\d_]|['’\-])*"
+_PARTICLES = r"(?:(?:" + "|".join(re.escape(p) for p in sorted(SURNAME_PARTICLES)) + r")\s+)*"
+# Capitalized words that precede a year without being authors: "(May 2025)", "(Table 3, 2024)"
+NON_AUTHOR_WORDS = {
+    "january", "february", "march", "april", "may", "june", "july", "august", "september",
+    "october", "november", "december", "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept",
+    "oct", "nov", "dec", "spring", "summer", "fall", "autumn", "winter",
+    "table", "tab", "figure", "fig", "section", "sec", "appendix", "chapter", "eq", "equation", "page", "n",
+}
+_NOT_NON_AUTHOR = r"(?!(?:" + "|".join(sorted(NON_AUTHOR_WORDS)) + r")\b)"
+# "Smith", "García Márquez", "van der Berg et al.", "Smith and Jones", "Smith, Lee, & Kim"
+_WORD = r"(?i:" + _NOT_NON_AUTHOR + r")" + _NAME
+_AUTHOR = (
+    r"(?i:" + _NOT_NON_AUTHOR + r")" + _PARTICLES + _WORD + r"(?:\s+" + _WORD + r")?"
+    r"(?:\s+et\s+al\.?|(?:,\s*" + _PARTICLES + _NAME + r")*,?\s+(?:and|&)\s+" + _PARTICLES + _NAME + r"(?:\s+" + _NAME + r")?)?"
+)
+# One pass over the text finds both forms:
+#   parenthetical groups "(Smith, 2023; Lee et al., 2024a)"
+#   narrative citations  "Smith and Jones (2023)", "van der Berg et al. (2024)"
+_CITATION_PATTERN = re.compile(
+    r"\((?P<group>[^()]*?\d{4}[a-z]?)\)"
+    r"|(?P<narrative>" + _AUTHOR + r")\s+\((?P<year>\d{4})[a-z]?\)"
+)
+# German umlauts are also written transliterated ("Müller" / "Mueller")
+_TRANSLITERATION = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+# A group entry is an author list, a comma and a year; anything else in parentheses
+# ("January 2022 – May 2025", "N = 1000", "GSM8K, 2023") is not a citation
+_GROUP_ENTRY_PATTERN = re.compile(
+    r"^(?:(?:e\.g\.|i\.e\.|see also|see|cf\.)\s*,?\s*)?(?P<author>" + _AUTHOR + r"),\s*(?P<year>\d{4})[a-z]?$"
+)
+
+_AUTHOR_ONLY = re.compile(r"^(?:" + _AUTHOR + r")$")
+
+# Sentence ends, except after abbreviations common around citations ("et al.", "e.g.")
+_SENTENCE_END = re.compile(r"(?<!\bal)(?<!\be\.g)(?<!\bi\.e)(?<!\bvs)(?<!\bcf)[.!?](?=\s+[A-Z(\[])|\n")
+
+def normalize_surname(name: str) -> str:
+    """Lowercase, without diacritics, spaces, hyphens or apostrophes: 'García-Márquez' -> 'garciamarquez'."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    return "".join(c for c in decomposed if c.isalnum() and not unicodedata.combining(c)).lower()
+
+def surname_aliases(author: str) -> List[str]:
+    """
+    Normalized forms a citation may use for an author's last name. For
+    'Gabriel García Márquez' these are 'marquez' and 'garciamarquez'; for
+    'Jan van der Berg' 'berg' and 'vanderberg'; 'Müller' is also 'mueller'.
+    'Last, First' names are supported.
+    """
+    author = author.strip()
+    tokens = author.split(",")[0].split() if "," in author else author.split()
+    if not tokens:
+        return []
+    # Surname = last word plus the particles before it
+    start = len(tokens) - 1
+    while start > 0 and tokens[start - 1].lower() in SURNAME_PARTICLES:
+        start -= 1
+    forms = [
+        tokens[-1],
+        "".join(tokens[start:]),
+        # Compound surnames ("García Márquez")
+        "".join(tokens[-2:]),
+    ]
+    aliases = {normalize_surname(f) for f in forms} | {normalize_surname(f.lower().translate(_TRANSLITERATION)) for f in forms}
+    return sorted(a for a in aliases if a)
+
+def cited_surname_keys(author_part: str) -> List[str]:
+    """Lookup keys for the first author of a citation, most specific first."""
+    first_author = re.split(r"\s+(?:&|and)\s+|\s+et\s+al\.?|,", author_part)[0].strip()
+    words = first_author.split()
+    if not words:
+        return []
+    keys = [normalize_surname(first_author), normalize_surname(words[-1])]
+    return [k for i, k in enumerate(keys) if k and k not in keys[:i]]
+
 class CitationValidator:
-    """Validate citations against actual papers."""
-    
-    def __init__(self, extracted_data: List[Dict[str, Any]]):
+    """
+    Validate citations against actual papers.
+
+    With a `cache_path`, per-section results are cached by section hash (and
+    invalidated when the corpus changes), so unchanged sections are not
+    re-validated across writing, review and later runs.
+    """
+
+    def __init__(self, extracted_data: List[Dict[str, Any]], cache_path: str = None):
         self.papers = extracted_data
-        # Create a lookup for easier validation
-        # We store authors (normalized) and year
+        # Index (normalized last name alias, year) -> indices into self.paper_lookup
         self.paper_lookup = []
+        self.index = defaultdict(list)
         for p in extracted_data:
-            authors = p.get("authors", [])
+            # Extracted records use "Authors"/"Year", search results "authors"/"year"
+            authors = p.get("authors") or p.get("Authors") or []
             if isinstance(authors, str):
                 # Handle case where authors might be a string
                 authors = [a.strip() for a in authors.split(",")]
-            
-            # Normalize authors: take last names, lowercase
-            normalized_authors = []
-            for a in authors:
-                # Simple heuristic: assume last word is last name
-                parts = a.strip().split()
-                if parts:
-                    normalized_authors.append(parts[-1].lower())
-            
+            year = str(p.get("year") or p.get("Year") or "")
+
+            normalized_authors = sorted({alias for a in authors for alias in surname_aliases(str(a))})
+            for alias in normalized_authors:
+                self.index[(alias, year)].append(len(self.paper_lookup))
+
             self.paper_lookup.append({
                 "authors": normalized_authors,
-                "year": str(p.get("year", "")),
-                "title": p.get("title", ""),
+                "year": year,
+                "title": p.get("title") or p.get("paper_title") or p.get("Title", ""),
                 "original_data": p
             })
-    
+
+        self.cache_path = cache_path
+        self.fingerprint = hashlib.sha256(json.dumps(sorted(self.index), ensure_ascii=False).encode("utf-8")).hexdigest()
+        self.section_cache: Dict[str, List[List[str]]] = {}
+        self.settled = set()  # Sections that already went through a regeneration pass
+        self._lock = threading.Lock()
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r") as f:
+                    cached = json.load(f)
+                if cached.get("fingerprint") == self.fingerprint:
+                    self.section_cache = cached.get("sections", {})
+                    self.settled = set(cached.get("settled", []))
+            except (OSError, json.JSONDecodeError):
+                pass
+
+    @staticmethod
+    def iter_citations(text: str):
+        """Yields (author part, year, start, end) in text order; group entries share the group's span."""
+        for match in _CITATION_PATTERN.finditer(text):
+            if match.group("narrative"):
+                yield match.group("narrative"), match.group("year"), match.start(), match.end()
+                continue
+            for entry in match.group("group").split(";"):
+                entry_match = _GROUP_ENTRY_PATTERN.match(entry.strip())
+                if entry_match:
+                    yield entry_match.group("author").strip(), entry_match.group("year"), match.start(), match.end()
+
+    @classmethod
+    def extract_citations(cls, text: str) -> List[Tuple[str, str]]:
+        """
+        All citations in text order as (author part, year), from parenthetical
+        groups like (A, 2023; B et al., 2024) and narrative forms like A et al. (2023).
+        """
+        return [(author, year) for author, year, _, _ in cls.iter_citations(text)]
+
+    @staticmethod
+    def is_author_citation(author_part: str) -> bool:
+        """Whether a cited key is an author list ("Smith et al.", "Lee & Kim"), not a date, label or benchmark."""
+        return _AUTHOR_ONLY.match(author_part.strip()) is not None
+
+    def find_papers(self, author_part: str, year: str) -> List[Dict[str, Any]]:
+        """Papers matching the first author and year of a citation."""
+        for key in cited_surname_keys(author_part):
+            hits = self.index.get((key, year))
+            if hits:
+                return [self.paper_lookup[i] for i in hits]
+        return []
+
     def validate_citations_in_text(self, text: str) -> Dict[str, List[Tuple[str, str]]]:
         """Check if citations in text match actual papers."""
-        
-        # Regex for APA style citations: (Author, Year) or (Author et al., Year)
-        # Examples: (Smith, 2023), (Smith & Jones, 2024), (Smith et al., 2025)
-        # This regex is a simplification but covers most standard cases
-        citation_pattern = r"\(([^)]+?),\s*(\d{4})\)"
-        citations = re.findall(citation_pattern, text)
-        
+
         validation_results = {
             "valid": [],
             "invalid": [],
             "suspicious": []
         }
-        
-        for author_part, year in citations:
-            # Extract the primary author's last name for matching
-            # "Smith" -> "smith"
-            # "Smith & Jones" -> "smith"
-            # "Smith et al." -> "smith"
-            primary_author = author_part.split("&")[0].split("et al")[0].strip().split()[-1].lower()
-            
-            found = False
-            for paper in self.paper_lookup:
-                # Check year match
-                if paper["year"] == year:
-                    # Check author match
-                    # We check if the primary author from citation exists in the paper's author list
-                    if primary_author in paper["authors"]:
-                        found = True
-                        break
-            
-            if found:
+
+        for author_part, year in self.extract_citations(text):
+            if self.find_papers(author_part, year):
                 validation_results["valid"].append((author_part, year))
             else:
                 # If not found, it might be a hallucination or a formatting issue
                 # We flag it as suspicious/invalid
                 validation_results["invalid"].append((author_part, year))
-        
+
         return validation_results
 
+    @staticmethod
+    def section_key(text: str) -> str:
+        # Surrounding whitespace depends on how sections were joined, not on their citations
+        return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+    def validate_section(self, text: str) -> List[Tuple[str, str]]:
+        """Invalid citations of one section, cached by the section's hash."""
+        key = self.section_key(text)
+        if key not in self.section_cache:
+            invalid = self.validate_citations_in_text(text)["invalid"]
+            with self._lock:
+                self.section_cache[key] = [list(c) for c in invalid]
+                self._save()
+        return [tuple(c) for c in self.section_cache[key]]
+
+    def is_settled(self, text: str) -> bool:
+        return self.section_key(text) in self.settled
+
+    def mark_settled(self, text: str):
+        """Records that a section's remaining citations were already sent for regeneration."""
+        with self._lock:
+            self.settled.add(self.section_key(text))
+            self._save()
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        tmp_path = self.cache_path + f".{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"fingerprint": self.fingerprint, "sections": self.section_cache, "settled": sorted(self.settled)}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def offending_sentences(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Sentences containing invalid citations, as {"start", "end", "sentence", "invalid"}
+        with offsets into `text`. A sentence ends at a newline or at ./!/? before a
+        capitalized word, but not after "et al." or "e.g.".
+        """
+        boundaries = list(_SENTENCE_END.finditer(text))
+        # Where the next sentence starts / where this one ends (a newline is not part of the sentence)
+        starts = [m.end() for m in boundaries]
+        ends = [m.start() if m.group(0) == "\n" else m.end() for m in boundaries]
+        sentences = {}
+        for author, year, start, end in self.iter_citations(text):
+            if self.find_papers(author, year):
+                continue
+            i = bisect.bisect_right(starts, start)
+            span_start = starts[i - 1] if i > 0 else 0
+            j = bisect.bisect_left(ends, end)
+            span_end = ends[j] if j < len(ends) else len(text)
+            # Leading whitespace stays in place
+            span_start += len(text[span_start:span_end]) - len(text[span_start:span_end].lstrip())
+            entry = sentences.setdefault((span_start, span_end), {
+                "start": span_start, "end": span_end, "sentence": text[span_start:span_end], "invalid": []
+            })
+            entry["invalid"].append((author, year))
+        return sorted(sentences.values(), key=lambda e: e["start"])
+
     def generate_validation_report(self, text: str) -> str:
         """Generate a human-readable report of citation validation."""
         results = self.validate_citations_in_text(text)
-        
+
         report = "## Citation Validation Report\n\n"
-        
+
         if results["invalid"]:
             report += "### ⚠️ Invalid/Unknown Citations (Potential Hallucinations)\n"
             for author, year in set(results["invalid"]):
@@ -84,8 +256,8 @@ class CitationValidator:
             report += "\n"
         else:
             report += "✅ No invalid citations detected.\n\n"
-            
+
         report += f"Total Citations Checked: {len(results['valid']) + len(results['invalid'])}\n"
         report += f"Valid Citations: {len(results['valid'])}\n"
-        
+
         return report
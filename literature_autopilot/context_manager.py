@@ -1,5 +1,14 @@
 import re
-from typing import List, Dict, Any
+import json
+import math
+from collections import Counter
+from typing import List, Dict, Any, Optional
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on",
+    "or", "that", "the", "this", "to", "was", "were", "with", "which", "we", "our", "their", "its"
+}
 
 class ContextManager:
     """Manage context size and optimize token usage."""
@@ -12,8 +21,9 @@ class ContextManager:
         but still good practice for very large documents or smaller models.
         """
         
-        # Split by sections (Markdown headers)
-        sections = re.split(r"(^## .*$)", paper_text, flags=re.MULTILINE)
+        # Split by sections (Markdown headers; "# " for top-level sections, "## " for subsections)
+        # and keep each header together with its body
+        sections = [s["text"] for s in ContextManager.split_by_headings(paper_text)]
         
         chunks = []
         current_chunk = ""
@@ -35,6 +45,24 @@ class ContextManager:
             
         return chunks
     
+    @staticmethod
+    def split_by_headings(paper_text: str, max_level: int = 2) -> List[Dict[str, Any]]:
+        """
+        Splits a Markdown paper into contiguous sections at headings up to `max_level`.
+        Each entry has 'heading' ('' for text before the first heading), 'level' and 'text'
+        (including the heading line); joining the texts gives back the paper exactly.
+        """
+        pattern = re.compile(rf"^(#{{1,{max_level}}})\s+(.+?)\s*$", re.MULTILINE)
+        matches = list(pattern.finditer(paper_text))
+        sections = []
+        if not matches or matches[0].start() > 0:
+            end = matches[0].start() if matches else len(paper_text)
+            sections.append({"heading": "", "level": 0, "text": paper_text[:end]})
+        for i, match in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(paper_text)
+            sections.append({"heading": match.group(2), "level": len(match.group(1)), "text": paper_text[match.start():end]})
+        return sections
+
     @staticmethod
     def summarize_extracted_data(data: List[Dict[str, Any]], max_papers: int = 20) -> str:
         """Create a summary of extracted data to fit in context."""
@@ -66,3 +94,76 @@ class ContextManager:
                 summary += f"  - Improvement: {improvements[:100]}...\n"
         
         return summary
+
+    @staticmethod
+    def compact_json(data: Any) -> str:
+        """JSON without indentation and without empty fields (None, "", [], {})."""
+        def prune(value):
+            if isinstance(value, dict):
+                pruned = {k: prune(v) for k, v in value.items()}
+                return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+            if isinstance(value, list):
+                return [v for v in (prune(v) for v in value) if v not in (None, "", [], {})]
+            return value
+        return json.dumps(prune(data), separators=(",", ":"), ensure_ascii=False)
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Rough token count (~4 characters per token for English prose and JSON)."""
+        return len(text) // 4
+
+
+class RecordIndex:
+    """
+    Local BM25 index over extracted paper records.
+
+    Lets each prompt carry only the records relevant to it (a section plan, a draft
+    to fact-check) instead of the whole corpus, within a token budget.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        self.records = records
+        self.k1 = k1
+        self.b = b
+        self.serialized = [ContextManager.compact_json(r) for r in records]
+        self.docs = [Counter(self.tokenize(text)) for text in self.serialized]
+        self.lengths = [sum(doc.values()) for doc in self.docs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths and sum(self.lengths) else 1.0
+        doc_freq = Counter(term for doc in self.docs for term in doc)
+        n = len(self.docs)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return [t for t in _TOKEN_PATTERN.findall(text.lower()) if t not in _STOPWORDS]
+
+    def scores(self, query: str) -> List[float]:
+        terms = set(self.tokenize(query)) & set(self.idf)
+        result = []
+        for doc, length in zip(self.docs, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length)
+            result.append(sum(
+                self.idf[t] * doc[t] * (self.k1 + 1) / (doc[t] + norm)
+                for t in terms if t in doc
+            ))
+        return result
+
+    def top_k(self, query: str, k: Optional[int] = None, token_budget: Optional[int] = None) -> List[int]:
+        """Indices of the most relevant records, best first, until k or the token budget is reached."""
+        scores = self.scores(query)
+        ranked = sorted(range(len(self.records)), key=lambda i: (-scores[i], i))
+        selected, used = [], 0
+        for i in ranked[:k]:
+            cost = ContextManager.estimate_tokens(self.serialized[i])
+            if token_budget is not None and selected and used + cost > token_budget:
+                continue  # A smaller, less relevant record may still fit
+            selected.append(i)
+            used += cost
+        return selected
+
+    def context(self, query: str, token_budget: int, k: Optional[int] = None) -> str:
+        """Prompt-ready slice of the corpus: a one-line header plus the selected records as compact JSON."""
+        selected = self.top_k(query, k=k, token_budget=token_budget)
+        records = "\n".join(self.serialized[i] for i in selected)
+        return (f"[{len(self.records)} included studies in total; the {len(selected)} most relevant "
+                f"to this task are listed below, one JSON record per line]\n{records}")
@@ -0,0 +1,103 @@
+import re
+import json
+import logging
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+# Appended to editor prompts in patch mode
+EDIT_FORMAT_INSTRUCTIONS = """
+**OUTPUT FORMAT (EDIT OPERATIONS, JSON ONLY)**:
+Do NOT return the full text. Return only the changes as a list of edits:
+{
+  "edits": [
+    {"anchor": "exact quote of the passage to change, copied verbatim from the text (one to three sentences)",
+     "replacement": "the new text that replaces the quoted passage"}
+  ]
+}
+- To insert new text, quote the sentence before the insertion point and repeat it at the start of the replacement.
+- To delete text, use an empty replacement.
+- Anchors must be unique and must not overlap. Return {"edits": []} if nothing needs to change.
+"""
+
+# Fuzzy anchors: how much of the anchor's start/end must match exactly, and the overall similarity required
+_EDGE_CHARS = (60, 40, 25)
+MIN_SIMILARITY = 0.85
+
+def parse_edits(response_text: str) -> Optional[List[Dict]]:
+    """Reads the edit list from a model response. None if it is not in the edit format."""
+    text = response_text.strip()
+    if text.startswith("```"):
+        text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text)
+    try:
+        data = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    edits = data.get("edits") if isinstance(data, dict) else data
+    if not isinstance(edits, list):
+        return None
+    return [e for e in edits if isinstance(e, dict) and isinstance(e.get("anchor"), str) and "replacement" in e]
+
+def _whitespace_pattern(fragment: str) -> str:
+    return r"\s+".join(re.escape(word) for word in fragment.split())
+
+def locate_anchor(text: str, anchor: str, min_similarity: float = MIN_SIMILARITY) -> Optional[Tuple[int, int]]:
+    """
+    Finds the span an anchor refers to: exact match first, then ignoring whitespace
+    differences, then fuzzily (exact start and end fragments, similar middle).
+    """
+    anchor = anchor.strip()
+    if not anchor:
+        return None
+    start = text.find(anchor)
+    if start >= 0:
+        return start, start + len(anchor)
+
+    match = re.search(_whitespace_pattern(anchor), text)
+    if match:
+        return match.span()
+
+    for edge in _EDGE_CHARS:
+        if len(anchor) < 2 * edge:
+            continue
+        head = re.search(_whitespace_pattern(anchor[:edge]), text)
+        if not head:
+            continue
+        tail_pattern = re.compile(_whitespace_pattern(anchor[-edge:]))
+        # The tail must follow the head within a plausible distance
+        tail = tail_pattern.search(text, head.end(), head.start() + int(len(anchor) * 1.5))
+        if tail:
+            candidate = text[head.start():tail.end()]
+            if SequenceMatcher(None, candidate, anchor, autojunk=False).ratio() >= min_similarity:
+                return head.start(), tail.end()
+    return None
+
+def apply_edits(text: str, edits: List[Dict]) -> Tuple[str, List[Dict]]:
+    """Applies edits in order. Returns the new text and the edits whose anchor was not found."""
+    failed = []
+    for edit in edits:
+        span = locate_anchor(text, edit["anchor"])
+        if span is None:
+            failed.append(edit)
+            continue
+        text = text[:span[0]] + str(edit.get("replacement") or "") + text[span[1]:]
+    return text, failed
+
+def edit_or_rewrite(text: str, edit_response: str, rewrite, label: str = "text") -> str:
+    """
+    Applies a patch-mode response to `text`. Falls back to `rewrite()` (a full
+    regeneration) if the response is not an edit list or none of its edits apply.
+    """
+    edits = parse_edits(edit_response)
+    if edits is None:
+        logging.warning(f"  [Edit Ops] Response for {label} is not an edit list. Falling back to a full rewrite...")
+        return rewrite()
+    if not edits:
+        return text
+    new_text, failed = apply_edits(text, edits)
+    if len(failed) == len(edits):
+        logging.warning(f"  [Edit Ops] None of the {len(edits)} edits for {label} could be anchored. Falling back to a full rewrite...")
+        return rewrite()
+    if failed:
+        logging.warning(f"  [Edit Ops] {len(failed)}/{len(edits)} edits for {label} could not be anchored and were skipped.")
+    logging.info(f"  [Edit Ops] Applied {len(edits) - len(failed)} edits to {label}.")
+    return new_text
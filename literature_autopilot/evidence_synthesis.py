@@ -0,0 +1,188 @@
+import re
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Sequence, Union
+from literature_autopilot.evidence_table import EvidenceTable
+
+# Comparisons without a reported sample size are given the binomial variance of a
+# benchmark of this many items; their CIs and I² are then only approximate
+ASSUMED_N = 500
+Z_95 = 1.959963984540054
+# Rates where lower is better: the effect is ln(baseline / method), so positive still means improvement
+LOWER_IS_BETTER = re.compile(r"error|fail|hallucinat|toxic|violation|attack success|\bw?er\b|\bcer\b", re.IGNORECASE)
+# Lower-is-better measures that are not proportions; the binomial variance does not apply, so they are not pooled
+NOT_A_PROPORTION = re.compile(r"perplexity|latency|cost|loss|tokens|runtime|seconds|\btime\b|\bms\b|\$", re.IGNORECASE)
+
+def random_effects(y: np.ndarray, v: np.ndarray, groups: np.ndarray, n_groups: int) -> Dict[str, np.ndarray]:
+    """
+    DerSimonian-Laird random-effects pooling of effects `y` with variances `v`,
+    for all groups at once. Returns arrays indexed by group: k, pooled, se, tau2, q, i2.
+    """
+    k = np.bincount(groups, minlength=n_groups).astype(float)
+    w = 1.0 / v
+    wy = w * y
+    sw = np.bincount(groups, w, n_groups)
+    swy = np.bincount(groups, wy, n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Cochran's Q = sum(w * (y - fixed)^2), expanded to avoid a second pass per element
+        q = np.maximum(0.0, np.bincount(groups, wy * y, n_groups) - swy * swy / sw)
+        c = sw - np.bincount(groups, w * w, n_groups) / sw
+        tau2 = np.where(c > 0, np.maximum(0.0, (q - (k - 1)) / c), 0.0)
+        w_re = 1.0 / (v + tau2[groups])
+        sw_re = np.bincount(groups, w_re, n_groups)
+        pooled = np.bincount(groups, w_re * y, n_groups) / sw_re
+        se = np.sqrt(1.0 / sw_re)
+        i2 = np.where(q > 0, np.maximum(0.0, (q - (k - 1)) / q), 0.0)
+    return {"k": k, "pooled": pooled, "se": se, "tau2": np.nan_to_num(tau2), "q": q, "i2": i2}
+
+class EvidenceSynthesis:
+    """
+    Quantitative synthesis of the extracted `improvements.baseline_comparisons`.
+
+    The effect size is the log response ratio ln(method_score / baseline_score),
+    which is comparable across tasks and metrics on a 0-100 (or 0-1) scale; for
+    error-type rates it is inverted, and unbounded measures (perplexity, latency,
+    cost) are left out. Comparisons from the same paper are correlated, so within
+    each group they are first averaged into one effect per study (keeping the
+    average variance, i.e. assuming full correlation). Studies are then pooled with
+    DerSimonian-Laird random effects, heterogeneity is reported as I², and
+    percentile bootstrap CIs resample studies within each group. All groups and
+    bootstrap replicates are computed in a handful of vectorized NumPy passes, so
+    thousands of comparisons take milliseconds.
+
+    Variances need the number of test items, which papers often do not report;
+    `n_reported_share` says for how many comparisons it was known.
+    """
+
+    def __init__(self, studies_data: Union[EvidenceTable, List[Dict[str, Any]]], assumed_n: int = ASSUMED_N,
+                 n_bootstrap: int = 1000, seed: int = 0):
+        self.assumed_n = assumed_n
+        self.n_bootstrap = n_bootstrap
+        self.seed = seed
+        comparisons = EvidenceTable.of(studies_data).comparisons
+        baseline = comparisons["baseline_score"].to_numpy(dtype=float)
+        method = comparisons["method_score"].to_numpy(dtype=float)
+        # The metric name decides the direction; without one, the task name may still say "error rate"
+        measure = comparisons["metric"].fillna("").astype(str).where(comparisons["metric"].notna(), comparisons["task"].astype(str))
+        lower_is_better = measure.str.contains(LOWER_IS_BETTER).to_numpy()
+        # A paper's scores on one task and metric share a scale: they are fractions, rescaled to percent, only
+        # if every one of them is <= 1 and none is marked as a percentage. Scores outside (0, 100] cannot be pooled
+        highest = comparisons[["baseline_score", "method_score"]].max(axis=1)
+        fraction_like = ((highest <= 1) | highest.isna()) & ~comparisons["percent"]
+        series = [comparisons["study"], comparisons["task"].astype(str), comparisons["metric"].fillna("").astype(str)]
+        fractions = fraction_like.groupby(series).transform("all").to_numpy()
+        baseline = np.where(fractions, baseline * 100, baseline)
+        method = np.where(fractions, method * 100, method)
+        valid = (baseline > 0) & (baseline <= 100) & (method > 0) & (method <= 100)
+        valid &= ~measure.str.contains(NOT_A_PROPORTION).to_numpy()
+        self.n_excluded = int(len(valid) - valid.sum())
+
+        comparisons = comparisons[valid]
+        self.study = comparisons["study"].to_numpy(dtype=np.int64)
+        self.mechanism, self.mechanism_names = pd.factorize(comparisons["mechanism"])
+        self.task, self.task_names = pd.factorize(comparisons["task"])
+        sample_size = comparisons["sample_size"].to_numpy(dtype=float)
+        self.n_reported = sample_size >= 1
+        n = np.where(self.n_reported, sample_size, assumed_n)
+        p_base = baseline[valid] / 100
+        p_method = method[valid] / 100
+        # Scores of exactly 100% would have zero variance
+        p_base, p_method = np.minimum(p_base, 1 - 0.5 / n), np.minimum(p_method, 1 - 0.5 / n)
+        self.effect = np.where(lower_is_better[valid], -1.0, 1.0) * np.log(p_method / p_base)
+        self.variance = (1 - p_method) / (n * p_method) + (1 - p_base) / (n * p_base)
+
+    def __len__(self) -> int:
+        return len(self.effect)
+
+    def pool(self, by: Sequence[str] = ("mechanism", "task")) -> List[Dict[str, Any]]:
+        """
+        Pooled effect per group of `by` (any of "mechanism", "task"; empty = all
+        comparisons). Effects are also given as relative improvement in percent.
+        """
+        if len(self) == 0:
+            return []
+        columns = [getattr(self, name) for name in by]
+        if columns:
+            keys, groups = np.unique(np.stack(columns, axis=1), axis=0, return_inverse=True)
+            groups = groups.reshape(-1)
+        else:
+            keys, groups = np.zeros((1, 0), dtype=np.int64), np.zeros(len(self), dtype=np.int64)
+        n_groups = len(keys)
+        k = np.bincount(groups, minlength=n_groups)
+        n_reported = np.bincount(groups, self.n_reported, n_groups)
+        # One effect per (group, study): the mean effect and mean variance of its comparisons
+        units, unit_of = np.unique(np.stack([groups, self.study], axis=1), axis=0, return_inverse=True)
+        unit_of = unit_of.reshape(-1)
+        per_unit = np.bincount(unit_of).astype(float)
+        unit_effect = np.bincount(unit_of, self.effect) / per_unit
+        unit_variance = np.bincount(unit_of, self.variance) / per_unit
+        unit_groups = units[:, 0]
+        stats = random_effects(unit_effect, unit_variance, unit_groups, n_groups)
+        boot_low, boot_high = self._bootstrap(unit_effect, unit_variance, unit_groups, n_groups)
+        n_studies = np.bincount(unit_groups, minlength=n_groups)
+        # Share of studies whose effect points the same way as the pooled effect
+        agrees = np.sign(unit_effect) == np.sign(stats["pooled"][unit_groups])
+        direction_agreement = np.bincount(unit_groups, agrees, n_groups) / n_studies
+
+        results = []
+        for g in range(n_groups):
+            entry = {name: getattr(self, f"{name}_names")[keys[g, i]] for i, name in enumerate(by)}
+            pooled, se = stats["pooled"][g], stats["se"][g]
+            entry.update({
+                "k": int(k[g]),
+                "n_studies": int(n_studies[g]),
+                "n_reported_share": float(n_reported[g] / k[g]),
+                "direction_agreement": float(direction_agreement[g]),
+                "log_ratio": float(pooled),
+                "relative_improvement_percent": float(np.expm1(pooled) * 100),
+                "ci_low_percent": float(np.expm1(pooled - Z_95 * se) * 100),
+                "ci_high_percent": float(np.expm1(pooled + Z_95 * se) * 100),
+                "bootstrap_low_percent": float(np.expm1(boot_low[g]) * 100),
+                "bootstrap_high_percent": float(np.expm1(boot_high[g]) * 100),
+                "tau2": float(stats["tau2"][g]),
+                "q": float(stats["q"][g]),
+                "i2": float(stats["i2"][g]),
+            })
+            results.append(entry)
+        return results
+
+    def overall(self) -> Optional[Dict[str, Any]]:
+        """Pooled effect across all comparisons, None without data."""
+        pooled = self.pool(by=())
+        return pooled[0] if pooled else None
+
+    def _bootstrap(self, effect: np.ndarray, variance: np.ndarray, groups: np.ndarray, n_groups: int):
+        """Percentile 95% CIs of the pooled log ratio, resampling studies within each group."""
+        if self.n_bootstrap <= 0:
+            nan = np.full(n_groups, np.nan)
+            return nan, nan
+        rng = np.random.default_rng(self.seed)
+        order = np.argsort(groups, kind="stable")
+        sorted_groups = groups[order]
+        sizes = np.bincount(groups, minlength=n_groups)
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        # Each position draws a member of its own group, for all replicates at once
+        draws = starts[sorted_groups] + (rng.random((self.n_bootstrap, len(order))) * sizes[sorted_groups]).astype(np.int64)
+        picked = order[draws]
+        replicate_groups = (np.arange(self.n_bootstrap)[:, None] * n_groups + sorted_groups).reshape(-1)
+        stats = random_effects(effect[picked].reshape(-1), variance[picked].reshape(-1),
+                               replicate_groups, self.n_bootstrap * n_groups)
+        pooled = stats["pooled"].reshape(self.n_bootstrap, n_groups)
+        return np.percentile(pooled, 2.5, axis=0), np.percentile(pooled, 97.5, axis=0)
+
+    def summary_table(self, by: Sequence[str] = ("mechanism", "task"), min_k: int = 1) -> str:
+        """Markdown table of the pooled effects."""
+        rows = [r for r in self.pool(by) if r["k"] >= min_k]
+        if not rows:
+            return "No quantitative baseline comparisons available."
+        headers = [name.capitalize() for name in by]
+        table = "| " + " | ".join(headers + ["k (studies)", "Relative Improvement [95% CI]", "Bootstrap 95% CI", "I²"]) + " |\n"
+        table += "| " + " | ".join([":---"] * len(headers) + ["---:"] * 4) + " |\n"
+        for r in sorted(rows, key=lambda r: -r["k"]):
+            table += "| " + " | ".join([r[name] for name in by] + [
+                f"{r['k']} ({r['n_studies']})",
+                f"{r['relative_improvement_percent']:+.1f}% [{r['ci_low_percent']:+.1f}, {r['ci_high_percent']:+.1f}]",
+                f"[{r['bootstrap_low_percent']:+.1f}, {r['bootstrap_high_percent']:+.1f}]",
+                f"{r['i2'] * 100:.0f}%",
+            ]) + " |\n"
+        return table
@@ -0,0 +1,173 @@
+import re
+import pandas as pd
+from typing import Any, Dict, List, Union
+
+# Canonical benchmark -> description, and the spellings that refer to it
+BENCHMARKS = {
+    "GSM8K": "Math reasoning",
+    "MATH": "Math competition",
+    "HumanEval": "Code generation",
+    "MMLU": "General knowledge",
+    "TruthfulQA": "Factuality",
+    "HellaSwag": "Common sense",
+    "ARC": "Science reasoning",
+}
+BENCHMARK_ALIASES = {
+    "GSM8K": [r"gsm[-\s]?8k", r"grade[-\s]school math"],
+    "MATH": [r"\bmath\b", r"competition math"],
+    "HumanEval": [r"human[-\s]?eval"],
+    "MMLU": [r"\bmmlu"],
+    "TruthfulQA": [r"truthful[-\s]?qa"],
+    "HellaSwag": [r"hella[-\s]?swag"],
+    "ARC": [r"\barc\b", r"ai2 reasoning challenge"],
+}
+MODEL_ALIASES = {
+    "GPT-3": [r"gpt[-\s]?3", r"davinci", r"chatgpt(?![-\s]?4)"],
+    "GPT-4": [r"(?:chat)?gpt[-\s]?4"],
+    "Claude": [r"claude"],
+    "LLaMA": [r"llama"],
+    "Mistral": [r"mistral", r"mixtral"],
+    "PaLM": [r"\bpalm"],
+}
+
+def _alias_pattern(aliases: Dict[str, List[str]]) -> re.Pattern:
+    """One alternation with a named group per canonical name; the first alias that matches wins."""
+    groups = [f"(?P<g{i}>{'|'.join(patterns)})" for i, patterns in enumerate(aliases.values())]
+    return re.compile("|".join(groups), re.IGNORECASE)
+
+_BENCHMARK_PATTERN = _alias_pattern(BENCHMARK_ALIASES)
+_MODEL_PATTERN = _alias_pattern(MODEL_ALIASES)
+
+def find_mentions(values: pd.Series, pattern: re.Pattern, aliases: Dict[str, List[str]]) -> pd.Series:
+    """
+    Every canonical name mentioned in each value, one row per (value, name): the
+    index repeats the value's index, so "GSM8K / MATH" yields two rows. One
+    vectorized regex pass; a name mentioned twice in a value is listed once.
+    """
+    values = values.fillna("").astype(str)
+    matches = values.str.extractall(pattern) if not values.empty else pd.DataFrame()
+    if matches.empty:
+        return pd.Series([], index=values.index[:0], dtype=object)
+    names = pd.Series(list(aliases), index=matches.columns)
+    found = matches.notna()
+    mentioned = found.idxmax(axis=1).map(names)
+    mentioned.index = mentioned.index.get_level_values(0)
+    keys = pd.Series(mentioned.index, index=mentioned.index).astype(str) + "\0" + mentioned
+    return mentioned[~keys.duplicated().to_numpy()]
+
+def canonicalize(values: pd.Series, pattern: re.Pattern, aliases: Dict[str, List[str]]) -> pd.Series:
+    """First canonical name mentioned in each value (missing if no alias matches)."""
+    mentioned = find_mentions(values, pattern, aliases)
+    first = mentioned[~mentioned.index.duplicated()]
+    return first.reindex(values.index).astype(object).where(lambda s: s.notna(), None)
+
+def _clean_labels(values: pd.Series) -> pd.Series:
+    """Collapses whitespace and merges labels that differ only in case (keeping the first spelling)."""
+    values = values.fillna("Unknown").astype(str).str.split().str.join(" ").replace("", "Unknown")
+    return values.groupby(values.str.lower()).transform("first")
+
+class EvidenceTable:
+    """
+    The extracted data flattened once into tidy DataFrames:
+
+    - `papers`: one row per paper (study index, title, year, mechanism, AMSTAR rating).
+    - `comparisons`: one row per baseline comparison (paper x mechanism x task x
+      model x metric) with numeric scores and sample sizes (where reported),
+      whether the scores are marked as percentages, and canonical benchmark/model names.
+    - `domains`: one row per evaluated task/domain listed in the evaluation setup.
+    - `benchmark_mentions` / `model_mentions`: one row per canonical benchmark or
+      model family named in a cell (source/role, study), so a task like
+      "GSM8K / MATH" counts for both. The per-row `benchmark`/`*_family` columns
+      only hold the first name mentioned.
+
+    Gap analysis and GRADE run as groupbys on these frames instead of re-walking
+    the nested JSON.
+    """
+
+    def __init__(self, extracted_data: List[Dict[str, Any]]):
+        self.data = extracted_data
+        papers, comparisons, domains = [], [], []
+        for study, d in enumerate(extracted_data):
+            improvements = d.get("improvements") or {}
+            papers.append({
+                "study": study,
+                "title": d.get("paper_title") or d.get("Title") or d.get("title") or "",
+                "year": d.get("Year") or d.get("year"),
+                "mechanism": (d.get("methodological_differences") or {}).get("mechanism_type"),
+                "amstar": str((d.get("amstar_2_assessment") or {}).get("overall_score") or "UNKNOWN").upper(),
+            })
+            for comp in improvements.get("baseline_comparisons") or []:
+                if isinstance(comp, dict):
+                    comparisons.append({
+                        "study": study,
+                        "task": comp.get("task"),
+                        "metric": comp.get("metric"),
+                        "baseline_model": comp.get("baseline_model"),
+                        "method_model": comp.get("method_model"),
+                        "baseline_score": comp.get("baseline_score"),
+                        "method_score": comp.get("method_score"),
+                        "sample_size": comp.get("sample_size"),
+                    })
+            for task in (improvements.get("evaluation_setup") or {}).get("tasks_and_domains") or []:
+                domains.append({"study": study, "task": task})
+
+        self.papers = pd.DataFrame(papers, columns=["study", "title", "year", "mechanism", "amstar"])
+        self.papers["mechanism"] = _clean_labels(self.papers["mechanism"])
+        self.papers["low_quality"] = self.papers["amstar"].isin(["LOW", "CRITICALLY LOW"])
+        mechanism = self.papers.set_index("study")["mechanism"]
+
+        columns = ["study", "task", "metric", "baseline_model", "method_model", "baseline_score", "method_score", "sample_size"]
+        self.comparisons = pd.DataFrame(comparisons, columns=columns)
+        self.comparisons.insert(1, "mechanism", self.comparisons["study"].map(mechanism))
+        self.comparisons["task"] = _clean_labels(self.comparisons["task"])
+        # A "%" on either score or in the metric name fixes the scale, however small the values
+        marked = self.comparisons[["baseline_score", "method_score"]].astype(str).apply(lambda c: c.str.contains("%", regex=False))
+        self.comparisons["percent"] = marked.any(axis=1) | self.comparisons["metric"].astype(str).str.contains(r"%|percent", case=False)
+        for column in ("baseline_score", "method_score"):
+            scores = self.comparisons[column].astype(str).str.replace("%", "", regex=False).str.strip()
+            self.comparisons[column] = pd.to_numeric(scores, errors="coerce")
+        sample_size = self.comparisons["sample_size"].astype(str).str.replace(",", "", regex=False).str.strip()
+        self.comparisons["sample_size"] = pd.to_numeric(sample_size, errors="coerce")
+        self.comparisons["benchmark"] = canonicalize(self.comparisons["task"], _BENCHMARK_PATTERN, BENCHMARK_ALIASES)
+        self.comparisons["baseline_family"] = canonicalize(self.comparisons["baseline_model"], _MODEL_PATTERN, MODEL_ALIASES)
+        self.comparisons["method_family"] = canonicalize(self.comparisons["method_model"], _MODEL_PATTERN, MODEL_ALIASES)
+
+        self.domains = pd.DataFrame(domains, columns=["study", "task"])
+        self.domains["task"] = self.domains["task"].astype(str)
+        self.domains["benchmark"] = canonicalize(self.domains["task"], _BENCHMARK_PATTERN, BENCHMARK_ALIASES)
+
+        self.benchmark_mentions = pd.concat([
+            self._mentions(self.comparisons, "task", "comparison", _BENCHMARK_PATTERN, BENCHMARK_ALIASES, "benchmark"),
+            self._mentions(self.domains, "task", "domain", _BENCHMARK_PATTERN, BENCHMARK_ALIASES, "benchmark"),
+        ], ignore_index=True)
+        self.model_mentions = pd.concat([
+            self._mentions(self.comparisons, "baseline_model", "baseline", _MODEL_PATTERN, MODEL_ALIASES, "model"),
+            self._mentions(self.comparisons, "method_model", "method", _MODEL_PATTERN, MODEL_ALIASES, "model"),
+        ], ignore_index=True)
+
+    @staticmethod
+    def _mentions(frame: pd.DataFrame, column: str, source: str, pattern: re.Pattern,
+                  aliases: Dict[str, List[str]], name: str) -> pd.DataFrame:
+        mentioned = find_mentions(frame[column], pattern, aliases)
+        return pd.DataFrame({
+            "study": frame["study"].reindex(mentioned.index).to_numpy(),
+            "source": source,
+            name: mentioned.to_numpy(),
+        }, columns=["study", "source", name])
+
+    @classmethod
+    def of(cls, data: Union["EvidenceTable", List[Dict[str, Any]]]) -> "EvidenceTable":
+        """Accepts an existing table or the raw extracted records."""
+        return data if isinstance(data, cls) else cls(data)
+
+    def __len__(self) -> int:
+        return len(self.papers)
+
+    def covered_benchmarks(self) -> set:
+        """Benchmarks named in any baseline comparison task."""
+        mentions = self.benchmark_mentions
+        return set(mentions.loc[mentions["source"] == "comparison", "benchmark"])
+
+    def covered_models(self) -> set:
+        """Model families named as baseline or method model in any comparison."""
+        return set(self.model_mentions["model"])
@@ -0,0 +1,60 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+LEDGER_FILE = "slr_extraction_ledger.jsonl"
+
+class ExtractionLedger:
+    """
+    Append-only log of per-paper extraction results.
+
+    Each line is one JSON record keyed by the PDF content hash and a hash of the
+    prompts/settings it was extracted with. Records are flushed to disk as soon
+    as a paper finishes, so a crash loses at most the papers still in flight,
+    and a rerun with unchanged prompts skips every paper already in the ledger.
+    Later records for the same key win; a torn last line is ignored.
+    """
+
+    def __init__(self, path: str = LEDGER_FILE):
+        self.path = path
+        self.records: Dict[tuple, Dict] = {}
+        self._lock = threading.Lock()
+        self._torn_tail = False
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        skipped = 0
+        with open(self.path, "r") as f:
+            content = f.read()
+        # A crash mid-write leaves a partial last line; start the next record on a fresh line
+        self._torn_tail = bool(content) and not content.endswith("\n")
+        for line in content.split("\n"):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                self.records[(record["pdf_sha256"], record["prompt_hash"])] = record["result"]
+            except (json.JSONDecodeError, KeyError):
+                skipped += 1
+        if skipped:
+            logging.warning(f"Ignored {skipped} unreadable line(s) in extraction ledger '{self.path}'.")
+
+    def get(self, pdf_hash: str, prompt_hash: str) -> Optional[Dict]:
+        return self.records.get((pdf_hash, prompt_hash))
+
+    def append(self, pdf_hash: str, prompt_hash: str, result: Dict):
+        """Records a finished extraction and forces it to disk."""
+        record = {"pdf_sha256": pdf_hash, "prompt_hash": prompt_hash, "extracted_at": time.time(), "result": result}
+        with self._lock:
+            with open(self.path, "a") as f:
+                if self._torn_tail:
+                    f.write("\n")
+                    self._torn_tail = False
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.records[(pdf_hash, prompt_hash)] = result
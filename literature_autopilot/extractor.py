@@ -3,15 +3,25 @@ import os
 import json
 import time
 import random
+import threading
 import google.generativeai as genai
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 from literature_autopilot.llm_utils import RotatableModel
+from literature_autopilot.pdf_text import PDFTextExtractor
 
 class SLRExtractor:
     def __init__(self, model_name: str = "gemini-1.5-pro-latest", 
                  prescreening_prompt_path: str = None, 
-                 extraction_prompt_path: str = None):
+                 extraction_prompt_path: str = None,
+                 pdf_mode: str = "upload",
+                 upload_registry=None,
+                 extraction_mode: str = "staged"):
         self.model = RotatableModel(model_name)
+        self.extraction_mode = extraction_mode  # "staged" (3 calls) or "fused" (1 call, staged fallback)
+        self.usage = {"calls": 0, "prompt_tokens": 0, "output_tokens": 0, "seconds": 0.0}
+        self._usage_lock = threading.Lock()
+        self.pdf_mode = pdf_mode  # "upload" (Gemini File API) or "local" (parsed text sections)
+        self.upload_registry = upload_registry  # Optional GeminiUploadRegistry to reuse uploads
         self.prescreening_prompt = None
         self.extraction_prompt = None
         
@@ -44,43 +54,72 @@ class SLRExtractor:
         Executes the Two-Stage SLR Protocol:
         1. Pre-Screening (Fast Include/Exclude)
         2. Detailed Extraction (Quality Assessment + Structured Data)
+        In "fused" mode both stages and AMSTAR 2 share a single call.
         """
         logging.info(f"Processing PDF: {pdf_path}...")
         
-        # Upload PDF to Gemini
-        try:
-            def upload_op():
-                f = genai.upload_file(pdf_path)
-                # Wait for processing
-                while f.state.name == "PROCESSING":
-                    time.sleep(2)
-                    f = genai.get_file(f.name)
-                if f.state.name == "FAILED":
-                    raise ValueError(f"File processing failed: {f.state.name}")
-                return f
-
-            uploaded_file = self._retry_with_backoff(upload_op, retries=3)
-            
-        except Exception as e:
-            logging.error(f"  Error uploading PDF after retries: {e}")
-            return {"error": str(e)}
+        # Paper content per stage: local text sections, or the same uploaded file for all stages
+        contents = None
+        if self.pdf_mode == "local":
+            try:
+                sections = PDFTextExtractor.stage_contexts(pdf_path)
+                contents = {stage: f"PAPER TEXT (extracted sections):\n{text}" for stage, text in sections.items()}
+            except Exception as e:
+                logging.warning(f"  Local text extraction failed ({e}). Falling back to file upload...")
+        
+        if contents is None:
+            try:
+                upload = self.upload_registry.get if self.upload_registry else self._upload_pdf
+                uploaded_file = self._retry_with_backoff(lambda: upload(pdf_path), retries=3)
+            except Exception as e:
+                logging.error(f"  Error uploading PDF after retries: {e}")
+                return {"error": str(e)}
+            contents = {stage: uploaded_file for stage in ["prescreen", "extraction", "amstar", "fused"]}
+
+        if self.extraction_mode == "fused":
+            fused_result = self._process_fused(contents, pdf_path)
+            if fused_result is not None:
+                return fused_result
+            logging.warning("  [Fused] Could not parse the fused response. Falling back to staged extraction...")
+        
+        return self._process_staged(contents, pdf_path)
+
+    def _generate(self, parts) -> str:
+        """Calls the model and tracks calls, tokens and latency in self.usage."""
+        start = time.time()
+        response = self.model.generate_content(parts)
+        usage = getattr(response, "usage_metadata", None)
+        with self._usage_lock:
+            self.usage["calls"] += 1
+            self.usage["seconds"] += time.time() - start
+            if usage:
+                self.usage["prompt_tokens"] += getattr(usage, "prompt_token_count", 0) or 0
+                self.usage["output_tokens"] += getattr(usage, "candidates_token_count", 0) or 0
+        return response.text.strip()
+
+    @staticmethod
+    def _parse_json(text: str) -> Dict:
+        if text.startswith("```json"):
+            text = text[7:-3]
+        return json.loads(text)
+
+    def _finalize(self, extraction_result: Dict, pdf_path: str) -> Dict:
+        # --- Stage 4: Validation ---
+        validation_errors = self.validate_extracted_data(extraction_result)
+        extraction_result["validation_errors"] = validation_errors
+        if validation_errors:
+            logging.warning(f"  Validation Errors for {pdf_path}: {validation_errors}")
+
+        # Merge screening decision into final result
+        extraction_result["screening_decision"] = "INCLUDE"
+        return extraction_result
 
+    def _process_staged(self, contents: Dict, pdf_path: str) -> Dict:
         # --- Stage 1: Pre-Screening ---
         logging.info("  [Stage 1] Pre-Screening...")
         
-        # Use loaded prompt or fallback (though fallback is removed for brevity, assume config is correct)
-        prompt_screening = self.prescreening_prompt if self.prescreening_prompt else """
-        You are an expert SLR assistant. Analyze the attached paper based on our protocol.
-        Decide if this paper should be INCLUDED or EXCLUDED. Provide a brief reason.
-        Output Format (JSON ONLY): {"screening_decision": "INCLUDE" or "EXCLUDE", "reason": "..."}
-        """
-        
         try:
-            response = self.model.generate_content([prompt_screening, uploaded_file])
-            text = response.text.strip()
-            if text.startswith("```json"):
-                text = text[7:-3]
-            screening_result = json.loads(text)
+            screening_result = self._parse_json(self._generate([self._prescreening_prompt(), contents["prescreen"]]))
             
             if screening_result.get("screening_decision") != "INCLUDE":
                 logging.info(f"  Excluded in Stage 1: {screening_result.get('reason')}")
@@ -93,36 +132,75 @@ class SLRExtractor:
         # --- Stage 2: Detailed Extraction ---
         logging.info("  [Stage 2] Detailed Extraction & Quality Assessment...")
         
-        prompt_extraction = self.extraction_prompt if self.extraction_prompt else """
-        You are an expert SLR data extractor. Extract comprehensive, structured data.
-        """
-
-        
         try:
-            response = self.model.generate_content([prompt_extraction, uploaded_file])
-            text = response.text.strip()
-            if text.startswith("```json"):
-                text = text[7:-3]
-            extraction_result = json.loads(text)
+            extraction_result = self._parse_json(self._generate([self._extraction_prompt(), contents["extraction"]]))
             
             # --- Stage 3: AMSTAR 2 Assessment ---
-            amstar_result = self._run_amstar_assessment(uploaded_file)
+            amstar_result = self._run_amstar_assessment(contents["amstar"])
             extraction_result["amstar_2_assessment"] = amstar_result
             
-            # --- Stage 4: Validation ---
-            validation_errors = self.validate_extracted_data(extraction_result)
-            extraction_result["validation_errors"] = validation_errors
-            if validation_errors:
-                logging.warning(f"  Validation Errors for {pdf_path}: {validation_errors}")
-
-            # Merge screening decision into final result
-            extraction_result["screening_decision"] = "INCLUDE"
-            return extraction_result
+            return self._finalize(extraction_result, pdf_path)
             
         except Exception as e:
             logging.error(f"  Stage 2/3 failed: {e}")
             return {"error": f"Extraction Error: {str(e)}"}
 
+    def _process_fused(self, contents: Dict, pdf_path: str) -> Optional[Dict]:
+        """
+        Pre-screening, extraction and AMSTAR 2 in a single call, so the paper is only
+        paid for once in input tokens. Returns None if the response cannot be parsed.
+        """
+        logging.info("  [Fused] Pre-Screening + Extraction + AMSTAR 2 in one call...")
+        prompt = f"""
+        You are an expert SLR assistant. Complete the THREE tasks below for the attached paper
+        and answer with ONE JSON object.
+
+        ### TASK A: PRE-SCREENING
+        {self._prescreening_prompt()}
+
+        ### TASK B: DATA EXTRACTION (only if TASK A decided INCLUDE, otherwise use null)
+        {self._extraction_prompt()}
+
+        ### TASK C: QUALITY ASSESSMENT (only if TASK A decided INCLUDE, otherwise use null)
+        {self._amstar_instructions()}
+
+        ### COMBINED OUTPUT FORMAT (JSON ONLY)
+        {{
+            "screening": {{"screening_decision": "INCLUDE" or "EXCLUDE", "reason": "..."}},
+            "extraction": {{ ...TASK B output... }} or null,
+            "amstar_2_assessment": {{ ...TASK C output... }} or null
+        }}
+        """
+        try:
+            fused = self._parse_json(self._generate([prompt, contents["fused"]]))
+            screening_result = fused["screening"]
+        except Exception as e:
+            logging.warning(f"  [Fused] Parse failed: {e}")
+            return None
+
+        if screening_result.get("screening_decision") != "INCLUDE":
+            logging.info(f"  Excluded in Stage 1: {screening_result.get('reason')}")
+            return screening_result
+        
+        extraction_result = fused.get("extraction")
+        if not isinstance(extraction_result, dict) or not isinstance(fused.get("amstar_2_assessment"), dict):
+            return None
+        extraction_result["amstar_2_assessment"] = fused["amstar_2_assessment"]
+        return self._finalize(extraction_result, pdf_path)
+
+    def _prescreening_prompt(self) -> str:
+        # Use loaded prompt or fallback (though fallback is removed for brevity, assume config is correct)
+        return self.prescreening_prompt if self.prescreening_prompt else """
+        You are an expert SLR assistant. Analyze the attached paper based on our protocol.
+        Decide if this paper should be INCLUDED or EXCLUDED. Provide a brief reason.
+        Output Format (JSON ONLY): {"screening_decision": "INCLUDE" or "EXCLUDE", "reason": "..."}
+        """
+
+    def _extraction_prompt(self) -> str:
+        return self.extraction_prompt if self.extraction_prompt else """
+        You are an expert SLR data extractor. Extract comprehensive, structured data.
+        """
+
     AMSTAR_2_ITEMS = [
         "PICO components in research question",
         "Study design selection criteria",
@@ -142,9 +220,19 @@ class SLRExtractor:
         "Conflict of interest in review"
     ]
 
-    def _run_amstar_assessment(self, uploaded_file) -> Dict:
-        logging.info("  [Quality] Running AMSTAR 2 Assessment...")
-        prompt = f"""
+    @staticmethod
+    def _upload_pdf(pdf_path: str):
+        f = genai.upload_file(pdf_path)
+        # Wait for processing
+        while f.state.name == "PROCESSING":
+            time.sleep(2)
+            f = genai.get_file(f.name)
+        if f.state.name == "FAILED":
+            raise ValueError(f"File processing failed: {f.state.name}")
+        return f
+
+    def _amstar_instructions(self) -> str:
+        return f"""
         You are a Quality Assurance Auditor. Assess the attached paper using the AMSTAR 2 checklist.
         Note: If this is a PRIMARY STUDY (not a review), some items may be 'NOT APPLICABLE'.
         
@@ -161,12 +249,11 @@ class SLRExtractor:
             "overall_score": "HIGH / MODERATE / LOW / CRITICALLY LOW"
         }}
         """
+
+    def _run_amstar_assessment(self, paper_content) -> Dict:
+        logging.info("  [Quality] Running AMSTAR 2 Assessment...")
         try:
-            response = self.model.generate_content([prompt, uploaded_file])
-            text = response.text.strip()
-            if text.startswith("```json"):
-                text = text[7:-3]
-            return json.loads(text)
+            return self._parse_json(self._generate([self._amstar_instructions(), paper_content]))
         except Exception as e:
             logging.error(f"  AMSTAR Assessment failed: {e}")
             return {"error": str(e)}
@@ -198,3 +285,36 @@ class SLRExtractor:
         if not data.get("Year"): errors.append("Missing Year")
         
         return errors
+
+    @staticmethod
+    def _flatten(data: Any, prefix: str = "") -> Dict[str, Any]:
+        """Flattens nested dicts/lists into 'a.b.0.c' keys with short leaf values only."""
+        flat = {}
+        if isinstance(data, dict):
+            for key, value in data.items():
+                flat.update(SLRExtractor._flatten(value, f"{prefix}{key}."))
+        elif isinstance(data, list):
+            for i, value in enumerate(data):
+                flat.update(SLRExtractor._flatten(value, f"{prefix}{i}."))
+        elif not (isinstance(data, str) and len(data) > 40):  # Free text wording always differs
+            flat[prefix.rstrip(".")] = data
+        return flat
+
+    @staticmethod
+    def field_agreement(result_a: Dict, result_b: Dict) -> float:
+        """Share of comparable fields (categorical and numeric leaves) on which two extractions agree."""
+        ignore = ("validation_errors", "reason", "justification")
+        flat_a = {k: v for k, v in SLRExtractor._flatten(result_a).items() if not any(i in k for i in ignore)}
+        flat_b = {k: v for k, v in SLRExtractor._flatten(result_b).items() if not any(i in k for i in ignore)}
+        keys = set(flat_a) | set(flat_b)
+        if not keys:
+            return 1.0
+
+        def same(a, b):
+            try:
+                return abs(float(str(a).replace("%", "")) - float(str(b).replace("%", ""))) < 1e-6
+            except (TypeError, ValueError):
+                return str(a).strip().lower() == str(b).strip().lower()
+
+        matches = sum(1 for k in keys if k in flat_a and k in flat_b and same(flat_a[k], flat_b[k]))
+        return matches / len(keys)
@@ -0,0 +1,187 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Tuple
+from matplotlib import colormaps
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+MANIFEST_FILE = ".figure_cache.json"
+FORMATS = ("png", "svg", "pdf")
+# Bump when a drawing function changes, so existing figures are re-rendered
+RENDERER_VERSION = 1
+
+def draw_prisma_flow(data: Dict[str, Any]) -> Figure:
+    """PRISMA 2020 flow diagram from {"counts": [identified, screened, assessed, included]}."""
+    identified, screened, assessed, included = data["counts"]
+    fig = Figure(figsize=(8, 10))
+    ax = fig.add_subplot()
+    boxes = [
+        {"y": 9, "text": f"Records identified\n(n={identified})", "color": "#E8F4F8"},
+        {"y": 7.5, "text": f"Records screened\n(n={screened})", "color": "#E8F4F8"},
+        {"y": 6, "text": f"Full-text assessed\n(n={assessed})", "color": "#E8F4F8"},
+        {"y": 4.5, "text": f"Studies included\n(n={included})", "color": "#C8E6C9"}
+    ]
+    for box in boxes:
+        ax.add_patch(Rectangle((1, box["y"]-0.4), 3, 0.8, facecolor=box["color"], edgecolor="black", linewidth=2))
+        ax.text(2.5, box["y"], box["text"], ha="center", va="center", fontsize=10, weight="bold")
+    for i in range(len(boxes)-1):
+        ax.arrow(2.5, boxes[i]["y"]-0.5, 0, -0.4, head_width=0.2, head_length=0.1, fc="black", ec="black")
+    ax.set_xlim(0, 5)
+    ax.set_ylim(3, 10)
+    ax.axis("off")
+    fig.tight_layout()
+    return fig
+
+def draw_table(data: Dict[str, Any]) -> Figure:
+    """Table figure from {"columns": [...], "rows": [[...], ...]}."""
+    fig = Figure(figsize=(12, 6))
+    ax = fig.add_subplot()
+    ax.axis("tight")
+    ax.axis("off")
+    table = ax.table(cellText=data["rows"], colLabels=data["columns"], cellLoc="center", loc="center",
+                     colWidths=[0.2] * len(data["columns"]))
+    table.auto_set_font_size(False)
+    table.set_fontsize(10)
+    table.scale(1, 2)
+    return fig
+
+def draw_bar_chart(data: Dict[str, Any]) -> Figure:
+    """
+    Bar chart from {"labels", "counts", "title", "xlabel", "ylabel"}; optional
+    "horizontal" (largest bar on top) and "cmap" (one color per bar instead of a flat fill).
+    """
+    horizontal = data.get("horizontal", False)
+    fig = Figure(figsize=(12, 8) if horizontal else (10, 6))
+    ax = fig.add_subplot()
+    labels, counts = [str(label) for label in data["labels"]], data["counts"]
+    colors = _palette(data["cmap"], len(counts)) if data.get("cmap") else ["skyblue"] * len(counts)
+    if horizontal:
+        ax.barh(labels[::-1], counts[::-1], color=colors[::-1], edgecolor="black")
+        ax.grid(axis="x", linestyle="--", alpha=0.7)
+    else:
+        ax.bar(labels, counts, color=colors, edgecolor="black")
+        ax.tick_params(axis="x", labelrotation=90 if len(labels) > 8 else 0)
+        ax.grid(axis="y", linestyle="--", alpha=0.7)
+    ax.set_axisbelow(True)
+    ax.set_title(data["title"], fontsize=14)
+    ax.set_xlabel(data.get("xlabel", ""), fontsize=12)
+    ax.set_ylabel(data.get("ylabel", ""), fontsize=12)
+    fig.tight_layout()
+    return fig
+
+def draw_pie_chart(data: Dict[str, Any]) -> Figure:
+    """Pie chart from {"labels", "counts", "title"}."""
+    fig = Figure(figsize=(8, 8))
+    ax = fig.add_subplot()
+    ax.pie(data["counts"], labels=data["labels"], autopct="%1.1f%%", startangle=140,
+           colors=_palette(data.get("cmap", "Pastel1"), len(data["counts"])))
+    ax.set_title(data["title"], fontsize=16)
+    fig.tight_layout()
+    return fig
+
+def _palette(name: str, n: int) -> List:
+    cmap = colormaps[name]
+    if cmap.N < 256:
+        # Qualitative maps: cycle through their colors
+        return [cmap(i % cmap.N) for i in range(n)]
+    return [cmap(0.15 + 0.7 * i / max(1, n - 1)) for i in range(n)]
+
+DRAWERS: Dict[str, Callable[[Dict[str, Any]], Figure]] = {
+    "prisma_flow": draw_prisma_flow,
+    "table": draw_table,
+    "bar": draw_bar_chart,
+    "pie": draw_pie_chart,
+}
+
+def _render(kind: str, data: Dict[str, Any], path: str, dpi: int) -> str:
+    """Draws and saves one figure. Runs in a worker process, so it only touches its own Figure."""
+    fig = DRAWERS[kind](data)
+    FigureCanvasAgg(fig)
+    fig.savefig(path, dpi=dpi, bbox_inches="tight")
+    return path
+
+class FigureRenderer:
+    """
+    Renders figures from plain JSON-serializable input data, skipping those that are up to date.
+
+    Each figure is identified by its file name; a manifest in the output directory
+    stores the hash of the inputs (drawing function, data, format, DPI) it was last
+    rendered from. Figures whose hash is unchanged and whose file exists are skipped;
+    the stale ones are rendered in a process pool, each on its own `Figure` with the
+    Agg canvas rather than through pyplot's global state.
+
+    `fmt` may be "png" (raster, at `dpi`) or a vector format ("svg", "pdf"), which
+    renders faster, stays sharp in print and ignores the DPI.
+    """
+
+    def __init__(self, output_dir: str = "images", fmt: str = "png", dpi: int = 300, max_workers: int = None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported figure format '{fmt}' (expected one of {', '.join(FORMATS)})")
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.dpi = dpi
+        self.max_workers = max_workers
+        os.makedirs(output_dir, exist_ok=True)
+        self.manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+        self.manifest: Dict[str, str] = {}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r") as f:
+                    self.manifest = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                pass
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.output_dir, f"{name}.{self.fmt}")
+
+    def figure_hash(self, kind: str, data: Dict[str, Any]) -> str:
+        # The DPI only matters for raster output
+        dpi = self.dpi if self.fmt == "png" else None
+        payload = json.dumps([RENDERER_VERSION, kind, self.fmt, dpi, data], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_current(self, name: str, kind: str, data: Dict[str, Any]) -> bool:
+        path = self.path(name)
+        return self.manifest.get(os.path.basename(path)) == self.figure_hash(kind, data) and os.path.exists(path)
+
+    def render(self, figures: Dict[str, Tuple[str, Dict[str, Any]]]) -> Dict[str, str]:
+        """
+        Renders {name: (kind, data)} where stale. Returns {name: path} for every
+        figure, whether it was rendered now or was already up to date.
+        """
+        paths = {name: self.path(name) for name in figures}
+        stale = [name for name, (kind, data) in figures.items() if not self.is_current(name, kind, data)]
+        for name in figures:
+            if name not in stale:
+                print(f"Figure up to date: {paths[name]}")
+        if not stale:
+            return paths
+
+        jobs = [(figures[name][0], figures[name][1], paths[name], self.dpi) for name in stale]
+        if len(jobs) == 1 or self.max_workers == 1:
+            rendered = [_render(*job) for job in jobs]
+        else:
+            try:
+                with ProcessPoolExecutor(max_workers=min(len(jobs), self.max_workers or os.cpu_count() or 1)) as pool:
+                    rendered = list(pool.map(_render, *zip(*jobs)))
+            except (BrokenProcessPool, OSError) as e:
+                # Sandboxes without multiprocessing support
+                print(f"Process pool unavailable ({e}), rendering figures serially.")
+                rendered = [_render(*job) for job in jobs]
+
+        for name, path in zip(stale, rendered):
+            kind, data = figures[name]
+            self.manifest[os.path.basename(path)] = self.figure_hash(kind, data)
+            print(f"Generated figure: {path}")
+        self._save()
+        return paths
+
+    def _save(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
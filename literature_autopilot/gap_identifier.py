@@ -1,44 +1,44 @@
-from typing import List, Dict, Any
-from collections import Counter
+from typing import List, Dict, Any, Union
+from literature_autopilot.evidence_table import BENCHMARKS, MODEL_ALIASES, EvidenceTable
 
 class GapIdentifier:
     """Identify literature gaps and suggest future research directions."""
     
-    def __init__(self, extracted_data: List[Dict[str, Any]]):
-        self.data = extracted_data
+    def __init__(self, extracted_data: Union[EvidenceTable, List[Dict[str, Any]]]):
+        self.table = EvidenceTable.of(extracted_data)
+        self.data = self.table.data
+
+    def _table_for(self, extracted_data) -> EvidenceTable:
+        return self.table if extracted_data is None or extracted_data is self.data else EvidenceTable.of(extracted_data)
         
     def identify_gaps(self) -> Dict[str, Any]:
         """Analyze data to find gaps."""
         
         # 1. Mechanism Distribution
-        mechanisms = [d.get("methodological_differences", {}).get("mechanism_type", "Unknown") for d in self.data]
-        mech_counts = Counter(mechanisms)
+        mech_counts = self.table.papers["mechanism"].value_counts()
         
         # 2. Task/Domain Coverage
-        tasks = []
-        for d in self.data:
-            tasks.extend(d.get("improvements", {}).get("evaluation_setup", {}).get("tasks_and_domains", []))
-        task_counts = Counter(tasks)
+        task_counts = self.table.domains["task"].value_counts()
         
         # 3. Identify Under-explored Areas
         gaps = []
         
         # Check for under-represented mechanisms
-        total_papers = len(self.data)
+        total_papers = len(self.table)
         if total_papers > 0:
-            for mech, count in mech_counts.items():
-                if count / total_papers < 0.2: # Less than 20% representation
-                    gaps.append(f"Mechanism '{mech}' is under-explored (only {count} papers).")
+            for mech, count in mech_counts[mech_counts / total_papers < 0.2].items(): # Less than 20% representation
+                gaps.append(f"Mechanism '{mech}' is under-explored (only {count} papers).")
             
-            # Check for missing common tasks (simple heuristic)
-            common_benchmarks = ["GSM8K", "MATH", "HumanEval", "MMLU"]
-            for bench in common_benchmarks:
-                if not any(bench.lower() in t.lower() for t in tasks):
+            # Check for missing common tasks
+            mentions = self.table.benchmark_mentions
+            covered = set(mentions.loc[mentions["source"] == "domain", "benchmark"])
+            for bench in ["GSM8K", "MATH", "HumanEval", "MMLU"]:
+                if bench not in covered:
                     gaps.append(f"Benchmark '{bench}' is missing from the evaluated tasks.")
                     
         return {
-            "mechanism_distribution": dict(mech_counts),
-            "task_distribution": dict(task_counts),
+            "mechanism_distribution": {k: int(v) for k, v in mech_counts.items()},
+            "task_distribution": {k: int(v) for k, v in task_counts.items()},
             "identified_gaps": gaps
         }
 
@@ -47,47 +47,15 @@ class GapIdentifier:
         # Placeholder for more detailed analysis if needed
         return []
 
-    def identify_task_coverage_gaps(self, extracted_data):
+    def identify_task_coverage_gaps(self, extracted_data=None):
         """Welche Aufgaben sind unterrepräsentiert?"""
-        common_benchmarks = {
-            "GSM8K": "Math reasoning",
-            "MATH": "Math competition",
-            "HumanEval": "Code generation",
-            "MMLU": "General knowledge",
-            "TruthfulQA": "Factuality",
-            "HellaSwag": "Common sense",
-            "ARC": "Science reasoning"
-        }
-        
-        covered_benchmarks = set()
-        for paper in extracted_data:
-            tasks = paper.get("improvements", {}).get("baseline_comparisons", [])
-            for task in tasks:
-                task_name = task.get("task", "")
-                for bench in common_benchmarks:
-                    if bench.lower() in task_name.lower():
-                        covered_benchmarks.add(bench)
-        
-        gaps = {bench: info for bench, info in common_benchmarks.items() 
-               if bench not in covered_benchmarks}
-        
-        return gaps
+        covered_benchmarks = self._table_for(extracted_data).covered_benchmarks()
+        return {bench: info for bench, info in BENCHMARKS.items() if bench not in covered_benchmarks}
     
-    def identify_model_coverage_gaps(self, extracted_data):
+    def identify_model_coverage_gaps(self, extracted_data=None):
         """Welche Modelle sind unterrepräsentiert?"""
-        common_models = ["GPT-3", "GPT-4", "Claude", "LLaMA", "Mistral", "PaLM"]
-        covered_models = set()
-        
-        for paper in extracted_data:
-            baseline = paper.get("improvements", {}).get("baseline_comparisons", [])
-            for comp in baseline:
-                model = comp.get("baseline_model", "")
-                for cm in common_models:
-                    if cm.lower() in model.lower():
-                        covered_models.add(cm)
-        
-        gaps = [m for m in common_models if m not in covered_models]
-        return gaps
+        covered_models = self._table_for(extracted_data).covered_models()
+        return [m for m in MODEL_ALIASES if m not in covered_models]
 
     def generate_gap_report(self) -> str:
         """Generate a markdown report of identified gaps."""
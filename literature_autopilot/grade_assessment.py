@@ -1,8 +1,19 @@
 from typing import Dict, Any
+from literature_autopilot.evidence_synthesis import EvidenceSynthesis
+from literature_autopilot.evidence_table import EvidenceTable
 
 class GRADEAssessment:
     """Assess certainty of evidence using GRADE framework."""
     
+    # Inconsistency: substantial heterogeneity (Cochrane Handbook: I² above 50%)
+    I2_THRESHOLD = 0.5
+    # Without reported sample sizes I² is not meaningful; inconsistent if fewer studies than this agree on the direction
+    DIRECTION_THRESHOLD = 0.75
+    # Imprecision: fewer comparisons than this cannot support a precise estimate
+    MIN_COMPARISONS = 10
+    # Imprecision: CIs only count if the sample size is known for at least this share of comparisons
+    MIN_REPORTED_N_SHARE = 0.5
+    
     @staticmethod
     def assess_certainty(study_quality: str, consistency: str = "CONSISTENT", 
                         directness: str = "DIRECT", precision: str = "PRECISE") -> Dict[str, Any]:
@@ -81,50 +92,105 @@ class GRADEAssessment:
         return summary
 
     @classmethod
-    def assess_certainty_comprehensive(cls, studies_data: list) -> Dict[str, Any]:
+    def assess_certainty_comprehensive(cls, studies_data, outcome: str = "Overall") -> Dict[str, Any]:
+        """
+        Comprehensive GRADE assessment based on a list of studies (or an EvidenceTable).
+        Inconsistency and imprecision come from the pooled baseline comparisons.
         """
-        Comprehensive GRADE assessment based on a list of studies.
+        table = EvidenceTable.of(studies_data)
+        return cls._assess_outcome(outcome, cls.assess_risk_of_bias(table), EvidenceSynthesis(table).overall(), table)
+
+    @classmethod
+    def assess_by_mechanism(cls, studies_data) -> list:
         """
-        rob = cls.assess_risk_of_bias(studies_data)
-        inconsistency = cls.assess_inconsistency(studies_data)
-        indirectness = cls.assess_indirectness(studies_data)
-        imprecision = cls.assess_imprecision(studies_data)
+        One GRADE assessment for all studies, then one per mechanism type. Risk of
+        bias is a groupby over the papers and the pooling runs once for all mechanisms.
+        """
+        table = EvidenceTable.of(studies_data)
+        synthesis = EvidenceSynthesis(table)
+        assessments = [cls._assess_outcome("Overall", cls.assess_risk_of_bias(table), synthesis.overall(), table)]
+        low_quality_share = table.papers.groupby("mechanism")["low_quality"].mean()
+        if len(low_quality_share) > 1:
+            pooled = {r["mechanism"]: r for r in synthesis.pool(by=("mechanism",))}
+            for mechanism, share in low_quality_share.items():
+                assessments.append(cls._assess_outcome(mechanism, cls._risk_from_share(share), pooled.get(mechanism), table))
+        return assessments
+
+    @classmethod
+    def _assess_outcome(cls, outcome: str, rob: str, pooled: Dict[str, Any], table) -> Dict[str, Any]:
+        inconsistency = cls.assess_inconsistency(table, pooled)
+        indirectness = cls.assess_indirectness(table)
+        imprecision = cls.assess_imprecision(table, pooled)
         
         # Map to assess_certainty args
         # Risk of Bias HIGH -> Low Quality
         quality_map = {"HIGH": "LOW", "LOW": "HIGH", "UNKNOWN": "MEDIUM"}
         
-        return cls.assess_certainty(
+        result = cls.assess_certainty(
             study_quality=quality_map.get(rob, "MEDIUM"),
             consistency="INCONSISTENT" if inconsistency == "HIGH" else "CONSISTENT",
             directness="INDIRECT" if indirectness == "HIGH" else "DIRECT",
             precision="IMPRECISE" if imprecision == "HIGH" else "PRECISE"
         )
+        result["outcome"] = outcome
+        result["synthesis"] = pooled
+        if pooled:
+            # Report the numbers behind the downgrades
+            n_known = pooled["n_reported_share"] >= cls.MIN_REPORTED_N_SHARE
+            details = {
+                "Inconsistent results across studies": (
+                    f"I² = {pooled['i2'] * 100:.0f}%" if n_known
+                    else f"{pooled['direction_agreement'] * 100:.0f}% of studies agree on the direction"
+                ),
+                "Imprecise results (small sample/wide CI)": (
+                    f"k = {pooled['k']}, 95% CI {pooled['bootstrap_low_percent']:+.1f}% to {pooled['bootstrap_high_percent']:+.1f}%"
+                    if n_known else f"k = {pooled['k']}, sample sizes not reported"
+                ),
+            }
+            result["reasons"] = [f"{r} ({details[r]})" if r in details else r for r in result["reasons"]]
+        return result
 
     @staticmethod
-    def assess_risk_of_bias(studies_data):
-        low_quality_count = 0
-        for s in studies_data:
-            score = s.get("amstar_2_assessment", {}).get("overall_score", "UNKNOWN")
-            if score in ["LOW", "CRITICALLY LOW"]:
-                low_quality_count += 1
-        
-        if not studies_data: return "UNKNOWN"
-        if low_quality_count / len(studies_data) > 0.5:
-            return "HIGH"
-        return "LOW"
+    def _risk_from_share(low_quality_share: float) -> str:
+        return "HIGH" if low_quality_share > 0.5 else "LOW"
 
-    @staticmethod
-    def assess_inconsistency(studies_data):
-        # Placeholder: Check for conflicting results if available
-        return "LOW"
+    @classmethod
+    def assess_risk_of_bias(cls, studies_data):
+        """HIGH if more than half of the studies have a LOW or CRITICALLY LOW AMSTAR 2 rating."""
+        papers = EvidenceTable.of(studies_data).papers
+        if papers.empty: return "UNKNOWN"
+        return cls._risk_from_share(papers["low_quality"].mean())
+
+    @classmethod
+    def assess_inconsistency(cls, studies_data, pooled: Dict[str, Any] = None):
+        """
+        HIGH if the pooled improvements are substantially heterogeneous (I² > 50%).
+        I² relies on within-study variances, so when most sample sizes are unknown
+        it is HIGH instead if too few studies agree on the direction of the effect.
+        """
+        if pooled is None:
+            pooled = EvidenceSynthesis(studies_data, n_bootstrap=0).overall()
+        if not pooled or pooled["n_studies"] < 2:
+            return "UNKNOWN"
+        if pooled["n_reported_share"] < cls.MIN_REPORTED_N_SHARE:
+            return "HIGH" if pooled["direction_agreement"] < cls.DIRECTION_THRESHOLD else "LOW"
+        return "HIGH" if pooled["i2"] > cls.I2_THRESHOLD else "LOW"
 
     @staticmethod
     def assess_indirectness(studies_data):
         # Placeholder
         return "LOW"
 
-    @staticmethod
-    def assess_imprecision(studies_data):
-        # Placeholder
-        return "LOW"
+    @classmethod
+    def assess_imprecision(cls, studies_data, pooled: Dict[str, Any] = None):
+        """
+        HIGH with too few comparisons, mostly unknown sample sizes (the CI would
+        rest on an assumed n) or a bootstrap CI that includes no improvement.
+        """
+        if pooled is None:
+            pooled = EvidenceSynthesis(studies_data).overall()
+        if not pooled or pooled["k"] < cls.MIN_COMPARISONS:
+            return "HIGH"
+        if pooled["n_reported_share"] < cls.MIN_REPORTED_N_SHARE:
+            return "HIGH"
+        return "HIGH" if pooled["bootstrap_low_percent"] <= 0 else "LOW"
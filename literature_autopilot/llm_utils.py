@@ -1,5 +1,6 @@
 import os
 import time
+import threading
 import google.generativeai as genai
 from google.api_core import exceptions
 
@@ -40,6 +41,7 @@ class RotatableModel:
     def __init__(self, model_name: str):
         self.model_name = model_name
         self.key_index = 0
+        self._rotation_lock = threading.Lock()
         self.configure_current_key()
 
     def configure_current_key(self):
@@ -51,10 +53,17 @@ class RotatableModel:
         genai.configure(api_key=current_key)
         self.model = genai.GenerativeModel(self.model_name)
 
-    def rotate_key(self):
-        self.key_index = (self.key_index + 1) % len(GEMINI_KEYS)
-        print(f"  [LLM] ⚠️ Quota exceeded. Rotating to Gemini Key #{self.key_index + 1}...")
-        self.configure_current_key()
+    def rotate_key(self, failed_index: int = None):
+        """
+        Switch to the next key. When several threads hit the quota on the same key,
+        only the first one rotates (the others pass the index they failed on).
+        """
+        with self._rotation_lock:
+            if failed_index is not None and failed_index != self.key_index:
+                return  # Another thread already rotated away from the exhausted key
+            self.key_index = (self.key_index + 1) % len(GEMINI_KEYS)
+            print(f"  [LLM] ⚠️ Quota exceeded. Rotating to Gemini Key #{self.key_index + 1}...")
+            self.configure_current_key()
 
     def generate_content(self, prompt, **kwargs):
         """
@@ -63,15 +72,16 @@ class RotatableModel:
         max_retries = len(GEMINI_KEYS) * 2 # Try cycling through keys twice
         
         for attempt in range(max_retries):
+            key_index = self.key_index
             try:
                 return self.model.generate_content(prompt, **kwargs)
             except exceptions.ResourceExhausted:
-                self.rotate_key()
+                self.rotate_key(failed_index=key_index)
                 time.sleep(2) # Brief pause after rotation
             except Exception as e:
                 # If it's a 429 but not caught by ResourceExhausted (sometimes happens)
                 if "429" in str(e) or "quota" in str(e).lower():
-                    self.rotate_key()
+                    self.rotate_key(failed_index=key_index)
                     time.sleep(2)
                 else:
                     raise e # Re-raise other errors
@@ -1,7 +1,13 @@
+import re
 import json
 import os
-from typing import Dict, Tuple
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
 from literature_autopilot.llm_utils import RotatableModel
+from literature_autopilot.context_manager import ContextManager
+from literature_autopilot.edit_ops import EDIT_FORMAT_INSTRUCTIONS, edit_or_rewrite
+from literature_autopilot.prisma_checker import PrismaChecker
 
 class MCPFinalReviewer:
     """
@@ -10,17 +16,233 @@ class MCPFinalReviewer:
     Now includes convergence analysis and targeted patching.
     """
     
-    def __init__(self, model_name: str = "gemini-1.5-pro-latest"):
+    # Map-reduce review: fixed prompt + per-chunk JSON output that every chunk pays again
+    CHUNK_OVERHEAD_TOKENS = 2500
+    CHUNK_SIZE_CHARS = 50000  # ~12.5k tokens per chunk
+    SEVERITY_ORDER = {"CRITICAL": 0, "MAJOR": 1, "MINOR": 2}
+    
+    REVIEW_CACHE_FILE = ".mcp_review_cache.json"
+    HISTORY_FILE = ".mcp_review_history.json"
+    MAX_CACHED_REVIEWS = 20
+    MAX_HISTORY_ENTRIES = 20
+    
+    def __init__(self, model_name: str = "gemini-1.5-pro-latest", edit_mode: str = "patch",
+                 review_mode: str = "auto", single_call_max_tokens: int = 30000,
+                 plateau_window: int = 3, min_improvement: float = 1.0):
         self.model = RotatableModel(model_name)
+        self.edit_mode = edit_mode  # "patch" (anchored edit operations) or "rewrite" (full paper)
+        self.review_mode = review_mode  # "full", "chunked" or "auto" (see _review_chunks)
+        self.single_call_max_tokens = single_call_max_tokens
         self.max_iterations = 5
         self.quality_threshold = 90  # 0-100 scale
-        self.quality_history = []  # Track scores over iterations
+        self.quality_history = []  # Track scores over iterations (continued by the next run, see _load_history)
+        self.history = []  # [{"paper_hash", "score"}], persisted to HISTORY_FILE
+        # Plateau: the last `plateau_window` reviews gained less than `min_improvement` over the best before them
+        self.plateau_window = plateau_window
+        self.min_improvement = min_improvement
+        self.review_cache = self._load_json(self.REVIEW_CACHE_FILE, {})
+        self.prisma_checker = None  # Created on first use, caches results per section
     
+    @staticmethod
+    def paper_hash(paper_text: str) -> str:
+        return hashlib.sha256(paper_text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _load_json(path: str, default):
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"  Could not read {path}: {e}")
+        return default
+
+    @staticmethod
+    def _save_json(path: str, data):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _load_history(self, paper_text: str):
+        """
+        Continues the persisted score history only if this paper is the last one an
+        earlier run reviewed (i.e. its output); any other draft starts a fresh history,
+        so plateau checks never judge scores of a different chain of revisions.
+        """
+        history = self._load_json(self.HISTORY_FILE, [])
+        if history and history[-1]["paper_hash"] == self.paper_hash(paper_text):
+            self.history = history
+            print(f"  [Review] Continuing review history ({len(history)} earlier reviews).")
+        else:
+            self.history = []
+        self.quality_history = [entry["score"] for entry in self.history]
+
+    def _record_score(self, key: str, review: Dict):
+        if self.history and self.history[-1]["paper_hash"] == key:
+            return  # Same paper as the last review, nothing new to learn
+        self.history.append({"paper_hash": key, "score": review.get("overall_quality_score", 0)})
+        self.quality_history.append(self.history[-1]["score"])
+        # The plateau check only looks at recent scores of this chain
+        self._save_json(self.HISTORY_FILE, self.history[-self.MAX_HISTORY_ENTRIES:])
+
+    def review_paper(self, paper_text: str, focus_areas: list = None) -> Dict:
+        """
+        Memoized review_paper_via_mcp: an unchanged paper is never reviewed twice.
+        Successful fresh reviews are cached; every review (cached or fresh) extends
+        the score history of the current revision chain.
+        """
+        key = self.paper_hash(paper_text)
+        if key in self.review_cache:
+            print("  [Review] Paper unchanged since its last review. Using the cached review.")
+            review = self.review_cache[key]
+            self._record_score(key, review)
+            return review
+        review = self.review_paper_via_mcp(paper_text, focus_areas=focus_areas)
+        if "error" in review:
+            return review
+        self.review_cache[key] = review
+        # Keep the most recent reviews only
+        for old_key in list(self.review_cache)[:-self.MAX_CACHED_REVIEWS]:
+            del self.review_cache[old_key]
+        self._save_json(self.REVIEW_CACHE_FILE, self.review_cache)
+        self._record_score(key, review)
+        return review
+
+    def is_plateau(self) -> bool:
+        """
+        True if the last `plateau_window` scores did not beat the best earlier score by
+        `min_improvement`. Only scores of the current revision chain count (see _load_history).
+        """
+        scores = self.quality_history
+        if len(scores) <= self.plateau_window:
+            return False
+        return max(scores[-self.plateau_window:]) < max(scores[:-self.plateau_window]) + self.min_improvement
+    
+    def _review_chunks(self, paper_text: str) -> List[str]:
+        """
+        Decides between one full-context call and a map-reduce over header-based chunks.
+        Returns the chunks to review; a single chunk means one full-context call.
+        
+        Chunking repeats the prompt and the JSON output per chunk, so it only pays off
+        for long papers: the paper must exceed `single_call_max_tokens` and the repeated
+        overhead must stay below a quarter of the paper's own tokens. In exchange the
+        chunks run in parallel and each call stays in the range where long-context
+        recall is reliable.
+        """
+        if self.review_mode == "full":
+            return [paper_text]
+        chunks = ContextManager.chunk_paper_for_review(paper_text, chunk_size=self.CHUNK_SIZE_CHARS)
+        if self.review_mode == "chunked":
+            return chunks
+        paper_tokens = ContextManager.estimate_tokens(paper_text)
+        extra_tokens = (len(chunks) - 1) * self.CHUNK_OVERHEAD_TOKENS
+        if len(chunks) < 2 or paper_tokens <= self.single_call_max_tokens or extra_tokens > paper_tokens / 4:
+            return [paper_text]
+        return chunks
+
+    @staticmethod
+    def _paper_outline(paper_text: str) -> str:
+        return "\n".join(f"{'  ' * (s['level'] - 1)}- {s['heading']}" for s in ContextManager.split_by_headings(paper_text) if s["heading"])
+
+    @staticmethod
+    def _parse_json(text: str) -> Dict:
+        text = text.strip()
+        if "```json" in text:
+            text = text.split("```json")[1].split("```")[0]
+        return json.loads(text)
+
+    def _review_chunk(self, chunk: str, index: int, total: int, outline: str, focus_instruction: str) -> Dict:
+        prompt = f"""
+        You are an expert academic reviewer and editor. You are reviewing PART {index + 1} of {total} of a 50-page 
+        Systematic Literature Review on "LLM Self-Improvement". Other reviewers cover the other parts.
+        
+        **OUTLINE OF THE WHOLE PAPER** (for orientation only):
+        {outline}
+        
+        **EVALUATION CRITERIA** (for this part only):
+        1. PRISMA 2020 Compliance of the content in this part
+        2. A+ Publication Standards (top-tier venue)
+        3. Depth of Analysis (not just summarization)
+        4. Methodological Rigor
+        5. Academic Writing Quality
+        6. Citation Quality and Completeness
+        7. Clarity and Precision
+        
+        Do NOT report content as missing if the outline shows it belongs to another part.
+        {focus_instruction}
+        
+        **PART TO REVIEW**:
+        {chunk}
+        
+        **Output Format (JSON ONLY)**:
+        {{
+          "quality_score": 0-100,
+          "strengths": ["..."],
+          "weaknesses": [
+            {{"area": "Section or aspect", "severity": "CRITICAL / MAJOR / MINOR", "issue": "...", "impact": "...", "suggestion": "..."}}
+          ],
+          "priority_improvements": ["..."]
+        }}
+        """
+        try:
+            return self._parse_json(self.model.generate_content(prompt).text)
+        except Exception as e:
+            print(f"    Review of part {index + 1}/{total} failed: {e}")
+            return {"error": str(e)}
+
+    def _merge_chunk_reviews(self, chunks: List[str], reviews: List[Dict]) -> Dict:
+        """Reduces per-chunk reviews into the full-review structure."""
+        scored = [(len(c), r) for c, r in zip(chunks, reviews) if "error" not in r]
+        if not scored:
+            return {"overall_quality_score": 0, "error": "All chunk reviews failed"}
+        # Longer parts weigh more in the overall score
+        total_length = sum(length for length, _ in scored)
+        score = round(sum(length * float(r.get("quality_score", 0)) for length, r in scored) / total_length)
+        
+        weaknesses, seen = [], set()
+        for _, review in scored:
+            for w in review.get("weaknesses", []):
+                key = (str(w.get("area", "")).lower(), str(w.get("issue", "")).lower()[:80])
+                if key not in seen:
+                    seen.add(key)
+                    weaknesses.append(w)
+        weaknesses.sort(key=lambda w: self.SEVERITY_ORDER.get(w.get("severity"), 3))
+        strengths = list(dict.fromkeys(s for _, r in scored for s in r.get("strengths", [])))
+        priorities = list(dict.fromkeys(
+            [w.get("suggestion") for w in weaknesses if w.get("severity") == "CRITICAL" and w.get("suggestion")]
+            + [p for _, r in scored for p in r.get("priority_improvements", [])]
+        ))
+        has_critical = any(w.get("severity") == "CRITICAL" for w in weaknesses)
+        return {
+            "overall_quality_score": score,
+            "strengths": strengths,
+            "weaknesses": weaknesses,
+            "convergence_assessment": {
+                "is_converged": score >= self.quality_threshold and not has_critical,
+                "reason": f"Merged from {len(scored)}/{len(chunks)} part reviews" + (" with critical issues" if has_critical else ""),
+                "next_steps": priorities[0] if priorities else ""
+            },
+            "priority_improvements": priorities[:5],
+            "review_mode": "chunked",
+            "chunk_scores": [r.get("quality_score") for _, r in scored]
+        }
+
     def review_paper_via_mcp(self, paper_text: str, focus_areas: list = None) -> Dict:
         """
         Send paper to Manus via MCP for comprehensive review.
+        Long papers are reviewed as header-based chunks in parallel and merged locally.
         """
         
+        chunks = self._review_chunks(paper_text)
+        if len(chunks) > 1:
+            print(f"  [Review] Reviewing {len(chunks)} parts in parallel...")
+            focus = f"\n        PLEASE FOCUS ON: {', '.join(focus_areas)}" if focus_areas else ""
+            outline = self._paper_outline(paper_text)
+            with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+                reviews = list(pool.map(lambda item: self._review_chunk(item[1], item[0], len(chunks), outline, focus), enumerate(chunks)))
+            return self._merge_chunk_reviews(chunks, reviews)
+        
         focus_instruction = ""
         if focus_areas:
             focus_instruction = f"\n\nPLEASE FOCUS ON: {', '.join(focus_areas)}"
@@ -144,44 +366,148 @@ class MCPFinalReviewer:
         
         return "FULL_REWRITE"  # Too many issues, rewrite
 
-            return response.text.strip()
-        except Exception as e:
-            print(f"Error during rewriting: {e}")
-            return paper
+    # Review areas -> words that appear in the headings of the sections they concern
+    AREA_SECTION_ALIASES = {
+        "abstract": ["abstract"],
+        "introduction": ["introduction"],
+        "motivation": ["introduction", "motivation"],
+        "research question": ["introduction", "research question"],
+        "method": ["methodology", "method"],
+        "prisma": ["methodology"],
+        "search": ["methodology", "search"],
+        "screening": ["methodology", "selection"],
+        "eligibility": ["methodology", "criteria"],
+        "extraction": ["methodology", "extraction"],
+        "quality assessment": ["methodology", "quality"],
+        "risk of bias": ["methodology", "quality"],
+        "result": ["analysis", "result"],
+        "analysis": ["analysis"],
+        "mechanism": ["analysis"],
+        "quantif": ["analysis", "result"],
+        "synthesis": ["analysis", "synthesis"],
+        "discussion": ["discussion"],
+        "limitation": ["discussion", "limitation"],
+        "future": ["discussion", "future"],
+        "conclusion": ["conclusion"],
+    }
+    _GENERIC_AREA_WORDS = {"section", "sections", "paper", "the", "and", "of", "in", "for", "whole", "overall", "text"}
 
-    def _targeted_patch(self, paper: str, review: Dict) -> str:
-        """Patch only specific sections instead of rewriting entire paper."""
-        
-        weaknesses = review.get("weaknesses", [])
-        critical_issues = [w for w in weaknesses if w.get("severity") == "CRITICAL"]
+    def _sections_for_area(self, area: str, sections: List[Dict]) -> List[Tuple[int, int]]:
+        """
+        Index ranges [start, end) of the sections an issue area refers to. A matching
+        top-level heading takes its subsections along. Empty if nothing matches.
+        """
+        area_lower = (area or "").lower()
+        keywords = [kw for key, aliases in self.AREA_SECTION_ALIASES.items() if key in area_lower for kw in aliases]
+        if not keywords:
+            keywords = [w for w in re.findall(r"[a-z]{4,}", area_lower) if w not in self._GENERIC_AREA_WORDS]
+        
+        ranges = []
+        for i, section in enumerate(sections):
+            heading = section["heading"].lower()
+            if not heading or not any(kw in heading for kw in keywords):
+                continue
+            end = i + 1
+            while end < len(sections) and sections[end]["level"] > section["level"]:
+                end += 1
+            ranges.append((i, end))
+        return ranges
+
+    def _patch_text(self, text: str, issues: List[Dict], scope: str) -> str:
+        """Fixes the given issues in one section (or the whole paper, scope='paper')."""
+        issue_list = "\n".join(
+            f"- **Issue** ({i.get('area')}): {i.get('issue')}\n  **Suggestion**: {i.get('suggestion')}" for i in issues
+        )
+        def patch_prompt(output_instructions: str) -> str:
+            return f"""
+        You are an expert editor. Fix the following issues in this {scope}:
+        
+        {issue_list}
+        
+        **Original {scope.title()}**:
+        {text}
+        
+        **Your Task**: 
+        Apply the fixes and change nothing else.
+        {output_instructions}
+        """
         
-        current_paper = paper
+        def rewrite():
+            try:
+                prompt = patch_prompt(f"Output ONLY the corrected {scope}, starting with its heading if it has one.")
+                return self.model.generate_content(prompt).text.strip()
+            except Exception as e:
+                print(f"    Patch failed: {e}")
+                return text
         
-        # For each critical issue, identify the section and patch it
-        for issue in critical_issues[:3]:  # Max 3 patches per iteration
-            area = issue.get("area")
-            suggestion = issue.get("suggestion")
-            print(f"    Patching area: {area}...")
-            
-            patch_prompt = f"""
-            You are an expert editor. The paper has an issue in the '{area}' section:
-            
-            **Issue**: {issue.get('issue')}
-            **Suggestion**: {suggestion}
-            
-            **Original Paper**:
-            {current_paper}
-            
-            **Your Task**: 
-            Find the relevant section in the paper and apply the fix.
-            Output ONLY the corrected paper.
-            """
-            
+        if self.edit_mode != "patch":
+            patched = rewrite()
+        else:
             try:
-                response = self.model.generate_content(patch_prompt)
-                current_paper = response.text.strip()
+                response_text = self.model.generate_content(patch_prompt(EDIT_FORMAT_INSTRUCTIONS)).text
+                patched = edit_or_rewrite(text, response_text, rewrite, label=scope)
             except Exception as e:
                 print(f"    Patch failed: {e}")
+                return text
+        # Keep the blank lines that separate this section from the next one
+        trailing = text[len(text.rstrip()):]
+        return patched.rstrip() + trailing
+
+    def _targeted_patch(self, paper: str, review: Dict) -> str:
+        """
+        Patch only the sections the critical issues refer to. The paper is split at its
+        headings, issues are grouped per section, sections are patched in parallel and
+        spliced back. Issues that match no heading are patched against the whole paper.
+        """
+        
+        weaknesses = review.get("weaknesses", [])
+        critical_issues = [w for w in weaknesses if w.get("severity") == "CRITICAL"][:3]  # Max 3 patches per iteration
+        if not critical_issues:
+            return paper
+        
+        sections = ContextManager.split_by_headings(paper)
+        
+        # Group issues by section range, merging overlapping ranges
+        groups: List[Dict] = []
+        unmatched = []
+        for issue in critical_issues:
+            ranges = self._sections_for_area(issue.get("area"), sections)
+            if not ranges:
+                unmatched.append(issue)
+            for start, end in ranges:
+                groups.append({"start": start, "end": end, "issues": [issue]})
+        merged: List[Dict] = []
+        for group in sorted(groups, key=lambda g: g["start"]):
+            if merged and group["start"] < merged[-1]["end"]:
+                merged[-1]["end"] = max(merged[-1]["end"], group["end"])
+                merged[-1]["issues"] += [i for i in group["issues"] if i not in merged[-1]["issues"]]
+            else:
+                merged.append(group)
+        
+        for group in merged:
+            headings = ", ".join(s["heading"] for s in sections[group["start"]:group["end"]] if s["level"] == sections[group["start"]]["level"])
+            print(f"    Patching section(s) '{headings}' for {len(group['issues'])} issue(s)...")
+        
+        with ThreadPoolExecutor(max_workers=max(1, len(merged))) as pool:
+            futures = [
+                pool.submit(self._patch_text, "".join(s["text"] for s in sections[g["start"]:g["end"]]), g["issues"], "section")
+                for g in merged
+            ]
+            patched = [f.result() for f in futures]
+        
+        # Splice the patched sections back in place
+        parts = []
+        position = 0
+        for group, text in zip(merged, patched):
+            parts.extend(s["text"] for s in sections[position:group["start"]])
+            parts.append(text)
+            position = group["end"]
+        parts.extend(s["text"] for s in sections[position:])
+        current_paper = "".join(parts)
+        
+        if unmatched:
+            print(f"    Patching {len(unmatched)} issue(s) without a matching section against the whole paper...")
+            current_paper = self._patch_text(current_paper, unmatched, "paper")
         
         return current_paper
 
@@ -192,6 +518,7 @@ class MCPFinalReviewer:
         """
         
         current_paper = paper_text
+        self._load_history(paper_text)
         iteration = 0
         
         while iteration < self.max_iterations:
@@ -213,13 +540,12 @@ class MCPFinalReviewer:
 
             # Get review from Manus
             print("Sending paper to Manus for review...")
-            review = self.review_paper_via_mcp(
+            review = self.review_paper(
                 current_paper,
                 focus_areas=current_focus if iteration == 1 or missing_items else None
             )
             
             quality_score = review.get("overall_quality_score", 0)
-            self.quality_history.append(quality_score)
             print(f"Quality Score: {quality_score}/100")
             
             # Check convergence
@@ -227,6 +553,11 @@ class MCPFinalReviewer:
                 print(f"\n✅ A+ QUALITY ACHIEVED! (Score: {quality_score}/100)")
                 return current_paper, review
             
+            # Stop when further iterations stopped paying off (also across runs)
+            if self.is_plateau():
+                print(f"\n⚠️ PLATEAU: The last {self.plateau_window} reviews improved less than {self.min_improvement} points. Stopping.")
+                return current_paper, review
+            
             # Analyze convergence
             convergence = self.analyze_convergence()
             if convergence.get("is_stuck"):
@@ -239,18 +570,24 @@ class MCPFinalReviewer:
             # Apply strategy
             if strategy == "POLISH":
                 print("  Applying Polish...")
-                current_paper = self._polish_paper(current_paper, review)
+                patched_paper = self._polish_paper(current_paper, review)
             elif strategy == "TARGETED_PATCH":
                 print("  Applying Targeted Patch...")
-                current_paper = self._targeted_patch(current_paper, review)
+                patched_paper = self._targeted_patch(current_paper, review)
             else:
                 print("  Applying Full Rewrite...")
-                current_paper = self._full_rewrite(current_paper, review)
+                patched_paper = self._full_rewrite(current_paper, review)
+            
+            # Another iteration would review the same paper and request the same patch
+            if patched_paper == current_paper:
+                print("\n⚠️ The patch left the paper unchanged. Stopping.")
+                return current_paper, review
+            current_paper = patched_paper
         
         # Max iterations reached
         print(f"\n⚠️ Max iterations ({self.max_iterations}) reached.")
         print(f"Final quality score: {quality_score}/100")
-        final_review = self.review_paper_via_mcp(current_paper)
+        final_review = self.review_paper(current_paper)
         
         return current_paper, final_review
 
@@ -286,12 +623,44 @@ class MCPFinalReviewer:
         Do not include commentary or explanations.
         """
         
+        def rewrite():
+            try:
+                response = self.model.generate_content(rewrite_prompt)
+                return response.text.strip()
+            except Exception as e:
+                print(f"Error during rewriting: {e}")
+                return paper
+        
+        if self.edit_mode != "patch":
+            return rewrite()
+        
+        patch_prompt = f"""
+        You are a world-class academic writer. You are revising a 50-page SLR paper.
+        
+        **PAPER**:
+        {paper}
+        
+        **REVIEW FEEDBACK**:
+        Quality Score: {review.get('overall_quality_score')}/100
+        
+        Weaknesses:
+        {json.dumps(weaknesses, indent=2)}
+        
+        Priority Improvements:
+        {json.dumps(priority_improvements, indent=2)}
+        
+        **YOUR TASK**:
+        Revise the paper to address ALL feedback points with targeted edits. Address each weakness,
+        implement all priority improvements, keep the structure and citations, and ensure PRISMA 2020 compliance.
+        Edits may be long (e.g. a rewritten paragraph or a new subsection) but leave correct passages untouched.
+        {EDIT_FORMAT_INSTRUCTIONS}
+        """
         try:
-            response = self.model.generate_content(rewrite_prompt)
-            return response.text.strip()
+            response_text = self.model.generate_content(patch_prompt).text
         except Exception as e:
-            print(f"Error during rewriting: {e}")
-            return paper
+            print(f"Error during patch revision: {e}")
+            return rewrite()
+        return edit_or_rewrite(paper, response_text, rewrite, label="the paper")
 
     def _polish_paper(self, paper: str, review: Dict) -> str:
         """Polish the paper for final submission (minor edits)."""
@@ -307,12 +676,36 @@ class MCPFinalReviewer:
         
         Output ONLY the polished paper.
         """
+        
+        def rewrite():
+            try:
+                response = self.model.generate_content(polish_prompt)
+                return response.text.strip()
+            except Exception as e:
+                print(f"    Polish failed: {e}")
+                return paper
+        
+        if self.edit_mode != "patch":
+            return rewrite()
+        
+        patch_prompt = f"""
+        You are an expert copyeditor. Polish the following paper for final submission.
+        Focus on flow, clarity, and academic tone. Fix any minor issues identified in the review.
+        Only touch the sentences that need it.
+        
+        **Review Feedback**:
+        {json.dumps(review.get('weaknesses', []), indent=2)}
+        
+        **Paper**:
+        {paper}
+        {EDIT_FORMAT_INSTRUCTIONS}
+        """
         try:
-            response = self.model.generate_content(polish_prompt)
-            return response.text.strip()
+            response_text = self.model.generate_content(patch_prompt).text
         except Exception as e:
             print(f"    Polish failed: {e}")
             return paper
+        return edit_or_rewrite(paper, response_text, rewrite, label="the paper")
 
     PRISMA_2020_CHECKLIST = {
         "Title": {"item": 1, "required": True},
@@ -345,36 +738,14 @@ class MCPFinalReviewer:
     }
 
     def prisma_compliance_check(self, paper_text: str) -> Dict:
-        """Vollständige PRISMA 2020 Überprüfung (Single Pass)."""
-        print("  [Compliance] Running PRISMA 2020 Check...")
-        prompt = f"""
-        You are a Compliance Officer. Check the attached paper against the PRISMA 2020 Checklist.
-        
-        ITEMS:
-        {json.dumps(self.PRISMA_2020_CHECKLIST, indent=2)}
-        
-        For each item, determine if it is PRESENT in the paper.
-        
-        Output Format (JSON ONLY):
-        {{
-            "checklist": {{
-                "Title": {{"present": true, "location": "Header"}},
-                ...
-            }},
-            "missing_items": ["List of missing required items"]
-        }}
         """
-        try:
-            # We pass the paper text. If it's too long, we might need to truncate or use a model with large context.
-            # Gemini 1.5 Pro is fine.
-            response = self.model.generate_content(prompt + "\n\nPAPER:\n" + paper_text)
-            text = response.text.strip()
-            if text.startswith("```json"):
-                text = text[7:-3]
-            return json.loads(text)
-        except Exception as e:
-            print(f"    PRISMA Check failed: {e}")
-            return {"missing_items": [], "error": str(e)}
+        Vollständige PRISMA 2020 Überprüfung. Headings and unambiguous phrases are
+        resolved locally; only ambiguous items go to the LLM (see PrismaChecker).
+        """
+        print("  [Compliance] Running PRISMA 2020 Check...")
+        if self.prisma_checker is None:
+            self.prisma_checker = PrismaChecker(self.PRISMA_2020_CHECKLIST, model=self.model)
+        return self.prisma_checker.check(paper_text)
 
     def analyze_convergence(self) -> Dict:
         """Intelligente Konvergenz-Analyse (Updated)."""
@@ -1,11 +1,16 @@
 import logging
 import os
 import json
+import difflib
+import threading
 import google.generativeai as genai
-import requests
 from typing import List, Dict
 from literature_autopilot.reviewer import MultiAgentReviewer
 from literature_autopilot.llm_utils import RotatableModel
+from literature_autopilot.venue_normalizer import VenueNormalizer
+from literature_autopilot.context_manager import ContextManager, RecordIndex
+from literature_autopilot.style_linter import StyleLinter
+from literature_autopilot.citation_validator import CitationValidator, cited_surname_keys, surname_aliases
 
 class PaperWriter:
     STYLE_GUIDELINES = """
@@ -36,36 +41,179 @@ class PaperWriter:
         *   **Novelty**: Define novelty clearly (e.g., "new feedback signal", "new domain").
     """
 
-    def __init__(self, model_name: str = "gemini-1.5-pro-latest"):
+    CITATION_CACHE_FILE = ".citation_cache.json"
+
+    def __init__(self, model_name: str = "gemini-1.5-pro-latest", context_token_budget: int = 30000, edit_mode: str = "patch",
+                 validate_citations: bool = True):
         self.model = RotatableModel(model_name)
-        self.reviewer = MultiAgentReviewer(model_name)
+        self.context_token_budget = context_token_budget  # Source records per section prompt (None = all, as full JSON)
+        self.reviewer = MultiAgentReviewer(model_name, context_token_budget=context_token_budget, edit_mode=edit_mode)
         self.s2_api_key = None # Optional: Add S2 API key if available
+        self.venues = VenueNormalizer(api_key=self.s2_api_key)  # Cached across sections and runs
+        self.validate_citations = validate_citations  # Check each section's citations right after writing it
+        self._citation_validator = None
+        self._validator_lock = threading.Lock()
 
     def _get_official_venue(self, title: str) -> str:
         """
         Attempts to find the official publication venue (e.g. 'NeurIPS 2024') 
         using Semantic Scholar, to replace 'ArXiv' citations.
         """
+        return self.venues.venue_with_year(title) or "ArXiv" # Fallback
+
+    def enrich_venues(self, relevant_data: List[Dict]):
+        """Adds 'OfficialVenue' to arXiv records, resolving all titles in one batch."""
+        arxiv_records = [
+            paper_data for paper_data in relevant_data
+            if paper_data.get("Source") == "arXiv" or "arxiv" in str(paper_data.get("Source", "")).lower()
+        ]
+        if not arxiv_records:
+            return
+        titles = [paper_data.get("Title", "") for paper_data in arxiv_records]
+        arxiv_ids = {
+            paper_data.get("Title", ""): VenueNormalizer.arxiv_id_from(paper_data.get("URL"), paper_data.get("DOI"))
+            for paper_data in arxiv_records
+        }
+        resolved = self.venues.resolve(titles, arxiv_ids)
+        for paper_data in arxiv_records:
+            title = paper_data.get("Title", "")
+            official_venue = self._get_official_venue(title) if resolved.get(title) else "ArXiv"
+            if official_venue != "ArXiv" and paper_data.get("OfficialVenue") != official_venue:
+                paper_data["OfficialVenue"] = official_venue
+                logging.info(f"  [Citation Normalizer] Found official venue for '{title[:20]}...': {official_venue}")
+
+    def summarize_section(self, section_title: str, section_text: str, max_words: int = 120) -> str:
+        """
+        Short factual summary of a finished section, used as context for sections
+        that synthesize the others (Abstract, Conclusion).
+        """
+        prompt = f"""
+        Summarize the following section "{section_title}" of a Systematic Literature Review in at most {max_words} words.
+        Keep the key findings, numbers and the (Author, Year) citations they rely on. Plain prose, no headings.
+
+        {section_text}
+        """
         try:
-            url = "https://api.semanticscholar.org/graph/v1/paper/search"
-            params = {"query": title, "limit": 1, "fields": "venue,year,publicationVenue"}
-            headers = {"x-api-key": self.s2_api_key} if self.s2_api_key else {}
-            
-            response = requests.get(url, params=params, headers=headers, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("data"):
-                    paper = data["data"][0]
-                    # Prefer full venue name
-                    venue = paper.get("publicationVenue", {}).get("name")
-                    if not venue:
-                        venue = paper.get("venue")
-                    
-                    if venue and venue.lower() != "arxiv":
-                        return f"{venue} {paper.get('year', '')}"
-        except Exception:
-            pass
-        return "ArXiv" # Fallback
+            return self.model.generate_content(prompt).text.strip()
+        except Exception as e:
+            logging.warning(f"  Summary of '{section_title}' failed ({e}). Using its opening sentences instead.")
+            body = " ".join(line for line in section_text.split("\n") if line.strip() and not line.startswith("#"))
+            return " ".join(body.split()[:max_words])
+
+    def citation_validator(self, relevant_data: List[Dict]) -> CitationValidator:
+        """One validator (and section cache) per corpus, shared by parallel section writers."""
+        with self._validator_lock:
+            if self._citation_validator is None or self._citation_validator.papers is not relevant_data:
+                self._citation_validator = CitationValidator(relevant_data, cache_path=self.CITATION_CACHE_FILE)
+            return self._citation_validator
+
+    @staticmethod
+    def _citation_label(record: Dict) -> str:
+        authors = record.get("Authors") or record.get("authors") or ""
+        if isinstance(authors, list):
+            authors = ", ".join(authors)
+        names = [a.strip() for a in authors.split(",") if a.strip()]
+        first = names[0].split()[-1] if names else "Unknown"
+        author = first if len(names) == 1 else f"{first} & {names[1].split()[-1]}" if len(names) == 2 else f"{first} et al."
+        title = record.get("paper_title") or record.get("Title") or record.get("title") or ""
+        return f"({author}, {record.get('Year') or record.get('year')}): {title}"
+
+    @staticmethod
+    def _near_match(index: RecordIndex, author_part: str, year: str, cutoff: float = 0.85) -> bool:
+        """Whether one of the studies most similar to the citation has a near-identical surname and a year within one."""
+        keys = cited_surname_keys(author_part)
+        for k in index.top_k(f"{author_part} {year}", k=3):
+            record = index.records[k]
+            record_year = str(record.get("Year") or record.get("year") or "")
+            if not (record_year.isdigit() and year.isdigit() and abs(int(record_year) - int(year)) <= 1):
+                continue
+            authors = record.get("Authors") or record.get("authors") or []
+            if isinstance(authors, str):
+                authors = authors.split(",")
+            aliases = {alias for a in authors for alias in surname_aliases(str(a))}
+            if any(difflib.SequenceMatcher(None, key, alias).ratio() >= cutoff for key in keys for alias in aliases):
+                return True
+        return False
+
+    def fix_citations(self, section_title: str, section_text: str, relevant_data: List[Dict]) -> str:
+        """
+        Validates the section's citations against the included studies (cached by
+        section hash) and regenerates only the sentences with unknown citations,
+        in one call, offering each the most relevant studies as replacements.
+        """
+        validator = self.citation_validator(relevant_data)
+        if not validator.validate_section(section_text) or validator.is_settled(section_text):
+            return section_text
+        index = RecordIndex(relevant_data)
+        offending = []
+        for entry in validator.offending_sentences(section_text):
+            # Only author citations without a near match are likely hallucinated; a
+            # misspelled surname or an off-by-one year points at a real study
+            entry["invalid"] = [(a, y) for a, y in entry["invalid"]
+                                if validator.is_author_citation(a) and not self._near_match(index, a, y)]
+            if entry["invalid"]:
+                offending.append(entry)
+        if not offending:
+            return section_text
+        logging.info(f"  [Citation Check] {len(offending)} sentences in '{section_title}' cite unknown studies. Regenerating them...")
+        listing = []
+        for i, entry in enumerate(offending):
+            candidates = "\n".join(f"    - {self._citation_label(relevant_data[k])}" for k in index.top_k(entry["sentence"], k=5))
+            unknown = "; ".join(f"{a}, {y}" for a, y in entry["invalid"])
+            listing.append(f"[{i}] SENTENCE: {entry['sentence']}\n  UNKNOWN CITATIONS: {unknown}\n  INCLUDED STUDIES THAT MAY FIT:\n{candidates}")
+        prompt = f"""
+        The following sentences from the section "{section_title}" of a Systematic Literature Review cite studies
+        that are NOT among the included studies (likely hallucinated).
+        Rewrite each sentence so that it only cites included studies, in APA format (Author, Year).
+        Use a listed study only if it supports the claim; otherwise drop the citation and soften the claim.
+        Keep the wording, formatting and all valid citations of the sentence otherwise unchanged.
+
+        {chr(10).join(listing)}
+
+        Output Format (JSON ONLY):
+        {{"sentences": {{"<number>": "rewritten sentence"}}}}
+        """
+        try:
+            text = self.model.generate_content(prompt).text.strip()
+            if "```json" in text:
+                text = text.split("```json")[1].split("```")[0]
+            rewritten = json.loads(text).get("sentences", {})
+        except Exception as e:
+            logging.warning(f"  [Citation Check] Could not regenerate sentences for '{section_title}': {e}")
+            return section_text
+        # Replace back to front so earlier offsets stay valid
+        for i, entry in reversed(list(enumerate(offending))):
+            replacement = rewritten.get(str(i))
+            if isinstance(replacement, str) and replacement.strip():
+                section_text = section_text[:entry["start"]] + replacement.strip() + section_text[entry["end"]:]
+        remaining = validator.validate_section(section_text)
+        if remaining:
+            logging.warning(f"  [Citation Check] '{section_title}' still has {len(remaining)} unknown citations: {remaining[:5]}")
+            # A second pass over the same text would send the same sentences again
+            validator.mark_settled(section_text)
+        return section_text
+
+    def fix_paper_citations(self, text: str, relevant_data: List[Dict]) -> str:
+        """
+        fix_citations per heading-delimited chunk (ContextManager.split_by_headings).
+        Written sections and the assembled paper split into the same chunks, so the
+        final review only re-checks chunks that changed since they were written.
+        """
+        return "".join(
+            self.fix_citations(section["heading"] or "Front matter", section["text"], relevant_data)
+            for section in ContextManager.split_by_headings(text)
+        )
+
+    def build_context(self, section_title: str, section_instructions: str, relevant_data: List[Dict], previous_sections_summary: str = "") -> str:
+        """Source material for a section: the records most relevant to its plan, within the token budget."""
+        if self.context_token_budget is None:
+            return json.dumps(relevant_data, indent=2)
+        plan = next((v for k, v in self.DETAILED_STRUCTURE.items() if k in section_title or section_title in k), {})
+        # The full structure is shared by all sections, so only the section's own plan goes into the query
+        query = " ".join([section_title, *plan.get("subsections", plan.get("sections", [])), previous_sections_summary])
+        if "Structure:" not in section_instructions:
+            query += " " + section_instructions
+        return RecordIndex(relevant_data).context(query, self.context_token_budget)
 
     def generate_structure(self, extracted_data: List[Dict]) -> str:
         """
@@ -76,7 +224,7 @@ class PaperWriter:
         # Summarize the extracted data to fit in context if needed, 
         # but Gemini 1.5 Pro has huge context so we might pass a lot.
         # Let's create a consolidated summary string.
-        data_summary = json.dumps(extracted_data[:20], indent=2) # Limit to 20 to save tokens, but usually enough for structure
+        data_summary = ContextManager.compact_json(extracted_data[:20]) # Limit to 20 to save tokens, but usually enough for structure
         
         prompt = f"""
         You are an elite scientific writer and senior editor (100+ published papers). 
@@ -131,14 +279,9 @@ class PaperWriter:
         logging.info(f"Writing section: {section_title}...")
         
         # Enrich data with official venue info for citations
-        for paper_data in relevant_data:
-            if paper_data.get("Source") == "arXiv" or "arxiv" in str(paper_data.get("Source", "")).lower():
-                official_venue = self._get_official_venue(paper_data.get("Title", ""))
-                if official_venue != "ArXiv":
-                    paper_data["OfficialVenue"] = official_venue
-                    logging.info(f"  [Citation Normalizer] Found official venue for '{paper_data.get('Title')[:20]}...': {official_venue}")
-
-        context_str = json.dumps(relevant_data, indent=2)
+        self.enrich_venues(relevant_data)
+
+        context_str = self.build_context(section_title, section_instructions, relevant_data, previous_sections_summary)
         
         # --- STYLE GUIDELINES ---
         STYLE_GUIDELINES = """
@@ -367,13 +510,12 @@ class PaperWriter:
             final_text = draft_text
         
         # --- POST-PROCESSING ENFORCEMENT ---
-        # Forcefully remove em-dashes if the LLM ignored the prompt
-        if "—" in final_text or "--" in final_text:
-            logging.info(f"  [Style Enforcer] Removing em-dashes from '{section_title}'...")
-            final_text = final_text.replace("—", ", ").replace(" -- ", ", ").replace("--", ", ")
-            # Fix any double commas created by replacement
-            final_text = final_text.replace(", ,", ",").replace(" ,", ",")
-            
+        # Forcefully fix em-dashes, "et al" and "Abb." labels if the LLM ignored the prompt
+        fixed_text = StyleLinter.autofix(final_text)
+        if fixed_text != final_text:
+            logging.info(f"  [Style Enforcer] Applied mechanical style fixes to '{section_title}'...")
+            final_text = fixed_text
+        
         # Ensure Section Header Exists
         if not final_text.strip().startswith("#"):
             logging.info(f"  [Structure Enforcer] Prepending missing header for '{section_title}'...")
@@ -382,6 +524,11 @@ class PaperWriter:
             else:
                 final_text = f"## {section_title}\n\n{final_text}"
         
+        # Catch hallucinated citations while the section is fresh, sentence by sentence.
+        # Checked with its header, in the same chunks the final review will see
+        if self.validate_citations:
+            final_text = self.fix_paper_citations(final_text, relevant_data)
+        
         # Validation
         length_status = self.validate_section_length(section_title, final_text)
         if "WARNING" in length_status:
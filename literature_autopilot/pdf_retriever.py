@@ -1,30 +1,283 @@
 import os
+import re
+import json
 import time
+import threading
 import requests
 import arxiv
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
 from literature_autopilot.search_modules import Paper
+from literature_autopilot.stage_runner import hash_value
+from literature_autopilot.pdf_store import PDFStore
+from literature_autopilot.pdf_text import PDFTextExtractor
+
+# Max concurrent requests per host. Hosts not listed fall back to "default".
+DEFAULT_HOST_LIMITS = {
+    "arxiv.org": 2,
+    "unpaywall.org": 4,
+    "default": 2
+}
+
+# Minimum spacing between request starts per host (arXiv asks for ~3 s)
+DEFAULT_HOST_INTERVALS = {
+    "arxiv.org": 3.0
+}
+
+class HostLimiter:
+    """Per-host concurrency caps and request spacing shared by all download workers."""
+    
+    def __init__(self, limits: Dict[str, int] = None, intervals: Dict[str, float] = None):
+        self.limits = dict(DEFAULT_HOST_LIMITS, **(limits or {}))
+        self.intervals = dict(DEFAULT_HOST_INTERVALS, **(intervals or {}))
+        self._semaphores = {}
+        self._next_start = {}
+        self._lock = threading.Lock()
+        
+    def _host_key(self, url_or_host: str) -> str:
+        host = urlparse(url_or_host).netloc or url_or_host
+        host = host.lower().split(":")[0]
+        for key in self.limits:
+            if key != "default" and (host == key or host.endswith("." + key)):
+                return key
+        return host
+    
+    @contextmanager
+    def slot(self, url_or_host: str):
+        key = self._host_key(url_or_host)
+        with self._lock:
+            if key not in self._semaphores:
+                self._semaphores[key] = threading.Semaphore(self.limits.get(key, self.limits["default"]))
+        semaphore = self._semaphores[key]
+        
+        semaphore.acquire()
+        try:
+            interval = self.intervals.get(key, 0)
+            if interval:
+                # Reserve the next start time so concurrent workers queue up instead of bursting
+                with self._lock:
+                    now = time.monotonic()
+                    start = max(now, self._next_start.get(key, now))
+                    self._next_start[key] = start + interval
+                if start > now:
+                    time.sleep(start - now)
+            yield
+        finally:
+            semaphore.release()
+
+class ArxivResolver:
+    """
+    Resolves arXiv IDs and PDF URLs for many papers at once.
+    
+    IDs are taken from URLs/DOIs where possible. The remaining titles are searched
+    with batched OR-queries, and all IDs are confirmed with batched id_list lookups.
+    Results are cached on disk, so reruns make no metadata calls for papers that
+    were already resolved. Misses are only cached from successful searches and
+    expire after `miss_ttl` seconds; a failed search (503, timeout) caches nothing.
+    """
+    TITLE_BATCH_SIZE = 10
+    ID_BATCH_SIZE = 200
+    MISS_TTL = 7 * 24 * 3600
+    
+    def __init__(self, cache_path: str, limiter: HostLimiter, miss_ttl: float = MISS_TTL):
+        self.cache_path = cache_path
+        self.limiter = limiter
+        self.miss_ttl = miss_ttl
+        self.client = arxiv.Client(page_size=self.ID_BATCH_SIZE)
+        # titles: normalized title -> ID; misses: normalized title -> time of the search that missed
+        self.cache = {"titles": {}, "misses": {}, "pdf_urls": {}}
+        self._lock = threading.Lock()
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r") as f:
+                    self.cache.update(json.load(f))
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning(f"Could not read arXiv cache '{cache_path}': {e}")
+    
+    def _save(self):
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.cache, f, indent=2)
+        os.replace(tmp_path, self.cache_path)
+    
+    @staticmethod
+    def normalize_title(title: str) -> str:
+        return "".join(c.lower() for c in title if c.isalnum())
+    
+    @staticmethod
+    def _strip_version(arxiv_id: str) -> str:
+        return re.sub(r"v\d+$", "", arxiv_id)
+    
+    @classmethod
+    def id_from_metadata(cls, paper: Paper) -> Optional[str]:
+        """Extracts the ID from an arXiv URL (abs/pdf) or an arXiv DOI (10.48550/arXiv.XXXX)."""
+        return PDFStore.arxiv_id(paper)
+    
+    def resolve(self, papers: List[Paper]) -> Dict[str, Optional[str]]:
+        """Returns a title -> arXiv ID mapping (None if the paper is not on arXiv)."""
+        with self._lock:
+            ids = {}
+            pending = []
+            for paper in papers:
+                direct_id = self.id_from_metadata(paper)
+                key = self.normalize_title(paper.title)
+                if direct_id:
+                    ids[paper.title] = direct_id
+                elif self.cache["titles"].get(key):
+                    ids[paper.title] = self.cache["titles"][key]
+                elif time.time() - self.cache["misses"].get(key, float("-inf")) < self.miss_ttl:
+                    ids[paper.title] = None
+                else:
+                    pending.append(paper)
+            
+            for i in range(0, len(pending), self.TITLE_BATCH_SIZE):
+                batch = pending[i:i + self.TITLE_BATCH_SIZE]
+                found = self._search_titles(batch)
+                for paper in batch:
+                    ids[paper.title] = found.get(paper.title) if found else None
+                    if found is None:
+                        continue  # Search failed: retry on the next call
+                    key = self.normalize_title(paper.title)
+                    if ids[paper.title]:
+                        self.cache["titles"][key] = ids[paper.title]
+                        self.cache["misses"].pop(key, None)
+                    else:
+                        self.cache["misses"][key] = time.time()
+            
+            unconfirmed = sorted({i for i in ids.values() if i and i not in self.cache["pdf_urls"]})
+            for i in range(0, len(unconfirmed), self.ID_BATCH_SIZE):
+                self._lookup_ids(unconfirmed[i:i + self.ID_BATCH_SIZE])
+            
+            if pending or unconfirmed:
+                self._save()
+            return ids
+    
+    def pdf_url(self, arxiv_id: str) -> str:
+        return self.cache["pdf_urls"].get(arxiv_id) or f"https://arxiv.org/pdf/{arxiv_id}"
+    
+    def _search_titles(self, papers: List[Paper]) -> Optional[Dict[str, str]]:
+        """One OR-query for a batch of titles, matched back to the papers locally. None if the search failed."""
+        clauses = []
+        for paper in papers:
+            clean_title = " ".join(re.sub(r"[^\w\s]", " ", paper.title).split())
+            clauses.append(f'ti:"{clean_title}"')
+        search = arxiv.Search(query=" OR ".join(clauses), max_results=len(papers) * 3)
+        
+        try:
+            with self.limiter.slot("arxiv.org"):
+                results = list(self.client.results(search))
+        except Exception as e:
+            logging.warning(f"  [ArXiv Resolver] Title batch search failed: {e}")
+            return None
+        
+        found = {}
+        for paper in papers:
+            paper_title_norm = self.normalize_title(paper.title)
+            for res in results:
+                res_title_norm = self.normalize_title(res.title)
+                # Check for exact match or substring match (if title is long enough)
+                if paper_title_norm == res_title_norm or \
+                   (len(paper_title_norm) > 20 and paper_title_norm in res_title_norm):
+                    found[paper.title] = self._strip_version(res.get_short_id())
+                    self.cache["pdf_urls"][found[paper.title]] = res.pdf_url
+                    logging.info(f"  [ArXiv Resolver] Match found: {res.title} (ID: {found[paper.title]})")
+                    break
+        return found
+    
+    def _lookup_ids(self, arxiv_ids: List[str]):
+        """Confirms up to ID_BATCH_SIZE IDs in a single id_list request."""
+        search = arxiv.Search(id_list=arxiv_ids, max_results=len(arxiv_ids))
+        try:
+            with self.limiter.slot("arxiv.org"):
+                for res in self.client.results(search):
+                    self.cache["pdf_urls"][self._strip_version(res.get_short_id())] = res.pdf_url
+        except Exception as e:
+            logging.warning(f"  [ArXiv Resolver] ID batch lookup failed: {e}")
 
 class PDFRetriever:
-    def __init__(self, download_dir: str = "pdfs"):
+    def __init__(self, download_dir: str = "pdfs", max_workers: int = 8, 
+                 host_limits: Dict[str, int] = None, race_strategies: bool = False):
         self.download_dir = download_dir
+        self.max_workers = max_workers
+        self.race_strategies = race_strategies
+        self.limiter = HostLimiter(host_limits)
+        self._race_lock = threading.Lock()
         if not os.path.exists(download_dir):
             os.makedirs(download_dir)
+        self.arxiv_resolver = ArxivResolver(os.path.join(download_dir, "arxiv_index.json"), self.limiter)
+        self.store = PDFStore(download_dir)
+        self.incoming_dir = os.path.join(download_dir, "incoming")
+        os.makedirs(self.incoming_dir, exist_ok=True)
             
-    def download_paper(self, paper: Paper) -> str:
+    def download_papers(self, papers: List[Paper]) -> Dict[str, str]:
+        """
+        Downloads PDFs for many papers with a bounded worker pool.
+        Sets `paper.pdf_path` on success and returns a title -> path mapping.
+        """
+        logging.info(f"Downloading PDFs for {len(papers)} papers with {self.max_workers} workers...")
+        
+        # Resolve all arXiv IDs up front in a handful of batched metadata calls
+        missing = [p for p in papers if not self.store.lookup(p)]
+        if missing:
+            self.arxiv_resolver.resolve(missing)
+        
+        def safe_download(paper: Paper) -> Optional[str]:
+            try:
+                return self.download_paper(paper)
+            except Exception as e:
+                logging.error(f"  Download failed for '{paper.title}': {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            paths = list(pool.map(safe_download, papers))
+        
+        results = {}
+        for paper, path in zip(papers, paths):
+            if path:
+                paper.pdf_path = path
+                results[paper.title] = path
+        logging.info(f"Retrieved {len(results)}/{len(papers)} PDFs.")
+        return results
+            
+    def download_paper(self, paper: Paper, race: bool = None) -> str:
         """
         Attempts to download the PDF for a given paper.
-        Returns the local file path if successful, None otherwise.
+        Returns the path of the PDF in the content-addressed store if successful, None otherwise.
         """
-        safe_filename = "".join([c for c in paper.title if c.isalpha() or c.isdigit() or c==' ']).rstrip().replace(" ", "_") + ".pdf"
-        file_path = os.path.join(self.download_dir, safe_filename)
+        # Skip if already stored (possibly under another title or DOI)
+        stored_path = self.store.lookup(paper)
+        if stored_path:
+            return stored_path
         
-        # Skip if already exists
-        if os.path.exists(file_path):
-            return file_path
+        # Adopt title-named files from runs before the store existed. Titles collide
+        # across papers, so the file must name the paper's DOI or arXiv ID
+        legacy_path = self._legacy_path_for(paper)
+        if os.path.exists(legacy_path):
+            if not self.is_valid_pdf(legacy_path):
+                logging.warning(f"  Discarding invalid or truncated PDF: {legacy_path}")
+                os.remove(legacy_path)
+            elif self._legacy_matches(legacy_path, paper):
+                return self.store.add(legacy_path, paper)
+            else:
+                logging.info(f"  Not adopting {legacy_path}: it does not mention the paper's DOI or arXiv ID.")
             
         logging.info(f"Attempting to download PDF for: {paper.title}...")
         
+        file_path = self._incoming_path_for(paper)
+        if self.race_strategies if race is None else race:
+            result = self._race_strategies(paper, file_path)
+        else:
+            result = self._download_sequential(paper, file_path)
+        
+        if result:
+            return self.store.add(result, paper)
+        return None
+
+    def _download_sequential(self, paper: Paper, file_path: str) -> Optional[str]:
+        """Tries the download strategies one after another."""
         # Strategy 1: ArXiv (Check Source, URL, OR DOI)
         is_arxiv = (
             paper.source == "arXiv" or 
@@ -49,13 +302,91 @@ class PDFRetriever:
         
         # Strategy 4: Last Resort - Try searching ArXiv by title for ANY paper
         # (Many S2 papers are actually on ArXiv but missing the link/DOI in S2 metadata)
-        logging.info(f"  Fallback: Searching ArXiv by title...")
-        if self._download_from_arxiv(paper, file_path):
-            return file_path
+        if not is_arxiv:
+            logging.info(f"  Fallback: Searching ArXiv by title...")
+            if self._download_from_arxiv(paper, file_path):
+                return file_path
             
         return None
 
-    def _download_from_unpaywall(self, doi: str, save_path: str) -> bool:
+    @staticmethod
+    def _legacy_matches(path: str, paper: Paper) -> bool:
+        """True if the first pages of the PDF mention the paper's DOI or arXiv ID."""
+        identifiers = [i for i in (PDFStore.normalize_doi(paper.doi) if paper.doi else None, PDFStore.arxiv_id(paper)) if i]
+        if not identifiers:
+            return False
+        try:
+            text = PDFTextExtractor.extract_text(path, max_pages=2).lower()
+        except Exception as e:
+            logging.warning(f"  Could not read {path}: {e}")
+            return False
+        return any(identifier.lower() in text for identifier in identifiers)
+
+    def _legacy_path_for(self, paper: Paper) -> str:
+        safe_filename = "".join([c for c in paper.title if c.isalpha() or c.isdigit() or c==' ']).rstrip().replace(" ", "_") + ".pdf"
+        return os.path.join(self.download_dir, safe_filename)
+
+    def _incoming_path_for(self, paper: Paper) -> str:
+        """Staging path for a download. The title hash keeps colliding titles apart."""
+        safe_title = "".join([c for c in paper.title if c.isalnum() or c == ' ']).strip().replace(" ", "_")[:80]
+        return os.path.join(self.incoming_dir, f"{safe_title}_{hash_value(paper.title)[:8]}.pdf")
+
+    def _race_strategies(self, paper: Paper, file_path: str) -> Optional[str]:
+        """
+        Runs ArXiv (ID or title search), direct URL and Unpaywall at the same time.
+        Each strategy writes to its own partial file; the first valid PDF is moved
+        into place. The winner sets a cancel event that the losers check before
+        each request and between chunks, so they stop, give up their host slots
+        and delete their partial files instead of publishing them.
+        """
+        cancel = threading.Event()
+        strategies = {"arxiv": lambda path: self._download_from_arxiv(paper, path, cancel)}
+        if paper.url and paper.url.lower().endswith(".pdf"):
+            strategies["url"] = lambda path: self._download_from_url(paper.url, path, cancel=cancel)
+        if paper.doi:
+            strategies["unpaywall"] = lambda path: self._download_from_unpaywall(paper.doi, path, cancel)
+        
+        def attempt(name, strategy):
+            part_path = f"{file_path}.{name}.part"
+            try:
+                if not strategy(part_path) or not self.is_valid_pdf(part_path):
+                    return False
+                with self._race_lock:
+                    if cancel.is_set():
+                        return False  # Another strategy won the race
+                    cancel.set()
+                    os.replace(part_path, file_path)
+                logging.info(f"  Race won by {name}: {file_path}")
+                return True
+            finally:
+                self._discard_partial(part_path + ".download")
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+        
+        pool = ThreadPoolExecutor(max_workers=len(strategies))
+        futures = [pool.submit(attempt, name, strategy) for name, strategy in strategies.items()]
+        try:
+            for future in as_completed(futures):
+                if future.result():
+                    return file_path
+        finally:
+            # Do not wait for the losers; they stop at their next cancel check and clean up their own partial files
+            cancel.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+        return None
+
+    @staticmethod
+    def is_valid_pdf(path: str) -> bool:
+        """Checks the PDF magic bytes and the %%EOF trailer (catches truncated files)."""
+        if not os.path.exists(path) or os.path.getsize(path) < 16:
+            return False
+        with open(path, "rb") as f:
+            if f.read(5) != b"%PDF-":
+                return False
+            f.seek(max(0, os.path.getsize(path) - 1024))
+            return b"%%EOF" in f.read()
+
+    def _download_from_unpaywall(self, doi: str, save_path: str, cancel: threading.Event = None) -> bool:
         """
         Queries Unpaywall API to find a legal Open Access PDF.
         """
@@ -63,81 +394,125 @@ class PDFRetriever:
         url = f"https://api.unpaywall.org/v2/{doi}?email={email}"
         
         try:
-            response = requests.get(url, timeout=10)
+            if cancel is not None and cancel.is_set():
+                return False
+            with self.limiter.slot(url):
+                response = requests.get(url, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 best_oa = data.get("best_oa_location", {})
                 if best_oa and best_oa.get("url_for_pdf"):
                     pdf_url = best_oa.get("url_for_pdf")
                     logging.info(f"  Found Unpaywall PDF: {pdf_url}")
-                    return self._download_from_url(pdf_url, save_path)
+                    return self._download_from_url(pdf_url, save_path, cancel=cancel)
         except Exception as e:
             logging.warning(f"  Unpaywall check failed: {e}")
         return False
 
-    def _download_from_arxiv(self, paper: Paper, save_path: str) -> bool:
-        time.sleep(3) # Respect ArXiv rate limit
+    def _download_from_arxiv(self, paper: Paper, save_path: str, cancel: threading.Event = None) -> bool:
+        # IDs come from the batched resolver (cached), so this only fetches the PDF itself
         try:
-            # Extract ID from URL or use external ID if we had it
-            # URL format: http://arxiv.org/abs/2303.17651v1
-            arxiv_id = None
-            
-            # 1. Try URL
-            if paper.url and "arxiv.org/abs/" in paper.url:
-                arxiv_id = paper.url.split("arxiv.org/abs/")[-1].split("v")[0]
-            
-            # 2. Try DOI (ArXiv DOIs look like 10.48550/arXiv.2303.17651)
-            if not arxiv_id and paper.doi and "10.48550/arXiv." in paper.doi:
-                arxiv_id = paper.doi.split("10.48550/arXiv.")[-1]
-                
-            # 3. Try Title Search (Fallback)
-            if not arxiv_id:
-                # Search by title to find ID
-                # Use ti: prefix for title search to improve relevance
-                query = f'ti:"{paper.title}"'
-                search = arxiv.Search(query=query, max_results=3)
-                results = list(search.results())
-                
-                if not results:
-                    # Fallback to simple query if strict title search fails
-                    search = arxiv.Search(query=paper.title, max_results=3)
-                    results = list(search.results())
-
-                if results:
-                    # Normalize for comparison (remove non-alphanumeric, lowercase)
-                    def normalize(s):
-                        return "".join(c.lower() for c in s if c.isalnum())
-                    
-                    paper_title_norm = normalize(paper.title)
-                    
-                    for res in results:
-                        res_title_norm = normalize(res.title)
-                        # Check for exact match or substring match (if title is long enough)
-                        if paper_title_norm == res_title_norm or \
-                           (len(paper_title_norm) > 20 and paper_title_norm in res_title_norm):
-                            arxiv_id = res.entry_id.split("/")[-1].split("v")[0]
-                            logging.info(f"  [ArXiv Search] Match found: {res.title} (ID: {arxiv_id})")
-                            break
-            
+            arxiv_id = self.arxiv_resolver.resolve([paper]).get(paper.title)
             if arxiv_id:
                 logging.info(f"  Found ArXiv ID: {arxiv_id}")
-                paper_obj = next(arxiv.Client().results(arxiv.Search(id_list=[arxiv_id])))
-                paper_obj.download_pdf(filename=os.path.basename(save_path), dirpath=os.path.dirname(save_path))
-                logging.info(f"  Success (ArXiv): {save_path}")
-                return True
+                if self._download_from_url(self.arxiv_resolver.pdf_url(arxiv_id), save_path, cancel=cancel):
+                    logging.info(f"  Success (ArXiv): {save_path}")
+                    return True
         except Exception as e:
             logging.error(f"  ArXiv download failed: {e}")
         return False
 
-    def _download_from_url(self, url: str, save_path: str) -> bool:
+    @staticmethod
+    def _partial_source(tmp_path: str) -> Dict:
+        """What the partial file was downloaded from ({"url", "etag", "length"}), {} if unknown."""
         try:
-            response = requests.get(url, stream=True, timeout=15)
-            if response.status_code == 200 and "application/pdf" in response.headers.get("Content-Type", ""):
-                with open(save_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                logging.info(f"  Success (Direct URL): {save_path}")
-                return True
-        except Exception as e:
-            logging.error(f"  Direct URL download failed: {e}")
+            with open(tmp_path + ".json", "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _discard_partial(tmp_path: str):
+        for path in (tmp_path, tmp_path + ".json"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    @staticmethod
+    def _total_length(response) -> Optional[str]:
+        """Full size of the resource: from Content-Range on a 206, Content-Length on a 200."""
+        content_range = response.headers.get("Content-Range", "")
+        if response.status_code == 206:
+            total = content_range.rsplit("/", 1)[-1] if "/" in content_range else ""
+            return total if total.isdigit() else None
+        return response.headers.get("Content-Length")
+
+    def _download_from_url(self, url: str, save_path: str, max_attempts: int = 3, cancel: threading.Event = None) -> bool:
+        """
+        Streams the PDF into '<save_path>.download' and renames it into place only
+        after it validates. An interrupted transfer is resumed with an HTTP Range
+        request, both on the next attempt and on the next run. A sidecar
+        ('<save_path>.download.json') records the URL, ETag and size the partial
+        came from; a partial from another URL or a changed resource is discarded,
+        so bytes from different servers are never spliced together.
+
+        Returns False as soon as `cancel` is set (checked before the request and
+        between chunks); the partial file is left for the caller to discard.
+        """
+        tmp_path = save_path + ".download"
+        for attempt in range(max_attempts):
+            source = self._partial_source(tmp_path)
+            if os.path.exists(tmp_path) and source.get("url") != url:
+                self._discard_partial(tmp_path)
+                source = {}
+            offset = os.path.getsize(tmp_path) if os.path.exists(tmp_path) else 0
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            if offset and source.get("etag"):
+                # The server sends the whole file (200) instead if the resource changed
+                headers["If-Range"] = source["etag"]
+            try:
+                if cancel is not None and cancel.is_set():
+                    return False
+                with self.limiter.slot(url):
+                    if cancel is not None and cancel.is_set():
+                        return False
+                    # Closed on every exit (cancelled, restarted, failed) so the host pool gets the connection back
+                    with requests.get(url, stream=True, timeout=15, headers=headers) as response:
+                        if response.status_code == 416:
+                            # Nothing left to fetch; the partial file is as complete as it gets
+                            pass
+                        elif response.status_code in (200, 206) and "application/pdf" in response.headers.get("Content-Type", ""):
+                            length = self._total_length(response)
+                            if response.status_code == 206 and source.get("length") and length and length != source["length"]:
+                                # Same URL, different file: start over
+                                logging.warning(f"  Partial download of {url} no longer matches the server copy. Restarting.")
+                                self._discard_partial(tmp_path)
+                                continue
+                            # 200 means the server ignored the Range header, so start over
+                            mode = "ab" if response.status_code == 206 else "wb"
+                            if mode == "wb":
+                                with open(tmp_path + ".json", "w") as f:
+                                    json.dump({"url": url, "etag": response.headers.get("ETag"), "length": length}, f)
+                            with open(tmp_path, mode) as f:
+                                for chunk in response.iter_content(chunk_size=8192):
+                                    if cancel is not None and cancel.is_set():
+                                        return False
+                                    f.write(chunk)
+                        else:
+                            return False
+                
+                if self.is_valid_pdf(tmp_path):
+                    os.replace(tmp_path, save_path)
+                    self._discard_partial(tmp_path)
+                    logging.info(f"  Success (Direct URL): {save_path}")
+                    return True
+                
+                logging.warning(f"  Downloaded file from {url} is not a valid PDF. Discarding.")
+                self._discard_partial(tmp_path)
+                return False
+            except Exception as e:
+                # Keep the partial file so the next attempt can resume it
+                logging.warning(f"  Direct URL download interrupted (Attempt {attempt + 1}/{max_attempts}): {e}")
+                time.sleep(2 ** attempt)
+        
+        logging.error(f"  Direct URL download failed: {url}")
         return False
@@ -0,0 +1,133 @@
+import os
+import re
+import json
+import logging
+import threading
+from typing import Optional
+from literature_autopilot.search_modules import Paper
+from literature_autopilot.stage_runner import hash_file
+
+class PDFStore:
+    """
+    Content-addressed PDF storage.
+
+    Files live at `<root>/store/<sha256>.pdf`, so identical PDFs are stored once
+    no matter how many paper records point to them. `index.json` maps DOIs and
+    arXiv IDs to content hashes and keeps size and aliases per object. Papers
+    without either are matched by title + year + first-author surname, so
+    different papers with similar titles do not share a PDF.
+    """
+
+    def __init__(self, root: str = "pdfs"):
+        self.root = root
+        self.objects_dir = os.path.join(root, "store")
+        self.index_path = os.path.join(root, "index.json")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.index = {"objects": {}, "by_record": {}, "by_doi": {}, "by_arxiv": {}}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r") as f:
+                    self.index.update(json.load(f))
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning(f"Could not read PDF store index '{self.index_path}': {e}")
+        # Title-only keys of older indexes collided across papers; they are not used any more
+        self.index.pop("by_title", None)
+
+    @staticmethod
+    def normalize_title(title: str) -> str:
+        return "".join(c.lower() for c in title if c.isalnum())
+
+    @staticmethod
+    def normalize_doi(doi: str) -> str:
+        return doi.strip().lower()
+
+    @staticmethod
+    def arxiv_id(paper: Paper) -> Optional[str]:
+        """The arXiv ID from an arXiv URL (abs/pdf) or an arXiv DOI (10.48550/arXiv.XXXX), without version."""
+        match = re.search(r"arxiv\.org/(?:abs|pdf)/([^\s?#]+?)(?:\.pdf)?$", paper.url or "")
+        if match:
+            arxiv_id = match.group(1)
+        elif paper.doi and "10.48550/arxiv." in paper.doi.lower():
+            arxiv_id = paper.doi[paper.doi.lower().index("10.48550/arxiv.") + len("10.48550/arxiv."):]
+        else:
+            return None
+        return re.sub(r"v\d+$", "", arxiv_id)
+
+    @classmethod
+    def record_key(cls, paper: Paper) -> Optional[str]:
+        """Title + year + first-author surname; None without a year or an author to tell same-titled papers apart."""
+        authors = [a for a in (paper.authors or []) if str(a).strip()]
+        surname = cls.normalize_title(str(authors[0]).split(",")[0].split()[-1]) if authors else ""
+        year = str(paper.year or "")
+        if not (year or surname):
+            return None
+        return f"{cls.normalize_title(paper.title)}|{year}|{surname}"
+
+    @staticmethod
+    def hash_of(path: str) -> str:
+        """Content hash of a PDF. Free for files inside the store (it is the file name)."""
+        stem, _ = os.path.splitext(os.path.basename(path))
+        if len(stem) == 64 and os.path.basename(os.path.dirname(path)) == "store":
+            return stem
+        return hash_file(path)
+
+    def path_for(self, content_hash: str) -> str:
+        return os.path.join(self.objects_dir, f"{content_hash}.pdf")
+
+    def lookup(self, paper: Paper) -> Optional[str]:
+        """
+        Returns the stored PDF for a paper, if any: matched by DOI or arXiv ID, and
+        only for papers with neither by title + year + first author.
+        """
+        content_hash = None
+        arxiv_id = self.arxiv_id(paper)
+        if paper.doi:
+            content_hash = self.index["by_doi"].get(self.normalize_doi(paper.doi))
+        if not content_hash and arxiv_id:
+            content_hash = self.index["by_arxiv"].get(arxiv_id)
+        if not content_hash and not paper.doi and not arxiv_id:
+            content_hash = self.index["by_record"].get(self.record_key(paper))
+        if content_hash and content_hash in self.index["objects"]:
+            path = self.path_for(content_hash)
+            if os.path.exists(path) and os.path.getsize(path) == self.index["objects"][content_hash]["size"]:
+                return path
+        return None
+
+    def add(self, path: str, paper: Paper) -> str:
+        """
+        Moves a downloaded PDF into the store and links it to the paper.
+        If an identical file is already stored, the new copy is discarded.
+        """
+        content_hash = hash_file(path)
+        stored_path = self.path_for(content_hash)
+
+        with self._lock:
+            if os.path.exists(stored_path):
+                logging.info(f"  [PDF Store] Duplicate of {content_hash[:12]}... Linking '{paper.title[:40]}' to the existing file.")
+                os.remove(path)
+            else:
+                os.replace(path, stored_path)
+
+            entry = self.index["objects"].setdefault(content_hash, {"size": os.path.getsize(stored_path), "titles": [], "dois": []})
+            if paper.title not in entry["titles"]:
+                entry["titles"].append(paper.title)
+            record_key = self.record_key(paper)
+            if record_key:
+                self.index["by_record"][record_key] = content_hash
+            arxiv_id = self.arxiv_id(paper)
+            if arxiv_id:
+                self.index["by_arxiv"][arxiv_id] = content_hash
+            if paper.doi:
+                doi = self.normalize_doi(paper.doi)
+                if doi not in entry["dois"]:
+                    entry["dois"].append(doi)
+                self.index["by_doi"][doi] = content_hash
+            self._save()
+        return stored_path
+
+    def _save(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
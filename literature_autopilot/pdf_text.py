@@ -0,0 +1,153 @@
+import re
+import logging
+from typing import Dict, List
+
+# Canonical section buckets and the heading words that map to them
+SECTION_ALIASES = {
+    "Abstract": ["abstract"],
+    "Introduction": ["introduction", "background", "motivation"],
+    "Related Work": ["related work", "related works", "literature review", "preliminaries"],
+    "Methods": ["method", "methods", "methodology", "approach", "our approach", "proposed method",
+                "framework", "model", "experimental setup", "experimental settings", "setup"],
+    "Results": ["results", "experiments", "experimental results", "evaluation", "main results",
+                "analysis", "ablation", "ablation study", "ablation studies"],
+    "Discussion": ["discussion", "limitations", "limitation", "broader impact", "ethics statement"],
+    "Conclusion": ["conclusion", "conclusions", "conclusion and future work", "future work", "summary"],
+    "References": ["references", "bibliography"],
+    "Appendix": ["appendix", "appendices", "supplementary material"],
+}
+
+_ALIAS_TO_SECTION = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+# Generic words that also show up as table cells or labels; only trusted when numbered ("3 Model")
+_NUMBERED_ONLY_ALIASES = {"model", "framework", "setup", "analysis", "approach", "summary", "evaluation"}
+
+# "3 Methods", "3. Experimental Results", "III. RESULTS", "A Appendix" or a bare "Abstract"
+_HEADING_PATTERN = re.compile(
+    r"^\s*((?:\d+(?:\.\d+)*|[IVX]+|[A-H])\.?\s+)?([A-Za-z][A-Za-z &\-]{2,60}?)\s*:?\s*$"
+)
+_TABLE_CAPTION_PATTERN = re.compile(r"^\s*Table\s+\d+\s*[:.|]", re.IGNORECASE)
+
+# Which sections each extraction stage actually needs
+STAGE_SECTIONS = {
+    "prescreen": ["Abstract", "Introduction", "Conclusion"],
+    "extraction": ["Abstract", "Methods", "Results", "Tables", "Discussion", "Conclusion"],
+    "amstar": ["Abstract", "Methods", "Results", "Discussion"],
+}
+# Fused extraction answers all three stages in one call, so it needs every section they use
+STAGE_SECTIONS["fused"] = [
+    name for name in ["Abstract", "Introduction", "Methods", "Results", "Tables", "Discussion", "Conclusion"]
+    if any(name in include for include in STAGE_SECTIONS.values())
+]
+
+class PDFTextExtractor:
+    """
+    Local (CPU-only) PDF parsing as an alternative to uploading the file to Gemini.
+
+    Extracts clean text with pdfminer.six (PyPDF2 as fallback) and splits it into
+    canonical sections plus a "Tables" bucket holding table captions and the lines
+    that follow them, so prompts can include only what a stage needs.
+    """
+
+    TABLE_CONTEXT_LINES = 15
+
+    @staticmethod
+    def extract_text(pdf_path: str, max_pages: int = 0) -> str:
+        """Clean text of the PDF, or of its first `max_pages` pages (0 = all)."""
+        try:
+            from pdfminer.high_level import extract_text
+            text = extract_text(pdf_path, maxpages=max_pages)
+        except Exception as e:
+            logging.warning(f"  pdfminer failed on {pdf_path} ({e}). Falling back to PyPDF2...")
+            from PyPDF2 import PdfReader
+            reader = PdfReader(pdf_path)
+            pages = reader.pages[:max_pages] if max_pages else reader.pages
+            text = "\n".join(page.extract_text() or "" for page in pages)
+        return PDFTextExtractor.clean_text(text)
+
+    @staticmethod
+    def clean_text(text: str) -> str:
+        text = text.replace("\x0c", "\n").replace("­", "")
+        # Re-join words hyphenated across line breaks ("improve-\nment" -> "improvement")
+        text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+        text = re.sub(r"[ \t]+", " ", text)
+        lines = [line.strip() for line in text.split("\n")]
+        # Drop bare page numbers
+        lines = [line for line in lines if not re.fullmatch(r"\d{1,3}", line)]
+        return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+    @staticmethod
+    def _match_heading(line: str):
+        match = _HEADING_PATTERN.match(line)
+        if not match:
+            return None
+        title = match.group(2).strip().lower()
+        if not match.group(1) and title in _NUMBERED_ONLY_ALIASES:
+            return None
+        return _ALIAS_TO_SECTION.get(title)
+
+    @classmethod
+    def split_sections(cls, text: str) -> Dict[str, str]:
+        """Splits paper text into canonical sections. Text before any heading counts as 'Front Matter'."""
+        sections: Dict[str, List[str]] = {"Front Matter": []}
+        tables: List[str] = []
+        current = "Front Matter"
+        lines = text.split("\n")
+
+        for i, line in enumerate(lines):
+            heading = cls._match_heading(line)
+            if heading:
+                current = heading
+                sections.setdefault(current, [])
+                continue
+            # Inline "Abstract—We propose..." style openings
+            if current == "Front Matter" and re.match(r"^abstract\s*[-—:.]", line, re.IGNORECASE):
+                current = "Abstract"
+                sections.setdefault(current, []).append(re.sub(r"^abstract\s*[-—:.]\s*", "", line, flags=re.IGNORECASE))
+                continue
+            if _TABLE_CAPTION_PATTERN.match(line) and current not in ("References", "Appendix"):
+                block = [line]
+                for following in lines[i + 1:i + cls.TABLE_CONTEXT_LINES]:
+                    if cls._match_heading(following) or _TABLE_CAPTION_PATTERN.match(following):
+                        break
+                    block.append(following)
+                tables.append("\n".join(block))
+            sections[current].append(line)
+
+        result = {name: "\n".join(body).strip() for name, body in sections.items() if "".join(body).strip()}
+        if tables:
+            result["Tables"] = "\n\n".join(tables)
+        # Papers without a detectable Abstract heading usually open with it
+        if "Abstract" not in result and result.get("Front Matter"):
+            result["Abstract"] = result["Front Matter"][:3000]
+        return result
+
+    @staticmethod
+    def build_context(sections: Dict[str, str], include: List[str], max_chars: int = 60000) -> str:
+        """Concatenates the requested sections, splitting the character budget evenly between them."""
+        present = [name for name in include if sections.get(name)]
+        if not present:
+            return ""
+        budget = max_chars // len(present)
+        parts = []
+        for name in present:
+            body = sections[name]
+            if len(body) > budget:
+                body = body[:budget] + "\n[...truncated...]"
+            parts.append(f"## {name}\n{body}")
+        return "\n\n".join(parts)
+
+    @classmethod
+    def stage_contexts(cls, pdf_path: str, min_chars: int = 2000) -> Dict[str, str]:
+        """
+        Returns the prompt context per extraction stage ('prescreen', 'extraction', 'amstar', 'fused').
+        Raises ValueError if the PDF yields too little text (e.g. scanned images).
+        """
+        text = cls.extract_text(pdf_path)
+        if len(text) < min_chars:
+            raise ValueError(f"Only {len(text)} characters of text extracted")
+        sections = cls.split_sections(text)
+        # Without recognisable headings fall back to the body text minus the bibliography
+        if not any(name in sections for name in ("Methods", "Results")):
+            sections["Methods"] = sections.get("Front Matter", text)
+        return {stage: cls.build_context(sections, include) for stage, include in STAGE_SECTIONS.items()}
@@ -6,6 +6,8 @@ import yaml
 import time
 import pandas as pd
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any
 
 # Set global timeout for all network requests (including arxiv library)
@@ -18,14 +20,18 @@ from literature_autopilot.snowballing import Snowballer
 from literature_autopilot.utils import deduplicate_papers, filter_papers, export_to_csv, export_to_markdown, load_papers_from_csv
 from literature_autopilot.screener import PaperScreener
 from literature_autopilot.pdf_retriever import PDFRetriever
+from literature_autopilot.pdf_store import PDFStore
+from literature_autopilot.upload_registry import GeminiUploadRegistry
+from literature_autopilot.extraction_ledger import ExtractionLedger
 from literature_autopilot.extractor import SLRExtractor
 from literature_autopilot.paper_writer import PaperWriter
 from literature_autopilot.mcp_final_reviewer import MCPFinalReviewer
-from literature_autopilot.citation_validator import CitationValidator
 from literature_autopilot.visualizer import SLRVisualizer
 from literature_autopilot.grade_assessment import GRADEAssessment
+from literature_autopilot.evidence_synthesis import EvidenceSynthesis
+from literature_autopilot.evidence_table import EvidenceTable
 from literature_autopilot.gap_identifier import GapIdentifier
-from literature_autopilot.context_manager import ContextManager
+from literature_autopilot.stage_runner import StageRunner, Stage, hash_file, hash_value
 
 class SLRPipeline:
     def __init__(self, config_path: str = "literature_autopilot/config.yaml"):
@@ -44,7 +50,12 @@ class SLRPipeline:
         logging.getLogger('').addHandler(console)
         
         self.config = self._load_config(config_path)
-        self.visualizer = SLRVisualizer() if self.config["analysis"]["run_visualizer"] else None
+        analysis_config = self.config["analysis"]
+        self.visualizer = SLRVisualizer(
+            fmt=analysis_config.get("figure_format", "png"),
+            dpi=analysis_config.get("figure_dpi", 300),
+            max_workers=analysis_config.get("figure_workers")
+        ) if analysis_config["run_visualizer"] else None
         
         # Initialize modules
         self.search_strategy = EnhancedSearchStrategy()
@@ -58,6 +69,8 @@ class SLRPipeline:
         self.paper_structure = ""
         self.draft_paper = ""
         self.final_paper = ""
+        self.runner = None
+        self.force = set()  # Steps to redo from scratch (--force)
 
     def _load_config(self, path: str) -> Dict[str, Any]:
         with open(path, "r") as f:
@@ -67,6 +80,9 @@ class SLRPipeline:
         """Orchestrate the full pipeline."""
         logging.info(f"Starting SLR Pipeline for topic: {self.config['slr_topic']}")
         
+        if getattr(args, "incremental", False):
+            return self.run_incremental(args)
+        
         steps = ["search", "screen", "download", "extract", "analyze", "write", "review"]
         start_index = 0
         if args.resume_from:
@@ -102,6 +118,88 @@ class SLRPipeline:
         if start_index <= 6 and args.final_review:
             self.step_final_review()
 
+    def build_stage_runner(self) -> StageRunner:
+        """Declare every pipeline step with its inputs and outputs."""
+        prompts = self.config.get("prompts", {})
+        runner = StageRunner(self.config)
+        
+        runner.add_stage(Stage(
+            "search", self.step_search_and_snowball,
+            config_keys=["slr_topic", "search", "snowballing"],
+            outputs=["slr_results_enriched.csv"]
+        ))
+        runner.add_stage(Stage(
+            "screen", lambda: self.step_screen(use_cached=False),
+            config_keys=["screening"],
+            input_files=[prompts.get("screening"), "slr_results_enriched.csv"],
+            outputs=["slr_screening_results.csv"],
+            load=self.step_screen
+        ))
+        # Downloads are incremental per paper already, so the stage always runs
+        runner.add_stage(Stage("download", self.step_download_pdfs, load=self._load_pdf_paths))
+        runner.add_stage(Stage(
+            "extract", self.step_extract_data,
+            config_keys=["extraction"],
+            input_files=[prompts.get("prescreening"), prompts.get("extraction")],
+            outputs=["slr_extracted_data.json"],
+            load=self._load_extracted_data,
+            dynamic_inputs=lambda: sorted(
+                [p.title, p.pdf_path] for p in self.final_papers if getattr(p, "pdf_path", None)
+            )
+        ))
+        # Analysis results (gap report, GRADE) live in memory, so it always runs
+        runner.add_stage(Stage("analyze", self.step_analyze))
+        runner.add_stage(Stage(
+            "write", self.step_write_paper,
+            config_keys=["writing", "paper_structure"],
+            input_files=["slr_extracted_data.json"],
+            outputs=["final_paper.md"],
+            load=self._load_draft_paper
+        ))
+        runner.add_stage(Stage(
+            "review", self.step_final_review,
+            config_keys=["writing", "review", "analysis.run_citation_validator"],
+            input_files=["final_paper.md", "slr_extracted_data.json"],
+            outputs=["final_paper_A_plus.md"]
+        ))
+        return runner
+
+    def run_incremental(self, args):
+        """Run only the stages whose inputs changed since their last successful run."""
+        self.runner = self.build_stage_runner()
+        self.force = set(getattr(args, "force", None) or [])
+        enabled = [
+            name for name, flag in [
+                ("search", not args.skip_search),
+                ("screen", args.screen),
+                ("download", args.download_pdfs),
+                ("extract", args.extract_data),
+                ("analyze", not args.skip_analysis),
+                ("write", args.write_paper),
+                ("review", args.final_review),
+            ] if flag
+        ]
+        self.runner.run(enabled=enabled, force=getattr(args, "force", None))
+
+    def _load_extracted_data(self):
+        with open("slr_extracted_data.json", "r") as f:
+            self.extracted_data = json.load(f)
+
+    def _load_draft_paper(self):
+        with open("final_paper.md", "r") as f:
+            self.draft_paper = f.read()
+
+    def _extraction_prompt_hash(self) -> str:
+        """Hash of everything besides the PDF that shapes an extraction: prompts, model and mode."""
+        prompts = self.config.get("prompts", {})
+        prompt_hashes = {
+            key: hash_file(prompts[key]) if prompts.get(key) and os.path.exists(prompts[key]) else None
+            for key in ["prescreening", "extraction"]
+        }
+        # Parallelism settings do not change results
+        settings = {k: v for k, v in self.config["extraction"].items() if k not in ("max_workers", "upload_workers")}
+        return hash_value({"prompts": prompt_hashes, "extraction": settings})
+
     def step_search_and_snowball(self):
         logging.info("\n--- Phase 1 & 2: Search & Snowballing ---")
         keywords = self.config["search"]["keywords"]
@@ -141,7 +239,7 @@ class SLRPipeline:
         logging.info(f"Total unique papers found: {len(self.unique_papers)}")
         export_to_csv(self.unique_papers, "slr_results_enriched.csv")
 
-    def step_screen(self):
+    def step_screen(self, use_cached: bool = True):
         logging.info("\n--- Phase 3: Screening ---")
         prompt_path = self.config.get("prompts", {}).get("screening")
         double_screening = self.config.get("screening", {}).get("double_screening", False)
@@ -159,7 +257,7 @@ class SLRPipeline:
         # Filter recent papers first
         filtered_papers = filter_papers(self.unique_papers, min_year=2021)
         
-        if os.path.exists("slr_screening_results.csv"):
+        if use_cached and os.path.exists("slr_screening_results.csv"):
             logging.info("Found existing screening results. Loading...")
             df = pd.read_csv("slr_screening_results.csv")
             screened_results = df.to_dict('records')
@@ -185,58 +283,133 @@ class SLRPipeline:
 
     def step_download_pdfs(self):
         logging.info("\n--- Phase 4: PDF Retrieval ---")
-        retriever = PDFRetriever()
+        download_config = self.config.get("download", {})
+        retriever = PDFRetriever(
+            max_workers=download_config.get("max_workers", 8),
+            host_limits=download_config.get("host_limits"),
+            race_strategies=download_config.get("race_strategies", False)
+        )
         # Load final papers if needed
-        if not self.final_papers and os.path.exists("slr_screening_results.csv"):
-             logging.info("Loading included papers from slr_screening_results.csv...")
-             df = pd.read_csv("slr_screening_results.csv")
-             # Filter for included papers
-             included_df = df[df["Screening Decision"] == "INCLUDE"]
-             
-             # Reconstruct Paper objects
-             from literature_autopilot.search_modules import Paper
-             for _, row in included_df.iterrows():
-                 paper = Paper(
-                     title=row.get("Title", "Unknown"),
-                     authors=str(row.get("Authors", "")).split(", "),
-                     year=row.get("Year"),
-                     abstract=row.get("Abstract", ""),
-                     url=row.get("URL") if pd.notna(row.get("URL")) else None,
-                     doi=row.get("DOI") if pd.notna(row.get("DOI")) else None,
-                     source=row.get("Source", "Unknown")
-                 )
-                 self.final_papers.append(paper)
-             logging.info(f"Loaded {len(self.final_papers)} included papers.") 
+        if not self.final_papers:
+            self._load_included_papers()
              
+        retriever.download_papers(self.final_papers)
+
+    def _load_included_papers(self):
+        if not os.path.exists("slr_screening_results.csv"):
+            return
+        logging.info("Loading included papers from slr_screening_results.csv...")
+        df = pd.read_csv("slr_screening_results.csv")
+        # Filter for included papers
+        included_df = df[df["Screening Decision"] == "INCLUDE"]
+        
+        # Reconstruct Paper objects
+        from literature_autopilot.search_modules import Paper
+        for _, row in included_df.iterrows():
+            paper = Paper(
+                title=row.get("Title", "Unknown"),
+                authors=str(row.get("Authors", "")).split(", "),
+                year=row.get("Year"),
+                abstract=row.get("Abstract", ""),
+                url=row.get("URL") if pd.notna(row.get("URL")) else None,
+                doi=row.get("DOI") if pd.notna(row.get("DOI")) else None,
+                source=row.get("Source", "Unknown")
+            )
+            self.final_papers.append(paper)
+        logging.info(f"Loaded {len(self.final_papers)} included papers.")
+
+    def _load_pdf_paths(self):
+        """Restores `pdf_path` of the included papers from the PDF store when downloading is skipped."""
+        if not self.final_papers:
+            self._load_included_papers()
+        store = PDFStore()
         for paper in self.final_papers:
-            pdf_path = retriever.download_paper(paper)
-            if pdf_path:
-                paper.pdf_path = pdf_path
+            if not getattr(paper, "pdf_path", None):
+                path = store.lookup(paper)
+                if path:
+                    paper.pdf_path = path
+        found = sum(1 for p in self.final_papers if getattr(p, "pdf_path", None))
+        logging.info(f"Found stored PDFs for {found}/{len(self.final_papers)} included papers.")
 
     def step_extract_data(self):
         logging.info("\n--- Phase 5: Extraction ---")
+        if not any(getattr(p, "pdf_path", None) for p in self.final_papers):
+            # Downloading was skipped this run (e.g. --resume-from extract)
+            self._load_pdf_paths()
+        if not any(getattr(p, "pdf_path", None) for p in self.final_papers) and os.path.exists("slr_extracted_data.json"):
+            # Nothing to extract from; an empty result would wipe the earlier extraction
+            self._load_extracted_data()
+            if self.extracted_data:
+                logging.warning("No included paper has a PDF. Keeping the existing slr_extracted_data.json.")
+                return
         prescreen_path = self.config.get("prompts", {}).get("prescreening")
         extract_path = self.config.get("prompts", {}).get("extraction")
         
+        pdf_mode = self.config["extraction"].get("pdf_mode", "upload")
+        upload_registry = None
+        if pdf_mode != "local":
+            upload_registry = GeminiUploadRegistry(max_workers=self.config["extraction"].get("upload_workers", 4))
+        
         extractor = SLRExtractor(
             model_name=self.config["extraction"]["model"],
             prescreening_prompt_path=prescreen_path,
-            extraction_prompt_path=extract_path
+            extraction_prompt_path=extract_path,
+            pdf_mode=pdf_mode,
+            upload_registry=upload_registry,
+            extraction_mode=self.config["extraction"].get("mode", "staged")
         )
+        # Papers already in the ledger with the current prompts are not extracted again
+        ledger = ExtractionLedger()
+        prompt_hash = self._extraction_prompt_hash()
+        
+        # Plan: reuse ledger records, extract every other distinct PDF once
+        papers = [p for p in self.final_papers if getattr(p, "pdf_path", None)]
+        pdf_hashes = {p.title: PDFStore.hash_of(p.pdf_path) for p in papers}
+        jobs = {}  # The same PDF can back several paper records
+        for paper in papers:
+            if "extract" in self.force or ledger.get(pdf_hashes[paper.title], prompt_hash) is None:
+                jobs.setdefault(pdf_hashes[paper.title], paper.pdf_path)
+        
+        if upload_registry:
+            # Uploads run in the background so they overlap with the first LLM calls
+            prefetch_thread = threading.Thread(target=upload_registry.prefetch, args=(list(jobs.values()),), daemon=True)
+            prefetch_thread.start()
+        
+        max_workers = self.config["extraction"].get("max_workers", 4)
+        logging.info(f"Extracting {len(jobs)} distinct PDFs for {len(papers)} papers with {max_workers} workers...")
+        errors = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(extractor.process_paper, path): pdf_hash for pdf_hash, path in jobs.items()}
+            for done, future in enumerate(as_completed(futures), 1):
+                pdf_hash = futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    data = {"error": str(e)}
+                # Failed papers stay out of the ledger so the next run retries them
+                if "error" in data:
+                    errors[pdf_hash] = data["error"]
+                else:
+                    ledger.append(pdf_hash, prompt_hash, data)
+                logging.info(f"  [{done}/{len(jobs)}] Finished {os.path.basename(jobs[pdf_hash])}")
+        
+        # Assemble in screening order so slr_extracted_data.json is stable across runs
         self.extracted_data = []
-        for paper in self.final_papers:
-            if hasattr(paper, 'pdf_path') and paper.pdf_path:
-                data = extractor.process_paper(paper.pdf_path)
-                if data:
-                    if "error" in data:
-                        logging.error(f"Skipping paper '{paper.title}' due to extraction error: {data['error']}")
-                        continue
-                        
-                    data["paper_title"] = paper.title
-                    self.extracted_data.append(data)
+        for paper in papers:
+            pdf_hash = pdf_hashes[paper.title]
+            if pdf_hash in errors:
+                logging.error(f"Skipping paper '{paper.title}' due to extraction error: {errors[pdf_hash]}")
+                continue
+            if pdf_hash not in jobs:
+                logging.info(f"  Up to date, reusing extraction for '{paper.title}'.")
+            self.extracted_data.append(dict(ledger.get(pdf_hash, prompt_hash), paper_title=paper.title, pdf_sha256=pdf_hash))
         
         with open("slr_extracted_data.json", "w") as f:
             json.dump(self.extracted_data, f, indent=2)
+        
+        if upload_registry:
+            prefetch_thread.join()
+            upload_registry.cleanup_orphans()
 
     def step_analyze(self):
         logging.info("\n--- Phase 6: Analysis ---")
@@ -248,10 +421,12 @@ class SLRPipeline:
             logging.error("No extracted data available for analysis. Aborting pipeline.")
             return
 
+        # Flatten the extracted data once for gap analysis and GRADE
+        self.evidence = EvidenceTable(self.extracted_data)
+        self.evidence.comparisons.to_csv("slr_evidence_table.csv", index=False)
+
         # Visualizations
         if self.config["analysis"]["run_visualizer"] and self.visualizer:
-            self.visualizer.create_prisma_flow_diagram(len(self.all_papers), len(self.unique_papers), len(self.final_papers), len(self.extracted_data))
-            
             # Mechanism Comparison
             mechanisms = []
             for d in self.extracted_data:
@@ -262,24 +437,31 @@ class SLRPipeline:
                         "Name": diffs.get("specific_name", "N/A"),
                         "Innovation": diffs.get("key_innovation", "N/A")[:100] + "..."
                     })
-            self.visualizer.create_mechanism_comparison_table(mechanisms)
-            self.visualizer.create_year_distribution_chart(self.extracted_data)
+            # Only figures whose inputs changed are re-rendered
+            counts = (len(self.all_papers), len(self.unique_papers), len(self.final_papers), len(self.extracted_data))
+            self.visualizer.render_all(counts, mechanisms, self.extracted_data)
 
         # Gap Analysis
         if self.config["analysis"]["run_gap_identifier"]:
-            gap_identifier = GapIdentifier(self.extracted_data)
+            gap_identifier = GapIdentifier(self.evidence)
             self.gap_report = gap_identifier.generate_gap_report()
 
         # GRADE (Data-Driven)
         if self.config["analysis"]["run_grade_assessment"]:
             # Use Comprehensive Assessment
-            self.grade_summary = GRADEAssessment.generate_grade_summary([
-                GRADEAssessment.assess_certainty_comprehensive(self.extracted_data)
-            ])
+            self.grade_summary = GRADEAssessment.generate_grade_summary(
+                GRADEAssessment.assess_by_mechanism(self.evidence)
+            )
+            self.synthesis_table = EvidenceSynthesis(self.evidence).summary_table(by=("mechanism",))
 
     def step_write_paper(self):
         logging.info("\n--- Phase 7: Writing ---")
-        writer = PaperWriter(model_name=self.config["writing"]["model"])
+        writer = PaperWriter(
+            model_name=self.config["writing"]["model"],
+            context_token_budget=self.config["writing"].get("context_token_budget", 30000),
+            edit_mode=self.config["writing"].get("edit_mode", "patch"),
+            validate_citations=self.config["analysis"]["run_citation_validator"]
+        )
         
         # Generate Structure (Optional, can rely on DETAILED_STRUCTURE)
         self.paper_structure = writer.generate_structure(self.extracted_data)
@@ -287,45 +469,96 @@ class SLRPipeline:
         # Write Sections with Deep Integration
         # Use keys from DETAILED_STRUCTURE to ensure we cover everything
         sections = list(writer.DETAILED_STRUCTURE.keys())
+        mode = self.config["writing"].get("mode", "sequential")
         
-        full_paper = ""
-        previous_summary = ""
-        
-        for section in sections:
-            logging.info(f"  Writing {section}...")
-            instructions = f"Follow the plan for '{section}' defined in the Structure below.\nStructure:\n{self.paper_structure}"
+        if mode == "sequential":
+            full_paper = ""
+            previous_summary = ""
             
-            # Inject Gap Report into Discussion
-            if "Discussion" in section and hasattr(self, 'gap_report'):
-                instructions += f"\n\nIncorporate this Literature Gap Analysis:\n{self.gap_report}"
-                
-            # Inject Visuals into Methodology
-            if "Methodology" in section and os.path.exists("images/prisma_flow_diagram.png"):
-                instructions += "\n\nIMPORTANT: You MUST include the PRISMA diagram using: ![PRISMA 2020 Flow Diagram](images/prisma_flow_diagram.png)"
+            for section in sections:
+                logging.info(f"  Writing {section}...")
+                section_text = writer.write_section(section, self._section_instructions(section), self.extracted_data, previous_summary)
+                full_paper += section_text + "\n\n"
+                previous_summary += f"Summary of {section}: ...\n"
+        else:
+            # Venue lookups mutate the shared records, so do them once before fanning out
+            writer.enrich_venues(self.extracted_data)
+            synthesis = []
+            if mode == "dependency_aware":
+                # Abstract and Conclusion summarize the rest, so they wait for the body
+                synthesis = [s for s in sections if s == "Abstract" or "Conclusion" in s]
+            body = [s for s in sections if s not in synthesis]
             
-            section_text = writer.write_section(section, instructions, self.extracted_data, previous_summary)
-            full_paper += section_text + "\n\n"
-            previous_summary += f"Summary of {section}: ...\n"
+            texts = self._write_sections_parallel(writer, body, "")
+            if synthesis:
+                with ThreadPoolExecutor(max_workers=len(body)) as pool:
+                    summaries = dict(zip(body, pool.map(lambda s: writer.summarize_section(s, texts[s]), body)))
+                previous_summary = "\n".join(f"Summary of {s}: {summaries[s]}" for s in body)
+                texts.update(self._write_sections_parallel(writer, synthesis, previous_summary))
+            full_paper = "".join(texts[s] + "\n\n" for s in sections)
             
         self.draft_paper = full_paper
         with open("final_paper.md", "w") as f:
             f.write(self.draft_paper)
 
+    def _section_instructions(self, section: str) -> str:
+        instructions = f"Follow the plan for '{section}' defined in the Structure below.\nStructure:\n{self.paper_structure}"
+        
+        # Inject Gap Report into Discussion
+        if "Discussion" in section and hasattr(self, 'gap_report'):
+            instructions += f"\n\nIncorporate this Literature Gap Analysis:\n{self.gap_report}"
+            
+        # Inject pooled effects and GRADE ratings into Analysis
+        if "Analysis" in section and hasattr(self, 'grade_summary'):
+            instructions += f"\n\nReport these pooled improvements (random-effects, relative to baseline) and certainty ratings:\n{self.synthesis_table}\n{self.grade_summary}"
+            
+        # Inject Visuals into Methodology
+        prisma_path = self.visualizer.path("prisma_flow_diagram") if self.visualizer else "images/prisma_flow_diagram.png"
+        if "Methodology" in section and os.path.exists(prisma_path):
+            instructions += f"\n\nIMPORTANT: You MUST include the PRISMA diagram using: ![PRISMA 2020 Flow Diagram]({prisma_path})"
+        return instructions
+
+    def _write_sections_parallel(self, writer: PaperWriter, sections, previous_summary: str) -> Dict[str, str]:
+        """
+        Drafts and reviews several sections at once. Returns {section: text}.
+        A section whose worker fails is retried once on its own, so the others are kept.
+        """
+        max_workers = self.config["writing"].get("max_workers", 6)
+        logging.info(f"  Writing {len(sections)} sections in parallel ({max_workers} workers)...")
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                section: pool.submit(writer.write_section, section, self._section_instructions(section), self.extracted_data, previous_summary)
+                for section in sections
+            }
+        texts = {}
+        for section, future in futures.items():
+            try:
+                texts[section] = future.result()
+            except Exception as e:
+                logging.error(f"  Writing '{section}' failed ({e}). Retrying it on its own...")
+                texts[section] = writer.write_section(section, self._section_instructions(section), self.extracted_data, previous_summary)
+        return texts
+
     def step_final_review(self):
         logging.info("\n--- Phase 8: Final Review ---")
-        mcp_reviewer = MCPFinalReviewer(model_name=self.config["writing"]["model"])
+        mcp_reviewer = MCPFinalReviewer(
+            model_name=self.config["writing"]["model"],
+            edit_mode=self.config["writing"].get("edit_mode", "patch"),
+            review_mode=self.config["review"].get("review_mode", "auto"),
+            single_call_max_tokens=self.config["review"].get("single_call_max_tokens", 30000),
+            plateau_window=self.config["review"].get("plateau_window", 3),
+            min_improvement=self.config["review"].get("min_improvement", 1.0)
+        )
         
         with open("final_paper.md", "r") as f:
             paper_text = f.read()
             
         # Citation Validation & Auto-Correction
+        # Sections are validated as they are written, so this only re-checks changed sections (cached by hash)
         if self.config["analysis"]["run_citation_validator"]:
-            validator = CitationValidator(self.extracted_data)
-            report = validator.generate_validation_report(paper_text)
-            if "Invalid/Unknown Citations" in report:
-                logging.info("Triggering Auto-Correction for Citations...")
-                correction_prompt = f"Fix these invalid citations:\n{report}"
-                paper_text = mcp_reviewer._targeted_patch(paper_text, {"weaknesses": [{"severity": "CRITICAL", "area": "Citations", "issue": "Invalid citations found", "suggestion": correction_prompt}]})
+            writer = PaperWriter(model_name=self.config["writing"]["model"])
+            paper_text = writer.fix_paper_citations(paper_text, self.extracted_data)
+            logging.info(writer.citation_validator(self.extracted_data).generate_validation_report(paper_text))
         
         # Iterative Review
         improved_paper, review = mcp_reviewer.iterative_improvement_loop(paper_text, initial_focus_areas=self.config["review"]["focus_areas"])
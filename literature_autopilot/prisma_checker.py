@@ -0,0 +1,255 @@
+import os
+import re
+import json
+import hashlib
+import logging
+from typing import Dict, List, Optional
+from literature_autopilot.context_manager import ContextManager
+
+CACHE_FILE = ".prisma_cache.json"
+# Bump when RULES change, so cached section results are recomputed
+RULES_VERSION = 3
+# Most recent section results kept in the cache file
+MAX_CACHED_SECTIONS = 500
+
+_DATABASES = r"arxiv|semantic scholar|google scholar|scopus|web of science|acm digital library|ieee xplore|pubmed|dblp"
+# Sections in which the search is reported
+_SEARCH_SCOPE = r"method(s|ology)?|search|information sources|data sources|databases?|protocol|appendix"
+
+# Per PRISMA 2020 item: a heading that settles it, phrases that settle it, and
+# weaker cues that only make it a candidate for the LLM check. Strong phrases
+# must read as reporting the item ("we searched arXiv"), not as a passing mention
+# (an arXiv citation, an image file name, a pooled number in the results).
+# With a "scope", strong phrases only settle the item inside sections whose
+# headings match it; elsewhere they make the section a candidate.
+# Heading and scope patterns match whole words only.
+RULES = {
+    "Abstract": {"heading": r"abstract"},
+    "Rationale": {"heading": r"introduction|background|motivation|rationale",
+                  "weak": r"\bmotivat|\bgap\b|has not been|remains unclear"},
+    "Objectives": {"heading": r"objectives?|research questions?|aims?|goals?",
+                   "strong": r"\bRQ\s?\d|\bresearch questions?\b|this review aims|the (aim|objective|goal) of this (review|study|paper)",
+                   "weak": r"\baims?\b|\bobjectives?\b|\bgoals?\b"},
+    "Eligibility Criteria": {"heading": r"eligibility|inclusion|exclusion",
+                             "strong": r"(inclusion|exclusion|eligibility) criteria",
+                             "weak": r"included if|excluded if|eligib"},
+    "Information Sources": {"heading": r"information sources|data sources|databases?",
+                            "strong": r"\b(searched|queried|(retrieved|collected|identified) (\w+ ){0,2}(from|in|via)|search(es)? (was|were) (run|conducted|performed))\b[^.\n]{0,80}\b(" + _DATABASES + r")\b",
+                            "scope": _SEARCH_SCOPE,
+                            "weak": r"\b(" + _DATABASES + r")\b|\bdatabases?\b|\bsources\b"},
+    "Search Strategy": {"heading": r"search (strategy|strings?|quer(y|ies))",
+                        "strong": r"search (strings?|quer(y|ies)|terms)|boolean (search|quer(y|ies)|strings?)|\"[^\"]+\"\s+(AND|OR)\s+",
+                        "scope": _SEARCH_SCOPE,
+                        "weak": r"\bkeywords?\b|\bsearched\b|\bboolean\b"},
+    "Study Selection Process": {"heading": r"(study )?selection|screening",
+                                "strong": r"(screened|screening of) (the )?title(s)? and abstracts?|full[- ]text (screening|review|assessment)",
+                                "weak": r"\bscreen|\bselected\b|prisma (2020 )?flow"},
+    "Data Extraction": {"heading": r"data (extraction|collection|items)",
+                        "strong": r"data (were|was) extracted|extraction (form|schema|template)|extracted the following",
+                        "weak": r"\bextract"},
+    "Risk of Bias": {"heading": r"risk of bias|quality (assessment|appraisal)|critical appraisal",
+                     "strong": r"risk of bias|\bAMSTAR\b|quality assessment",
+                     "weak": r"\bbias\b|\bquality\b"},
+    "Effect Measures": {"heading": r"effect measures?|outcome measures?",
+                        "strong": r"effect measures? (was|were|is|are)|effect sizes? (was|were) (computed|calculated|measured|expressed|defined)|(log|logarithm of the) (response|odds) ratio|standardi[sz]ed mean difference|cohen'?s d|hedges'? g",
+                        "weak": r"\bimprovement\b|\baccuracy gains?\b|percentage points|mean difference|odds ratio|effect sizes?"},
+    "Synthesis Methods": {"heading": r"synthesis|meta-analy(sis|ses)",
+                          "strong": r"(narrative|thematic|qualitative) synthesis|vote counting|(were|was) (pooled|synthesi[sz]ed|combined|aggregated) (using|with|via|in) |random[- ]effects (model|meta-analysis) (was|were)|meta-analy[sz]is (was|were) (conducted|performed|not)",
+                          "weak": r"synthesi|aggregat|\bpooled\b|random[- ]effects|meta-analy"},
+    "Reporting Bias": {"heading": r"reporting bias|publication bias",
+                       "strong": r"publication bias|reporting bias|funnel plot|selective reporting",
+                       "weak": r"\bbias\b"},
+    "Certainty Assessment": {"heading": r"certainty|\bGRADE\b",
+                             "strong": r"\bGRADE\b|certainty of (the )?evidence|confidence in the evidence",
+                             "weak": r"\bcertainty\b|\bconfidence\b"},
+    "Results": {"heading": r"results|findings"},
+    "Discussion": {"heading": r"discussion"},
+    "Limitations": {"heading": r"limitations",
+                    "strong": r"limitations of (this|our|the present) (review|study)|this review has (several |some )?limitations",
+                    "weak": r"\blimitations?\b"},
+    "Conclusions": {"heading": r"conclusions?"},
+    "Registration": {"heading": r"registration",
+                     "strong": r"\bPROSPERO\b|registered (at|with|on|in)|registration number|was not (pre-?)?registered",
+                     "weak": r"regist"},
+    "Protocol": {"heading": r"protocol",
+                 "strong": r"review protocol|protocol (was|is) (available|published|not)",
+                 "weak": r"\bprotocol\b"},
+    "Funding": {"heading": r"funding|acknowledge?ments?",
+                "strong": r"funded by|received no (specific )?funding|grant (no\.|number)",
+                "weak": r"\bfund|\bsupported by\b"},
+    "Conflicts of Interest": {"heading": r"conflicts? of interest|competing interests|declarations?",
+                              "strong": r"conflicts? of interest|competing interests"},
+    "Data Availability": {"heading": r"data availability",
+                          "strong": r"data (are|is) (publicly |openly )?available|data availability",
+                          "weak": r"\bavailable\b"},
+    "Code Availability": {"heading": r"code availability",
+                          "strong": r"code (is|are) (publicly |openly )?available|github\.com|source code",
+                          "weak": r"\bcode\b"},
+    "Supplementary Materials": {"heading": r"supplementary|appendix",
+                                "strong": r"supplementary (material|file|table)s?|appendix [A-Z]\b",
+                                "weak": r"supplement"},
+    "Search Appendix": {"heading": r"appendix.*search|search.*appendix|full search",
+                        "strong": r"full search (strings?|strateg(y|ies))|appendix [A-Z]?\s*(lists|contains|reports).*search",
+                        "weak": r"\bappendix\b"},
+    "Characteristics Table": {"heading": r"characteristics",
+                              "strong": r"characteristics of (the )?included studies|study characteristics",
+                              "weak": r"^\|.*\b(paper|study|studies|title)\b.*\|"},
+}
+
+def _compile(kind: str, pattern: str) -> re.Pattern:
+    if kind in ("heading", "scope"):
+        # Whole words: "aims" must not match "Claims"
+        pattern = r"\b(?:" + pattern + r")\b"
+    return re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+
+_COMPILED = {
+    item: {kind: _compile(kind, pattern) for kind, pattern in rule.items()}
+    for item, rule in RULES.items()
+}
+_HEADING_LINE = re.compile(r"^#{1,6}\s+(.+?)\s*$", re.MULTILINE)
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+MAX_EXCERPTS = 3
+MAX_EXCERPT_CHARS = 300
+
+class PrismaChecker:
+    """
+    Finds which PRISMA 2020 checklist items a paper reports, mostly without an LLM.
+
+    Each section is scanned locally: a matching heading or an unambiguous phrase
+    (e.g. "inclusion criteria", "PROSPERO") settles an item; weaker cues only mark
+    the section as a candidate. Items settled nowhere but with candidates are sent
+    to the LLM in one batched call, with just the matching sentences as excerpts.
+    Items with no cue at all are reported missing.
+
+    Local results and LLM verdicts are cached per section hash, so sections that
+    did not change between improvement iterations are never checked again.
+    """
+
+    def __init__(self, checklist: Dict[str, Dict], model=None, cache_path: str = CACHE_FILE):
+        self.checklist = checklist
+        self.model = model
+        self.cache_path = cache_path
+        self.cache: Dict[str, Dict] = {}
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r") as f:
+                    self.cache = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning(f"Could not read PRISMA cache '{cache_path}': {e}")
+
+    def _save(self):
+        for old_key in list(self.cache)[:-MAX_CACHED_SECTIONS]:
+            del self.cache[old_key]
+        if not self.cache_path:
+            return
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.cache, f, indent=2)
+        os.replace(tmp_path, self.cache_path)
+
+    @staticmethod
+    def section_hash(text: str, parent: str = "") -> str:
+        return hashlib.sha256(f"{RULES_VERSION}\n{parent}\n{text}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def scan_section(text: str, parent: str = "") -> Dict[str, Dict]:
+        """
+        Local pass over one section: {item: {"status": "present" | "candidate", "excerpts": [...]}}.
+        `parent` is the heading of the enclosing top-level section, used for scopes only.
+        """
+        headings = " | ".join(_HEADING_LINE.findall(text))
+        scope_headings = " | ".join(h for h in [parent, headings] if h)
+        body = _HEADING_LINE.sub("", text)
+        results = {}
+        for item, rule in _COMPILED.items():
+            strong = "strong" in rule and rule["strong"].search(body)
+            in_scope = "scope" not in rule or bool(scope_headings and rule["scope"].search(scope_headings))
+            if "heading" in rule and headings and rule["heading"].search(headings):
+                results[item] = {"status": "present", "excerpts": []}
+            elif strong and in_scope:
+                results[item] = {"status": "present", "excerpts": []}
+            elif strong or ("weak" in rule and rule["weak"].search(body)):
+                cue = rule["strong"] if strong else rule["weak"]
+                excerpts = [s.strip()[:MAX_EXCERPT_CHARS] for s in _SENTENCE_SPLIT.split(body)
+                            if s.strip() and cue.search(s)]
+                results[item] = {"status": "candidate", "excerpts": excerpts[:MAX_EXCERPTS]}
+        return results
+
+    def _section_entry(self, text: str, parent: str = "") -> Dict:
+        key = self.section_hash(text, parent)
+        # Re-inserted on every use, so the oldest entries are the least recently used
+        entry = self.cache.pop(key, None) or {"items": self.scan_section(text, parent), "llm": {}}
+        self.cache[key] = entry
+        return entry
+
+    def _ask_llm(self, questions: List[Dict]) -> Dict[str, bool]:
+        """One call for all ambiguous (item, section) pairs. Returns {question id: present}."""
+        listing = "\n\n".join(
+            f"[{q['id']}] ITEM: {q['item']} | SECTION: {q['section'] or '(front matter)'}\n"
+            + "\n".join(f"  - \"{e}\"" for e in q["excerpts"])
+            for q in questions
+        )
+        prompt = f"""
+        You are a Compliance Officer checking a Systematic Literature Review against PRISMA 2020.
+        For each question below, decide from the excerpts whether the section actually REPORTS
+        the PRISMA item (a passing mention of the word is not enough).
+
+        {listing}
+
+        Output Format (JSON ONLY):
+        {{"verdicts": {{"<question id>": true or false}}}}
+        """
+        response = self.model.generate_content(prompt)
+        text = response.text.strip()
+        if "```json" in text:
+            text = text.split("```json")[1].split("```")[0]
+        verdicts = json.loads(text).get("verdicts", {})
+        return {str(k): bool(v) for k, v in verdicts.items()}
+
+    def check(self, paper_text: str) -> Dict:
+        """Returns {"checklist": {item: {"present", "location"}}, "missing_items": [...], "llm_checked": n}."""
+        sections = ContextManager.split_by_headings(paper_text)
+        entries = []
+        parent = ""
+        for s in sections:
+            if s["level"] <= 1:
+                parent = s["heading"]
+                entries.append((s, self._section_entry(s["text"])))
+            else:
+                entries.append((s, self._section_entry(s["text"], parent)))
+
+        present: Dict[str, Optional[str]] = {}
+        first_line = next((line.strip() for line in paper_text.splitlines() if line.strip()), "")
+        if first_line.startswith("#") or 0 < len(first_line) <= 200:
+            present["Title"] = "Header"
+        for section, entry in entries:
+            for item, result in entry["items"].items():
+                settled = result["status"] == "present" or entry["llm"].get(item) is True
+                if settled and item not in present:
+                    present[item] = section["heading"] or "Front matter"
+
+        # Ambiguous: not settled anywhere, but some section has cues the LLM has not judged yet
+        questions = []
+        for section, entry in entries:
+            for item, result in entry["items"].items():
+                if item in present or item not in self.checklist:
+                    continue
+                if result["status"] == "candidate" and item not in entry["llm"]:
+                    questions.append({"id": str(len(questions)), "item": item, "section": section["heading"],
+                                      "excerpts": result["excerpts"], "entry": entry})
+        if questions and self.model is not None:
+            print(f"  [Compliance] {len(questions)} ambiguous item/section pairs sent to the LLM...")
+            try:
+                verdicts = self._ask_llm(questions)
+                for q in questions:
+                    if q["id"] in verdicts:
+                        q["entry"]["llm"][q["item"]] = verdicts[q["id"]]
+                    if verdicts.get(q["id"]) and q["item"] not in present:
+                        present[q["item"]] = q["section"] or "Front matter"
+            except Exception as e:
+                print(f"    PRISMA LLM check failed: {e}")
+        self._save()
+
+        checklist = {item: {"present": item in present, "location": present.get(item)} for item in self.checklist}
+        missing = [item for item, spec in self.checklist.items() if spec["required"] and item not in present]
+        return {"checklist": checklist, "missing_items": missing, "llm_checked": len(questions)}
@@ -1,8 +1,12 @@
 import os
 import json
 import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 from literature_autopilot.llm_utils import RotatableModel
+from literature_autopilot.context_manager import RecordIndex
+from literature_autopilot.style_linter import StyleLinter
+from literature_autopilot.edit_ops import EDIT_FORMAT_INSTRUCTIONS, edit_or_rewrite
 
 class MultiAgentReviewer:
     MAX_ROUNDS = 2 # Increased for quality
@@ -15,8 +19,11 @@ class MultiAgentReviewer:
     4.  **Content**: NO placeholders ("N studies"). Explicitly state numbers.
     """
 
-    def __init__(self, model_name: str = "gemini-1.5-pro-latest"):
+    def __init__(self, model_name: str = "gemini-1.5-pro-latest", context_token_budget: int = 30000, edit_mode: str = "patch"):
         self.model = RotatableModel(model_name)
+        self.edit_mode = edit_mode  # "patch" (anchored edit operations) or "rewrite" (full section)
+        self.context_token_budget = context_token_budget  # Source records shown to the FactChecker (None = all)
+        self.linter = StyleLinter()
 
     def _call_agent(self, prompt: str) -> str:
         try:
@@ -29,12 +36,14 @@ class MultiAgentReviewer:
     def review_section(self, section_name: str, draft_text: str, source_data: List[Dict] = None, max_rounds: int = 2) -> str:
         """
         Runs the Multi-Agent Debate Loop:
-        Writer -> (Hawk + Architect) -> Moderator -> Editor -> Loop
+        Writer -> (StyleLinter + Hawk + Architect + StyleCritic + FactChecker, in parallel) -> Moderator -> Editor -> Loop
         """
         current_draft = draft_text
         
         for i in range(max_rounds):
             print(f"  [Multi-Agent Debate] Round {i+1}/{max_rounds} for '{section_name}'...")
+            # Mechanical fixes need no reviewer or editor
+            current_draft = StyleLinter.autofix(current_draft)
             
             # 1. Methodological Hawk
             prompt_hawk = f"""
@@ -131,7 +140,6 @@ class MultiAgentReviewer:
             
             **Draft Text**: {current_draft}
             """
-            critique_hawk = self._call_agent(prompt_hawk)
             
             # 2. Narrative Architect
             prompt_architect = f"""
@@ -151,56 +159,42 @@ class MultiAgentReviewer:
 
             **Task**: Provide a numbered list of constructive suggestions.
             """
-            critique_architect = self._call_agent(prompt_architect)
 
-            # 3. StyleCritic (New Agent)
+            # 3. StyleLinter (deterministic): banned words, sentence length, bold, bullets, "et al.", placeholders, labels
+            critique_lint = StyleLinter.report(self.linter.lint(current_draft, section_name))
+
+            # 4. StyleCritic: only the judgement calls the linter cannot make
             prompt_style = f"""
             You are a ruthless copyeditor.
             
             {self.STYLE_GUIDELINES}
             
-            **BANNED WORDS**: Crucial, Paramount, Delve, Landscape, Burgeoning, Underscore, Potential, Comprehensive, Multifaceted, Elucidate, Leverage, Pave the way, Actionable insights, Testament to.
+            Banned words, sentence length, bold text, bullets, "et al." typos, placeholders and figure labels
+            are checked by an automatic linter. Do NOT report those.
             
             **Review Criteria**:
-            1.  **Robotic Prose**: Does it sound like AI?
-            2.  **Sentence Length**: Flag sentences > 25 words.
-            3.  **Formatting**: NO BOLD. NO BULLETS in body. Figure labels "Figure X".
-            4.  **Passive Voice**: Flag excessive passive voice.
-            5.  **Placeholders**: FLAG ANY "N studies".
+            1.  **Robotic Prose**: Does it sound like AI? Formulaic transitions, empty intensifiers, vague generalizations.
+            2.  **Passive Voice**: Flag excessive passive voice.
+            3.  **Tense & Perspective**: Past tense for results and methods, no "I".
+            4.  **Date Consistency**: The review period is Jan 2022 – May 2025.
+            5.  **Study Counts**: Numbers of analyzed studies must be consistent within the text.
 
             **Section**: {section_name}
             **Draft Text**: {current_draft}
             
-            **Task**: Identify violations and suggest rewrites.
-            """
-            critique_style = self._call_agent(prompt_style)
-
-            # 4. ConsistencyCritic (New Agent)
-            prompt_consistency = f"""
-            You are the "ConsistencyCritic".
-            
-            {self.STYLE_GUIDELINES}
-            
-            **Review Criteria**:
-            1.  **Citation Typos**: "et al" (no dot). (Author, Year).
-            2.  **Date Consistency**: Jan 2022 – May 2025.
-            3.  **Study Counts**: Flag "N studies". Must be specific number.
-            4.  **Bibliography**: Check for duplicates.
-            
-            **Section**: {section_name}
-            **Draft Text**: {current_draft}
-            
             **Task**: 
-            - Identify specific violations.
-            - If the text is consistent, output "NO CONSISTENCY ISSUES".
+            - Identify specific violations and suggest rewrites.
+            - If there are none, output "NO STYLE ISSUES".
             """
-            critique_consistency = self._call_agent(prompt_consistency)
 
             # 5. FactChecker (The Hallucination Guard)
-            critique_fact = "NO FACTUAL ISSUES (No source data provided)"
+            prompt_fact = None
             if source_data:
-                # Convert source data to a compact string for the prompt
-                source_context = json.dumps(source_data, indent=2)
+                # Only the records the draft talks about, as compact JSON
+                if self.context_token_budget is None:
+                    source_context = json.dumps(source_data, indent=2)
+                else:
+                    source_context = RecordIndex(source_data).context(current_draft, self.context_token_budget)
                 prompt_fact = f"""
                 You are the "FactChecker". Your ONLY job is to verify that the claims in the text are supported by the provided source data.
                 You are the final line of defense against hallucinations.
@@ -222,7 +216,13 @@ class MultiAgentReviewer:
                 - If all claims are verified: "NO FACTUAL ISSUES".
                 - If errors found: Provide a bulleted list of SPECIFIC discrepancies. Quote the text and the data.
                 """
-                critique_fact = self._call_agent(prompt_fact)
+            
+            # The critics only read the current draft, so they run concurrently
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                futures = [pool.submit(self._call_agent, p) for p in [prompt_hawk, prompt_architect, prompt_style, prompt_fact] if p]
+                critiques = [f.result() for f in futures]
+            critique_hawk, critique_architect, critique_style = critiques[:3]
+            critique_fact = critiques[3] if prompt_fact else "NO FACTUAL ISSUES (No source data provided)"
             
             # 6. Moderator
             prompt_moderator = f"""
@@ -232,9 +232,9 @@ class MultiAgentReviewer:
             
             **Critique from Narrative Architect**: {critique_architect}
             
-            **Critique from StyleCritic**: {critique_style}
+            **Critique from StyleLinter (rule-based, exact; every violation must be fixed)**: {critique_lint}
             
-            **Critique from ConsistencyCritic**: {critique_consistency}
+            **Critique from StyleCritic**: {critique_style}
 
             **Critique from FactChecker (CRITICAL)**: {critique_fact}
 
@@ -243,7 +243,7 @@ class MultiAgentReviewer:
             2.  **Prioritize**: 
                 - **PRIORITY 0 (FATAL)**: Any issues flagged by **FactChecker** (Hallucinations/Lies) MUST be fixed first.
                 - **PRIORITY 1**: Methodological flaws (Hawk).
-                - **PRIORITY 2**: Style and Consistency issues (StyleCritic/ConsistencyCritic).
+                - **PRIORITY 2**: Style and Consistency issues (StyleLinter/StyleCritic).
                 - **PRIORITY 3**: Flow and Narrative (Architect).
             3.  **Check for Convergence**: Assess if the critiques are minor refinements or fundamental flaws. If the critiques are minor (e.g., wording suggestions, typos) AND FactChecker is happy, state "CONVERGENCE REACHED". Otherwise, state "REVISION REQUIRED".
 
@@ -291,6 +291,27 @@ class MultiAgentReviewer:
 
             Output ONLY the rewritten text. Do not add any commentary.
             """
-            current_draft = self._call_agent(prompt_editor)
+            if self.edit_mode == "patch":
+                # Output tokens scale with the number of fixes instead of the section length
+                prompt_patch = f"""
+            You are a world-class academic writer and editor. Your goal is to produce a flawless, A+ quality paper section.
+
+            **Section**: {section_name}
+
+            **Current Draft**: {current_draft}
+
+            **Moderator's Action Plan**: {json.dumps(moderator_output.get('full_action_plan'))}
+            **Top Priorities**: {json.dumps(moderator_output.get('top_3_priorities'))}
+
+            **Instructions**:
+            - **Address every single point** from the action plan with targeted edits to the draft.
+            - Pay special attention to implementing the top priorities flawlessly.
+            - Leave passages that need no change untouched.
+            {EDIT_FORMAT_INSTRUCTIONS}
+            """
+                current_draft = edit_or_rewrite(current_draft, self._call_agent(prompt_patch),
+                                                lambda: self._call_agent(prompt_editor), label=f"'{section_name}'")
+            else:
+                current_draft = self._call_agent(prompt_editor)
             
         return current_draft
@@ -28,6 +28,10 @@ def main():
     parser.add_argument("--skip-search", action="store_true", help="Skip search and snowballing phase")
     parser.add_argument("--skip-analysis", action="store_true", help="Skip analysis phase (Visuals, Gaps, GRADE)")
     parser.add_argument("--resume-from", type=str, choices=["search", "screen", "download", "extract", "analyze", "write", "review"], help="Resume pipeline from a specific step")
+    
+    # Incremental Mode
+    parser.add_argument("--incremental", action="store_true", help="Rerun only steps whose inputs (config, prompts, upstream artifacts) changed")
+    parser.add_argument("--force", type=str, nargs="+", choices=["search", "screen", "download", "extract", "analyze", "write", "review"], help="Steps to rerun regardless of input hashes (with --incremental)")
 
     args = parser.parse_args()
     
@@ -0,0 +1,154 @@
+import os
+import json
+import hashlib
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+STATE_FILE = ".slr_pipeline_state.json"
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents (streamed, so large PDFs are fine)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_value(value: Any) -> str:
+    """Stable SHA-256 of any JSON-serialisable value (dict key order does not matter)."""
+    payload = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def get_config_value(config: Dict[str, Any], dotted_key: str) -> Any:
+    """Resolve 'screening.model' style keys against the nested config dict."""
+    node = config
+    for part in dotted_key.split("."):
+        if not isinstance(node, dict) or part not in node:
+            return None
+        node = node[part]
+    return node
+
+class Stage:
+    """
+    A single pipeline step with declared inputs and outputs.
+
+    Args:
+        name: Stage name (matches the --resume-from step names).
+        run: Callable that (re)builds the outputs.
+        config_keys: Dotted config keys whose values affect the outputs.
+        input_files: Prompt files and upstream artifacts the stage reads.
+        outputs: Artifacts the stage writes. A stage without outputs keeps its
+            results in memory only and therefore always runs.
+        load: Optional callable that hydrates pipeline state from the existing
+            outputs when the stage is skipped or disabled.
+        dynamic_inputs: Optional callable returning extra JSON-serialisable
+            inputs that are only known at run time (e.g. the downloaded PDFs).
+    """
+
+    def __init__(self, name: str, run: Callable[[], Any], config_keys: List[str] = None,
+                 input_files: List[str] = None, outputs: List[str] = None,
+                 load: Optional[Callable[[], Any]] = None,
+                 dynamic_inputs: Optional[Callable[[], Any]] = None):
+        self.name = name
+        self.run = run
+        self.config_keys = config_keys or []
+        self.input_files = [path for path in (input_files or []) if path]
+        self.outputs = outputs or []
+        self.load = load
+        self.dynamic_inputs = dynamic_inputs
+
+class StageRunner:
+    """
+    Make-like executor over the pipeline stages.
+
+    Each stage is fingerprinted from the values of its config keys and the
+    content hashes of its input files. A stage reruns only if its fingerprint
+    differs from the one recorded after its last successful run, or if one of
+    its outputs is missing. Because upstream artifacts are declared as inputs,
+    a rebuilt upstream output that actually changed cascades downstream, while
+    a rebuild that produced identical bytes does not.
+
+    Work inside a stage is tracked by the stage itself; extraction, for example,
+    keeps per-paper results in its own ledger (see `ExtractionLedger`), so a
+    stale stage only redoes the papers whose inputs changed.
+    """
+
+    def __init__(self, config: Dict[str, Any], state_path: str = STATE_FILE):
+        self.config = config
+        self.state_path = state_path
+        self.stages: List[Stage] = []
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict[str, Any]:
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, "r") as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning(f"Could not read stage state '{self.state_path}' ({e}). Starting fresh.")
+        return {"stages": {}}
+
+    def save_state(self):
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def add_stage(self, stage: Stage) -> Stage:
+        self.stages.append(stage)
+        return stage
+
+    def fingerprint(self, stage: Stage) -> str:
+        """Hash of everything the stage's outputs depend on."""
+        inputs = {
+            "config": {key: get_config_value(self.config, key) for key in stage.config_keys},
+            "files": {
+                path: hash_file(path) if os.path.exists(path) else None
+                for path in stage.input_files
+            },
+            "dynamic": stage.dynamic_inputs() if stage.dynamic_inputs else None,
+        }
+        return hash_value(inputs)
+
+    def is_stale(self, stage: Stage) -> bool:
+        if not stage.outputs:
+            return True
+        if any(not os.path.exists(path) for path in stage.outputs):
+            return True
+        recorded = self.state["stages"].get(stage.name, {}).get("fingerprint")
+        return recorded != self.fingerprint(stage)
+
+    def run(self, enabled: List[str] = None, force: List[str] = None):
+        """
+        Execute the registered stages in order.
+
+        Args:
+            enabled: Stage names that may run. Disabled stages never run, but
+                their existing outputs are still loaded so downstream stages
+                can use them. Defaults to all stages.
+            force: Stage names to rerun regardless of their fingerprint.
+        """
+        enabled = set(enabled) if enabled is not None else {s.name for s in self.stages}
+        force = set(force or [])
+
+        for stage in self.stages:
+            if stage.name not in enabled:
+                # Stages without outputs hydrate from elsewhere (e.g. the PDF store)
+                if stage.load and all(os.path.exists(p) for p in stage.outputs):
+                    stage.load()
+                continue
+
+            if stage.name in force or self.is_stale(stage):
+                logging.info(f"[Stage Runner] Running stage '{stage.name}'...")
+                fingerprint = self.fingerprint(stage)
+                stage.run()
+                # Record the fingerprint of the inputs the stage actually consumed
+                self.state["stages"][stage.name] = {
+                    "fingerprint": fingerprint,
+                    "outputs": {p: hash_file(p) for p in stage.outputs if os.path.exists(p)},
+                }
+                self.save_state()
+            else:
+                logging.info(f"[Stage Runner] Stage '{stage.name}' is up to date. Skipping.")
+                if stage.load:
+                    stage.load()
@@ -0,0 +1,196 @@
+import re
+from typing import Dict, List, Optional
+
+# Words that mark robotic prose (StyleCritic list plus the writer's own "AI fluff" list), with inflections
+BANNED_WORDS = {
+    "crucial": ["crucial", "crucially"],
+    "paramount": ["paramount"],
+    "delve": ["delve", "delves", "delved", "delving"],
+    "landscape": ["landscape", "landscapes"],
+    "burgeoning": ["burgeoning"],
+    "underscore": ["underscore", "underscores", "underscored", "underscoring"],
+    "potential": ["potential", "potentially"],
+    "comprehensive": ["comprehensive", "comprehensively"],
+    "multifaceted": ["multifaceted"],
+    "elucidate": ["elucidate", "elucidates", "elucidated", "elucidating"],
+    "leverage": ["leverage", "leverages", "leveraged", "leveraging"],
+    "tapestry": ["tapestry"],
+}
+BANNED_PHRASES = ["pave the way", "paves the way", "paved the way", "actionable insights", "testament to"]
+
+# Sections where the body must be prose (no bullet lists)
+PROSE_SECTIONS = ("abstract", "introduction", "analysis", "discussion", "conclusion")
+
+MAX_SENTENCE_WORDS = 25
+
+_BANNED_FORMS = {form: word for word, forms in BANNED_WORDS.items() for form in forms}
+_BANNED_PHRASE_PATTERN = re.compile(r"\b(?:" + "|".join(re.escape(p) for p in BANNED_PHRASES) + r")\b", re.IGNORECASE)
+_WORD_PATTERN = re.compile(r"(?:[A-Za-z]\.){2,}|[A-Za-z0-9][A-Za-z0-9'\-]*(?:[.,]\d+)*%?\.?|[.!?]")
+_BOLD_PATTERN = re.compile(r"\*\*[^*\n]+?\*\*|__[^_\n]+?__")
+_BULLET_PATTERN = re.compile(r"^\s*(?:[-*+•]|\d+[.)])\s+")
+_ET_AL_PATTERN = re.compile(r"\bet al\b(?!\.)")
+_ET_AL_TYPO_PATTERN = re.compile(r"\b(?:etajl|ets al|et\. al)\b\.?", re.IGNORECASE)
+_PLACEHOLDER_PATTERN = re.compile(
+    r"\bN\s+(?:studies|papers|articles)\b|\[(?:insert|add|todo|tbd)[^\]]*\]|\bTBD\b|\bXX+\b", re.IGNORECASE
+)
+_FIGURE_LABEL_PATTERN = re.compile(r"\bAbb\.\s*(\d+)")
+_DASH_PATTERN = re.compile(r"—| -- |--")
+# Tokens ending in a dot that do not end a sentence
+_ABBREVIATIONS = {"al.", "e.g.", "i.e.", "fig.", "vs.", "cf.", "etc.", "approx.", "eq.", "sec.", "no.", "abb."}
+
+class StyleViolation:
+    """One rule violation with its character offsets in the linted text."""
+
+    def __init__(self, rule: str, message: str, start: int, end: int, excerpt: str):
+        self.rule = rule
+        self.message = message
+        self.start = start
+        self.end = end
+        self.excerpt = excerpt
+
+    def to_dict(self) -> Dict:
+        return {"rule": self.rule, "message": self.message, "start": self.start, "end": self.end, "excerpt": self.excerpt}
+
+    def __repr__(self):
+        return f"StyleViolation({self.rule!r}, {self.start}-{self.end}, {self.excerpt!r})"
+
+
+class StyleLinter:
+    """
+    Deterministic checks for the mechanical style rules of the writing guidelines:
+    banned words, sentence length, bold text, bullets in prose sections, "et al."
+    typos, placeholders, "Abb." figure labels and em-dashes.
+
+    Replaces the LLM StyleCritic/ConsistencyCritic for everything a rule can
+    express; judgement calls (tone, passive voice, consistency with the data)
+    stay with the LLM critic.
+    """
+
+    def __init__(self, max_sentence_words: int = MAX_SENTENCE_WORDS):
+        self.max_sentence_words = max_sentence_words
+
+    @staticmethod
+    def _is_prose_line(stripped: str) -> bool:
+        """Headings, tables, figures, code fences and rules are not checked as prose."""
+        return bool(stripped) and not stripped.startswith(("#", "|", "![", "```")) and not re.fullmatch(r"[-*_\s]{3,}", stripped)
+
+    def lint(self, text: str, section_name: Optional[str] = None) -> List[StyleViolation]:
+        """Returns all violations in document order. Level-1 headings switch the current section."""
+        violations = []
+        current_section = (section_name or "").lower()
+        # Same offsets as `text`, with non-prose lines blanked out for the sentence pass
+        prose = []
+        offset = 0
+        in_code = False
+        for line in text.split("\n"):
+            stripped = line.strip()
+            if stripped.startswith("```"):
+                in_code = not in_code
+            if re.match(r"#\s", stripped):
+                current_section = stripped.lstrip("# ").lower()
+            if not in_code and self._is_prose_line(stripped):
+                violations.extend(self._lint_line(line, offset, current_section))
+                prose.append(line)
+            else:
+                prose.append("\n" * len(line))
+            offset += len(line) + 1
+        violations.extend(self._lint_sentences("\n".join(prose), text))
+        return sorted(violations, key=lambda v: v.start)
+
+    def _lint_line(self, line: str, offset: int, section: str) -> List[StyleViolation]:
+        found = []
+
+        def add(rule, message, match):
+            found.append(StyleViolation(rule, message, offset + match.start(), offset + match.end(), match.group(0)))
+
+        if any(name in section for name in PROSE_SECTIONS):
+            match = _BULLET_PATTERN.match(line)
+            if match:
+                add("bullet_in_body", "Bullet points are not allowed here; use full paragraphs.", match)
+        for match in _BOLD_PATTERN.finditer(line):
+            add("bold_text", "No bold emphasis in body text.", match)
+        for match in _BANNED_PHRASE_PATTERN.finditer(line):
+            add("banned_phrase", f"Banned phrase '{match.group(0)}'.", match)
+        for match in _ET_AL_PATTERN.finditer(line):
+            add("et_al_dot", "Write 'et al.' with a dot.", match)
+        for match in _ET_AL_TYPO_PATTERN.finditer(line):
+            add("et_al_typo", f"Misspelled 'et al.': '{match.group(0)}'.", match)
+        for match in _PLACEHOLDER_PATTERN.finditer(line):
+            add("placeholder", f"Placeholder '{match.group(0)}'; use the actual number or content.", match)
+        for match in _FIGURE_LABEL_PATTERN.finditer(line):
+            add("figure_label", f"Use 'Figure {match.group(1)}', not '{match.group(0)}'.", match)
+        for match in _DASH_PATTERN.finditer(line):
+            add("em_dash", "No em-dashes; use a comma or split the sentence.", match)
+        return found
+
+    def _lint_sentences(self, prose: str, text: str) -> List[StyleViolation]:
+        """Single pass over word tokens: flags banned words and counts words per sentence."""
+        found = []
+        sentence_start, words, last_end = None, 0, 0
+
+        def close(end):
+            if sentence_start is not None and words > self.max_sentence_words:
+                excerpt = text[sentence_start:end]
+                found.append(StyleViolation(
+                    "long_sentence", f"Sentence has {words} words (max {self.max_sentence_words}).",
+                    sentence_start, end, excerpt[:80] + ("..." if len(excerpt) > 80 else "")
+                ))
+
+        for match in _WORD_PATTERN.finditer(prose):
+            token = match.group(0)
+            # A blank line ends a sentence too (paragraph ends, list items without punctuation)
+            if sentence_start is not None and "\n\n" in prose[last_end:match.start()]:
+                close(last_end)
+                sentence_start, words = None, 0
+            last_end = match.end()
+            if token in ".!?":
+                close(match.end())
+                sentence_start, words = None, 0
+                continue
+
+            if sentence_start is None:
+                sentence_start = match.start()
+            words += 1
+            word = token.rstrip(".").lower()
+            if word in _BANNED_FORMS:
+                found.append(StyleViolation("banned_word", f"Banned word '{_BANNED_FORMS[word]}'.",
+                                            match.start(), match.start() + len(word), token.rstrip(".")))
+            if token.endswith(".") and token.lower() not in _ABBREVIATIONS and not re.fullmatch(r"[A-Z]\.", token):
+                close(match.end())
+                sentence_start, words = None, 0
+        close(last_end)
+        return found
+
+    @classmethod
+    def autofix(cls, text: str) -> str:
+        """
+        Applies the fixes that need no judgement (em-dashes, 'et al.', figure labels)
+        to prose lines only, so table rules like |---| survive.
+        """
+        lines = []
+        in_code = False
+        for line in text.split("\n"):
+            stripped = line.strip()
+            if stripped.startswith("```"):
+                in_code = not in_code
+            if not in_code and cls._is_prose_line(stripped):
+                line = re.sub(r"\s*—\s*", ", ", line).replace(" -- ", ", ").replace("--", ", ")
+                # Fix any double commas created by replacement
+                line = line.replace(", ,", ",").replace(" ,", ",")
+                line = _ET_AL_TYPO_PATTERN.sub("et al.", line)
+                line = _ET_AL_PATTERN.sub("et al.", line)
+                line = _FIGURE_LABEL_PATTERN.sub(r"Figure \1", line)
+            lines.append(line)
+        return "\n".join(lines)
+
+    @staticmethod
+    def report(violations: List[StyleViolation], limit: int = 40) -> str:
+        """Violation list for a critique prompt; 'NO STYLE VIOLATIONS' if clean."""
+        if not violations:
+            return "NO STYLE VIOLATIONS"
+        lines = [f"{len(violations)} rule violations (character offsets in the draft):"]
+        for v in violations[:limit]:
+            lines.append(f"- [{v.rule}] @{v.start}-{v.end}: \"{v.excerpt}\". {v.message}")
+        if len(violations) > limit:
+            lines.append(f"- ... and {len(violations) - limit} more.")
+        return "\n".join(lines)
@@ -0,0 +1,117 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from literature_autopilot.pdf_store import PDFStore
+
+REGISTRY_FILE = ".gemini_uploads.json"
+
+class GeminiUploadRegistry:
+    """
+    Reuses Gemini File API uploads across stages and runs.
+
+    Uploads are keyed by PDF content hash and recorded with their remote file
+    name and expiry (Gemini keeps files for 48 hours). A live upload is reused,
+    an expired or missing one is uploaded again, and remote files that were
+    uploaded by us but are no longer registered can be deleted.
+    """
+
+    EXPIRY_MARGIN_SECONDS = 15 * 60  # Do not hand out files that expire mid-extraction
+    DEFAULT_TTL_SECONDS = 47 * 3600
+
+    def __init__(self, path: str = REGISTRY_FILE, max_workers: int = 4):
+        self.path = path
+        self.max_workers = max_workers
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._hash_locks: Dict[str, threading.Lock] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning(f"Could not read upload registry '{path}': {e}")
+
+    def _save(self):
+        """Writes a snapshot of the entries. Call with self._lock held."""
+        snapshot = dict(self.entries)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _hash_lock(self, content_hash: str) -> threading.Lock:
+        with self._lock:
+            return self._hash_locks.setdefault(content_hash, threading.Lock())
+
+    def get(self, pdf_path: str):
+        """Returns an ACTIVE Gemini file for the PDF, uploading only if needed."""
+        content_hash = PDFStore.hash_of(pdf_path)
+        # One upload per content hash, even if several workers ask at once
+        with self._hash_lock(content_hash):
+            with self._lock:
+                entry = self.entries.get(content_hash)
+            if entry and entry["expires_at"] - time.time() > self.EXPIRY_MARGIN_SECONDS:
+                try:
+                    f = genai.get_file(entry["name"])
+                    if f.state.name == "ACTIVE":
+                        logging.info(f"  [Upload Registry] Reusing {entry['name']} for {os.path.basename(pdf_path)}")
+                        return f
+                except Exception as e:
+                    logging.info(f"  [Upload Registry] {entry['name']} is gone ({e}). Uploading again...")
+
+            f = self._upload(pdf_path, content_hash)
+            expires_at = f.expiration_time.timestamp() if getattr(f, "expiration_time", None) else time.time() + self.DEFAULT_TTL_SECONDS
+            with self._lock:
+                self.entries[content_hash] = {"name": f.name, "expires_at": expires_at}
+                self._save()
+            return f
+
+    @staticmethod
+    def _upload(pdf_path: str, content_hash: str):
+        # display_name marks the file as ours for orphan cleanup
+        f = genai.upload_file(pdf_path, display_name=content_hash)
+        # Wait for processing
+        while f.state.name == "PROCESSING":
+            time.sleep(2)
+            f = genai.get_file(f.name)
+        if f.state.name == "FAILED":
+            raise ValueError(f"File processing failed: {f.state.name}")
+        return f
+
+    def prefetch(self, pdf_paths: List[str]) -> Dict[str, object]:
+        """Uploads (or revalidates) many PDFs concurrently, ahead of the LLM calls."""
+        def safe_get(path):
+            try:
+                return self.get(path)
+            except Exception as e:
+                logging.warning(f"  [Upload Registry] Prefetch failed for {path}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            files = list(pool.map(safe_get, pdf_paths))
+        return {path: f for path, f in zip(pdf_paths, files) if f is not None}
+
+    def cleanup_orphans(self) -> int:
+        """Deletes our remote files that are not in the registry and drops expired entries."""
+        now = time.time()
+        with self._lock:
+            self.entries = {h: e for h, e in self.entries.items() if e["expires_at"] > now}
+            self._save()
+            registered = {e["name"] for e in self.entries.values()}
+        deleted = 0
+        try:
+            for f in genai.list_files():
+                if f.name not in registered and re.fullmatch(r"[0-9a-f]{64}", f.display_name or ""):
+                    genai.delete_file(f.name)
+                    deleted += 1
+        except Exception as e:
+            logging.warning(f"  [Upload Registry] Orphan cleanup failed: {e}")
+        if deleted:
+            logging.info(f"  [Upload Registry] Deleted {deleted} orphaned uploads.")
+        return deleted
@@ -0,0 +1,141 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+CACHE_FILE = ".venue_cache.json"
+S2_URL = "https://api.semanticscholar.org/graph/v1"
+S2_FIELDS = "title,venue,year,publicationVenue"
+
+class VenueNormalizer:
+    """
+    Resolves the official publication venue (e.g. 'NeurIPS 2024') of arXiv papers
+    via Semantic Scholar, so citations do not point at preprints.
+
+    Titles are resolved once, in batch: papers with a known arXiv ID go through a
+    single /paper/batch request per 500 IDs, the rest through a few concurrent
+    title-match lookups. Results are cached on disk (misses are rechecked after
+    a week, since preprints get published), and one instance is safe to share
+    between threads.
+    """
+
+    ID_BATCH_SIZE = 500
+    MISS_TTL_SECONDS = 7 * 24 * 3600
+
+    def __init__(self, cache_path: str = CACHE_FILE, api_key: Optional[str] = None, max_workers: int = 2):
+        self.cache_path = cache_path
+        self.headers = {"x-api-key": api_key} if api_key else {}
+        self.max_workers = max_workers
+        self.cache: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r") as f:
+                    self.cache = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning(f"Could not read venue cache '{cache_path}': {e}")
+
+    @staticmethod
+    def normalize_title(title: str) -> str:
+        return "".join(c.lower() for c in title if c.isalnum())
+
+    @staticmethod
+    def arxiv_id_from(*fields) -> Optional[str]:
+        """Finds a new-style arXiv ID (e.g. 2303.17651) in URLs or DOIs."""
+        for field in fields:
+            match = re.search(r"(\d{4}\.\d{4,5})", str(field or ""))
+            if match:
+                return match.group(1)
+        return None
+
+    def _save(self):
+        with self._lock:
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.cache, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+
+    def _cached(self, title: str) -> Optional[Dict]:
+        entry = self.cache.get(self.normalize_title(title))
+        if entry and (entry["venue"] or time.time() - entry["checked_at"] < self.MISS_TTL_SECONDS):
+            return entry
+        return None
+
+    def _store(self, title: str, paper: Optional[Dict]):
+        venue = None
+        if paper:
+            # Prefer full venue name
+            venue = (paper.get("publicationVenue") or {}).get("name") or paper.get("venue")
+            if venue and venue.lower() == "arxiv":
+                venue = None
+        with self._lock:
+            self.cache[self.normalize_title(title)] = {
+                "venue": venue,
+                "year": paper.get("year") if paper else None,
+                "checked_at": time.time()
+            }
+
+    def _request(self, method: str, url: str, **kwargs) -> Optional[requests.Response]:
+        """Semantic Scholar call with a short backoff on rate limiting. None on failure."""
+        for attempt in range(3):
+            try:
+                response = requests.request(method, url, headers=self.headers, timeout=10, **kwargs)
+            except requests.RequestException as e:
+                logging.warning(f"  [Venue Normalizer] Request failed: {e}")
+                return None
+            if response.status_code != 429:
+                return response
+            time.sleep(2 ** attempt)
+        return None
+
+    def _resolve_ids(self, id_titles: Dict[str, str]):
+        ids = list(id_titles)
+        for start in range(0, len(ids), self.ID_BATCH_SIZE):
+            batch = ids[start:start + self.ID_BATCH_SIZE]
+            response = self._request("POST", f"{S2_URL}/paper/batch", params={"fields": S2_FIELDS},
+                                     json={"ids": [f"ARXIV:{i}" for i in batch]})
+            if response is None or response.status_code != 200:
+                continue  # Left uncached, retried next time
+            for arxiv_id, paper in zip(batch, response.json()):
+                self._store(id_titles[arxiv_id], paper)
+
+    def _resolve_title(self, title: str):
+        response = self._request("GET", f"{S2_URL}/paper/search/match", params={"query": title, "fields": S2_FIELDS})
+        if response is None:
+            return
+        if response.status_code == 404:  # No matching paper
+            self._store(title, None)
+        elif response.status_code == 200 and response.json().get("data"):
+            self._store(title, response.json()["data"][0])
+
+    def resolve(self, titles: List[str], arxiv_ids: Dict[str, str] = None) -> Dict[str, Optional[Dict]]:
+        """
+        Resolves many titles at once and returns {title: {"venue", "year"}} (None when unknown).
+        `arxiv_ids` optionally maps titles to arXiv IDs, which are looked up in batch.
+        """
+        arxiv_ids = arxiv_ids or {}
+        missing = list(dict.fromkeys(t for t in titles if t and self._cached(t) is None))
+        if missing:
+            logging.info(f"  [Venue Normalizer] Resolving {len(missing)} venues ({len(titles) - len(missing)} cached)...")
+            self._resolve_ids({arxiv_ids[t]: t for t in missing if arxiv_ids.get(t)})
+            remaining = [t for t in missing if self._cached(t) is None]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                list(pool.map(self._resolve_title, remaining))
+            self._save()
+        return {t: self._cached(t) for t in titles}
+
+    def lookup(self, title: str) -> Optional[str]:
+        """Official venue name of a single paper, or None if it is only a preprint."""
+        entry = self.resolve([title])[title]
+        return entry["venue"] if entry else None
+
+    def venue_with_year(self, title: str) -> Optional[str]:
+        entry = self.resolve([title])[title]
+        if not entry or not entry["venue"]:
+            return None
+        return f"{entry['venue']} {entry['year'] or ''}".strip()
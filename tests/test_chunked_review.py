@@ -0,0 +1,106 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot.mcp_final_reviewer import MCPFinalReviewer
+
+class TestChunkedReview(unittest.TestCase):
+    def setUp(self):
+        self.reviewer = MCPFinalReviewer.__new__(MCPFinalReviewer)
+        self.reviewer.review_mode = "auto"
+        self.reviewer.single_call_max_tokens = 30000
+        self.reviewer.quality_threshold = 90
+
+    def test_auto_mode_chunks_long_papers_only(self):
+        long_paper = "".join(f"# {i}. Section\n\n" + "Text sentence here. " * 2000 + "\n\n" for i in range(6))
+        self.assertEqual(len(self.reviewer._review_chunks("# Introduction\n\nShort paper.")), 1)
+        chunks = self.reviewer._review_chunks(long_paper)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), long_paper)
+
+    def test_merge_weights_scores_and_sorts_weaknesses(self):
+        minor = {"area": "Style", "severity": "MINOR", "issue": "Long sentences", "suggestion": "Split them"}
+        critical = {"area": "Methods", "severity": "CRITICAL", "issue": "No search string", "suggestion": "Add it"}
+        reviews = [{"quality_score": 95, "weaknesses": [minor]},
+                   {"quality_score": 65, "weaknesses": [critical, minor]},
+                   {"error": "timeout"}]
+        merged = self.reviewer._merge_chunk_reviews(["a" * 300, "b" * 100, "c"], reviews)
+        self.assertEqual(merged["overall_quality_score"], 88)
+        self.assertEqual(merged["weaknesses"], [critical, minor])
+        self.assertFalse(merged["convergence_assessment"]["is_converged"])
+        self.assertEqual(merged["priority_improvements"][0], "Add it")
+
+class TestReviewMemo(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def reviewer(self, scores):
+        reviewer = MCPFinalReviewer.__new__(MCPFinalReviewer)
+        reviewer.plateau_window, reviewer.min_improvement = 2, 1.0
+        reviewer.review_cache, reviewer.history, reviewer.quality_history = {}, [], []
+        reviewer.calls = 0
+        def review(paper_text, focus_areas=None):
+            reviewer.calls += 1
+            return {"overall_quality_score": scores[reviewer.calls - 1]}
+        reviewer.review_paper_via_mcp = review
+        return reviewer
+
+    def test_unchanged_paper_is_reviewed_once(self):
+        reviewer = self.reviewer([70])
+        reviewer.review_paper("draft")
+        self.assertEqual(reviewer.review_paper("draft")["overall_quality_score"], 70)
+        self.assertEqual(reviewer.calls, 1)
+        self.assertEqual(reviewer.quality_history, [70])
+
+    def test_plateau_history_continues_across_runs(self):
+        first = self.reviewer([70, 80, 80])
+        for paper in ("v1", "v2", "v3"):
+            first.review_paper(paper)
+        self.assertFalse(first.is_plateau())
+
+        second = self.reviewer([80.5])
+        second._load_history("v3")
+        second.review_paper("v4")
+        self.assertEqual(second.quality_history, [70, 80, 80, 80.5])
+        self.assertTrue(second.is_plateau())
+        second._load_history("unrelated draft")
+        self.assertEqual(second.quality_history, [])
+
+    def test_rerun_on_original_draft_starts_fresh_history(self):
+        first = self.reviewer([60, 80, 80, 80])
+        for paper in ("draft", "v2", "v3", "v4"):
+            first.review_paper(paper)
+
+        # The pipeline always passes the original draft back in
+        second = self.reviewer([])
+        second.review_cache = first.review_cache
+        second._load_history("draft")
+        self.assertEqual(second.quality_history, [])
+        self.assertEqual(second.review_paper("draft")["overall_quality_score"], 60)
+        self.assertEqual(second.quality_history, [60])
+        self.assertFalse(second.is_plateau())
+        self.assertEqual(second.calls, 0)
+
+    def test_persisted_history_is_capped(self):
+        reviewer = self.reviewer(list(range(30)))
+        reviewer.MAX_HISTORY_ENTRIES = 5
+        for i in range(8):
+            reviewer.review_paper(f"v{i}")
+        with open(MCPFinalReviewer.HISTORY_FILE) as f:
+            self.assertEqual([entry["score"] for entry in json.load(f)], [3, 4, 5, 6, 7])
+        reviewer._load_history("v7")
+        self.assertEqual(reviewer.quality_history, [3, 4, 5, 6, 7])
+
+if __name__ == '__main__':
+    unittest.main()
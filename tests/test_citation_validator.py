@@ -47,5 +47,37 @@ class TestCitationValidator(unittest.TestCase):
         results = self.validator.validate_citations_in_text(text)
         self.assertEqual(len(results["valid"]), 2)
 
+    def test_citation_groups_and_narrative_citations(self):
+        text = "Both (Smith et al., 2023; Johnson, 2022; Brown, 2021) agree. Johnson (2022) and Smith and Doe (2023) add detail, as GPT-4 (2023) shows."
+        results = self.validator.validate_citations_in_text(text)
+        self.assertEqual(results["valid"], [("Smith et al.", "2023"), ("Johnson", "2022"), ("Johnson", "2022"), ("Smith and Doe", "2023")])
+        self.assertEqual(results["invalid"], [("Brown", "2021")])
+
+    def test_non_citation_parentheticals(self):
+        for text in ["Studies published (January 2022 – May 2025) were searched.", "A large sample (N = 1000) was used.",
+                     "See (Table 3, 2024) and (Section 3, 2024).", "Scores on (GSM8K, 2023) improved.",
+                     "Reported in (Fig. 2, 2023) and (May, 2024).", "The GPT-4 (2023) model and, in May (2024), Claude."]:
+            self.assertEqual(CitationValidator.extract_citations(text), [], text)
+        self.assertEqual(CitationValidator.extract_citations("(Smith, Lee, & Kim, 2023; e.g., Doe et al., 2020b)"),
+                         [("Smith, Lee, & Kim", "2023"), ("Doe et al.", "2020")])
+
+    def test_diacritics_and_compound_surnames(self):
+        validator = CitationValidator([
+            {"authors": ["Gabriel García Márquez"], "year": 2023, "title": "Paper C"},
+            {"authors": ["Jan van der Berg", "Hans Müller"], "year": 2024, "title": "Paper D"},
+        ])
+        text = "(Garcia Marquez, 2023; Márquez, 2023) and van der Berg et al. (2024) as well as (Mueller, 2024)."
+        results = validator.validate_citations_in_text(text)
+        self.assertEqual(len(results["valid"]), 4)
+        self.assertEqual(results["invalid"], [])
+
+    def test_offending_sentences(self):
+        text = "Smith et al. (2023) agree. Later, Brown et al. (2021) found e.g. the opposite (Lee, 2020; Johnson, 2022).\n- A bullet (Ghost, 2019)\n"
+        offending = self.validator.offending_sentences(text)
+        self.assertEqual([text[o["start"]:o["end"]] for o in offending],
+                         ["Later, Brown et al. (2021) found e.g. the opposite (Lee, 2020; Johnson, 2022).", "- A bullet (Ghost, 2019)"])
+        self.assertEqual(offending[0]["invalid"], [("Brown et al.", "2021"), ("Lee", "2020")])
+        self.assertEqual(self.validator.validate_section(text), [("Brown et al.", "2021"), ("Lee", "2020"), ("Ghost", "2019")])
+
 if __name__ == '__main__':
     unittest.main()
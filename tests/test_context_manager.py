@@ -0,0 +1,45 @@
+import unittest
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot.context_manager import ContextManager, RecordIndex
+
+class TestRecordIndex(unittest.TestCase):
+    def setUp(self):
+        self.records = [
+            {"paper_title": "Self-Refine", "methodological_differences": {"mechanism_type": "Reflective Evaluation", "notes": None}},
+            {"paper_title": "Multiagent Debate", "methodological_differences": {"mechanism_type": "Iterative Self-Correction / Debate"}},
+            {"paper_title": "APE", "methodological_differences": {"mechanism_type": "Self-Referential Prompting"}, "tags": []},
+        ]
+
+    def test_compact_json_drops_empty_fields(self):
+        self.assertEqual(ContextManager.compact_json(self.records[2]),
+                         '{"paper_title":"APE","methodological_differences":{"mechanism_type":"Self-Referential Prompting"}}')
+
+    def test_ranks_relevant_records_first(self):
+        index = RecordIndex(self.records)
+        self.assertEqual(index.top_k("debate between multiple agents", k=1), [1])
+        self.assertEqual(index.top_k("3.1 Self-Referential Prompting")[0], 2)
+
+    def test_token_budget(self):
+        index = RecordIndex(self.records)
+        budget = ContextManager.estimate_tokens(index.serialized[0])
+        self.assertEqual(index.top_k("Reflective Evaluation", token_budget=budget), [0])
+        context = index.context("Reflective Evaluation", token_budget=budget)
+        self.assertIn("3 included studies in total", context)
+        self.assertNotIn("APE", context)
+
+class TestSplitByHeadings(unittest.TestCase):
+    def test_sections_round_trip(self):
+        paper = "Title page\n\n# 1. Introduction\n\nText.\n\n## 1.1 Context\n\nMore.\n\n### Detail\n\nDeep.\n\n# 2. Methodology\n"
+        sections = ContextManager.split_by_headings(paper)
+        self.assertEqual([(s["heading"], s["level"]) for s in sections],
+                         [("", 0), ("1. Introduction", 1), ("1.1 Context", 2), ("2. Methodology", 1)])
+        self.assertIn("### Detail", sections[2]["text"])
+        self.assertEqual("".join(s["text"] for s in sections), paper)
+
+if __name__ == '__main__':
+    unittest.main()
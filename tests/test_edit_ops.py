@@ -0,0 +1,40 @@
+import unittest
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot.edit_ops import apply_edits, edit_or_rewrite, locate_anchor
+
+TEXT = ("# Discussion\n\nSelf-Refine improved accuracy on GSM8K by 8.7 points over the baseline. "
+        "Debate-based approaches required three agents and two rounds of discussion to converge on an answer.\n")
+
+class TestEditOps(unittest.TestCase):
+    def test_exact_and_whitespace_anchors(self):
+        self.assertEqual(locate_anchor(TEXT, "by 8.7 points"), (TEXT.index("by 8.7"), TEXT.index("by 8.7") + 13))
+        self.assertIsNotNone(locate_anchor(TEXT, "Self-Refine  improved\naccuracy"))
+
+    def test_fuzzy_anchor_tolerates_small_changes(self):
+        anchor = ("Debate-based approaches required 3 agents and two rounds of discussion "
+                  "to converge on an answer.")
+        start, end = locate_anchor(TEXT, anchor)
+        self.assertEqual(TEXT[start:end], "Debate-based approaches required three agents and two rounds of discussion "
+                                          "to converge on an answer.")
+        self.assertIsNone(locate_anchor(TEXT, "A sentence that does not appear anywhere in the section text at all."))
+
+    def test_apply_edits_reports_failures(self):
+        edits = [{"anchor": "8.7 points", "replacement": "8.7 percentage points"},
+                 {"anchor": "no such passage", "replacement": "x"}]
+        new_text, failed = apply_edits(TEXT, edits)
+        self.assertIn("8.7 percentage points", new_text)
+        self.assertEqual(failed, edits[1:])
+
+    def test_falls_back_to_rewrite(self):
+        rewrite = lambda: "REWRITTEN"
+        self.assertEqual(edit_or_rewrite(TEXT, "Here is the revised section...", rewrite), "REWRITTEN")
+        self.assertEqual(edit_or_rewrite(TEXT, '{"edits": [{"anchor": "missing", "replacement": ""}]}', rewrite), "REWRITTEN")
+        self.assertEqual(edit_or_rewrite(TEXT, '```json\n{"edits": []}\n```', rewrite), TEXT)
+
+if __name__ == '__main__':
+    unittest.main()
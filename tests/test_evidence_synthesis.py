@@ -0,0 +1,98 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot.evidence_synthesis import ASSUMED_N, EvidenceSynthesis, random_effects
+from literature_autopilot.grade_assessment import GRADEAssessment
+
+def study(mechanism, *comparisons, n=None, metric=None):
+    return {"methodological_differences": {"mechanism_type": mechanism},
+            "improvements": {"baseline_comparisons": [
+                {"task": task, "baseline_score": base, "method_score": method, "sample_size": n, "metric": metric}
+                for task, base, method in comparisons
+            ]}}
+
+class TestEvidenceSynthesis(unittest.TestCase):
+    def test_random_effects_matches_dersimonian_laird(self):
+        y, v = np.array([0.1, 0.3, 0.2, 0.5]), np.array([0.01, 0.02, 0.015, 0.01])
+        w = 1 / v
+        q = np.sum(w * (y - np.sum(w * y) / np.sum(w)) ** 2)
+        tau2 = max(0, (q - 3) / (np.sum(w) - np.sum(w ** 2) / np.sum(w)))
+        expected = np.sum(y / (v + tau2)) / np.sum(1 / (v + tau2))
+        # The same data twice as two groups gives the same result per group
+        stats = random_effects(np.tile(y, 2), np.tile(v, 2), np.repeat([0, 1], 4), 2)
+        np.testing.assert_allclose(stats["pooled"], [expected, expected])
+        np.testing.assert_allclose(stats["i2"], [(q - 3) / q] * 2)
+
+    def test_pools_per_mechanism_and_task(self):
+        studies = [
+            study("Reflective Evaluation", ("GSM8K", "50%", "60%"), ("HumanEval", 0.4, 0.5)),
+            study("Reflective Evaluation", ("gsm8k ", 50, 60), ("MMLU", "n/a", 70)),
+            study("Debate", ("GSM8K", 70, 77)),
+        ]
+        synthesis = EvidenceSynthesis(studies)
+        self.assertEqual((len(synthesis), synthesis.n_excluded), (4, 1))
+        pooled = {(r["mechanism"], r["task"]): r for r in synthesis.pool()}
+        gsm8k = pooled[("Reflective Evaluation", "GSM8K")]
+        self.assertEqual((gsm8k["k"], gsm8k["n_studies"]), (2, 2))
+        self.assertAlmostEqual(gsm8k["relative_improvement_percent"], 20.0)
+        self.assertAlmostEqual(pooled[("Debate", "GSM8K")]["relative_improvement_percent"], 10.0)
+        self.assertLess(gsm8k["ci_low_percent"], 20.0)
+
+    def test_grade_uses_heterogeneity_and_precision(self):
+        consistent = [study("A", ("T", 50, 60), n=1000) for _ in range(10)]
+        conflicting = [study("A", ("T", 50, 80), n=1000), study("A", ("T", 50, 40), n=1000)] * 5
+        self.assertEqual(GRADEAssessment.assess_inconsistency(consistent), "LOW")
+        self.assertEqual(GRADEAssessment.assess_imprecision(consistent), "LOW")
+        self.assertEqual(GRADEAssessment.assess_inconsistency(conflicting), "HIGH")
+        self.assertEqual(GRADEAssessment.assess_imprecision(consistent[:3]), "HIGH")
+
+    def test_unknown_sample_sizes(self):
+        # Same direction but different sizes: I² from an assumed n would call this inconsistent
+        same_direction = [study("A", ("T", 50, 55 + 3 * i)) for i in range(10)]
+        self.assertGreater(EvidenceSynthesis(same_direction).overall()["i2"], GRADEAssessment.I2_THRESHOLD)
+        self.assertEqual(GRADEAssessment.assess_inconsistency(same_direction), "LOW")
+        self.assertEqual(GRADEAssessment.assess_imprecision(same_direction), "HIGH")
+        assessment = GRADEAssessment.assess_certainty_comprehensive(same_direction)
+        self.assertIn("Imprecise results (small sample/wide CI) (k = 10, sample sizes not reported)", assessment["reasons"])
+
+    def test_lower_is_better_and_study_clustering(self):
+        studies = [
+            study("A", ("T", 20, 10), metric="Error rate (%)"),
+            study("A", ("T", 12.5, 10.1), ("T", 300, 200), metric="Perplexity"),
+            # Five comparisons from one paper count as one study
+            study("A", *[("T", 50, 75)] * 5),
+        ]
+        synthesis = EvidenceSynthesis(studies)
+        self.assertEqual(synthesis.n_excluded, 2)
+        self.assertAlmostEqual(synthesis.effect[0], np.log(2))
+        overall = synthesis.overall()
+        self.assertEqual((overall["k"], overall["n_studies"]), (6, 2))
+        self.assertAlmostEqual(overall["direction_agreement"], 1.0)
+        # Pooling two studies: the five-comparison paper does not dominate
+        self.assertGreater(overall["relative_improvement_percent"], 60)
+
+    def test_fractions_detected_per_series(self):
+        def variance(p_base, p_method, n=ASSUMED_N):
+            return (1 - p_method) / (n * p_method) + (1 - p_base) / (n * p_base)
+        studies = [
+            # 0.5 -> 1 is a percent score: the same paper reports 40 -> 45 on this task
+            study("A", ("T", 0.5, 1), ("T", 40, 45)),
+            # A percent sign fixes the scale even when every score is <= 1
+            study("A", ("T", "0.5%", "1%")),
+            study("A", ("T", 0.5, 1), metric="Accuracy (%)"),
+            # Only fractions in the series: rescaled
+            study("A", ("T", 0.4, 0.5), ("T", 0.6, 0.8)),
+        ]
+        synthesis = EvidenceSynthesis(studies)
+        self.assertEqual((len(synthesis), synthesis.n_excluded), (6, 0))
+        expected = [variance(0.005, 0.01), variance(0.4, 0.45), variance(0.005, 0.01), variance(0.005, 0.01),
+                    variance(0.4, 0.5), variance(0.6, 0.8)]
+        np.testing.assert_allclose(synthesis.variance, expected)
+
+if __name__ == '__main__':
+    unittest.main()
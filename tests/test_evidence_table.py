@@ -0,0 +1,63 @@
+import unittest
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot.evidence_table import EvidenceTable
+from literature_autopilot.gap_identifier import GapIdentifier
+
+DATA = [
+    {"methodological_differences": {"mechanism_type": "Reflective Evaluation"},
+     "amstar_2_assessment": {"overall_score": "Low"},
+     "improvements": {
+         "evaluation_setup": {"tasks_and_domains": ["GSM-8K", "Code"]},
+         "baseline_comparisons": [
+             {"task": "HumanEval pass@1", "baseline_model": "gpt-3.5-turbo", "method_model": "Llama-2 70B",
+              "metric": "pass@1", "baseline_score": "40.5%", "method_score": 50},
+             {"task": "ARC-Challenge", "baseline_model": "PaLM 2", "baseline_score": "n/a"},
+         ]}},
+    {"methodological_differences": {"mechanism_type": "reflective  evaluation"}},
+]
+
+class TestEvidenceTable(unittest.TestCase):
+    def test_flattens_and_canonicalizes(self):
+        table = EvidenceTable(DATA)
+        comparisons = table.comparisons
+        self.assertEqual(list(table.papers["mechanism"]), ["Reflective Evaluation"] * 2)
+        self.assertEqual(list(table.papers["low_quality"]), [True, False])
+        self.assertEqual(list(comparisons["benchmark"]), ["HumanEval", "ARC"])
+        self.assertEqual(comparisons["baseline_score"].tolist()[0], 40.5)
+        self.assertTrue(comparisons["baseline_score"].isna().tolist()[1])
+        self.assertEqual(table.covered_models(), {"GPT-3", "LLaMA", "PaLM"})
+        self.assertEqual(table.domains["benchmark"].fillna("").tolist(), ["GSM8K", ""])
+
+    def test_gap_identifier_uses_aliases(self):
+        gaps = GapIdentifier(DATA)
+        self.assertNotIn("HumanEval", gaps.identify_task_coverage_gaps())
+        self.assertIn("GSM8K", gaps.identify_task_coverage_gaps())
+        self.assertEqual(gaps.identify_model_coverage_gaps(), ["GPT-4", "Claude", "Mistral"])
+        analysis = gaps.identify_gaps()
+        self.assertEqual(analysis["mechanism_distribution"], {"Reflective Evaluation": 2})
+        self.assertNotIn("Benchmark 'GSM8K' is missing from the evaluated tasks.", analysis["identified_gaps"])
+
+    def test_cells_naming_several_entities(self):
+        data = [{"improvements": {
+            "evaluation_setup": {"tasks_and_domains": ["GSM8K / MATH / MMLU"]},
+            "baseline_comparisons": [
+                {"task": "GSM8K / MATH / MMLU", "baseline_model": "ChatGPT-4 and Claude", "method_model": "GPT-3.5"},
+                {"task": "gsm8k (grade school math)", "baseline_model": "chatgpt"},
+            ]}}]
+        table = EvidenceTable(data)
+        self.assertEqual(table.covered_benchmarks(), {"GSM8K", "MATH", "MMLU"})
+        self.assertEqual(table.covered_models(), {"GPT-4", "Claude", "GPT-3"})
+        self.assertEqual(list(table.comparisons["benchmark"]), ["GSM8K", "GSM8K"])
+        gaps = GapIdentifier(data)
+        self.assertEqual(list(gaps.identify_task_coverage_gaps()), ["HumanEval", "TruthfulQA", "HellaSwag", "ARC"])
+        self.assertEqual(gaps.identify_model_coverage_gaps(), ["LLaMA", "Mistral", "PaLM"])
+        self.assertEqual([g for g in gaps.identify_gaps()["identified_gaps"] if "Benchmark" in g],
+                         ["Benchmark 'HumanEval' is missing from the evaluated tasks."])
+
+if __name__ == '__main__':
+    unittest.main()
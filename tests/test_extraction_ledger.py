@@ -0,0 +1,44 @@
+import unittest
+import os
+import shutil
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot.extraction_ledger import ExtractionLedger
+
+class TestExtractionLedger(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_extraction_ledger_output"
+        os.makedirs(self.test_dir, exist_ok=True)
+        self.path = os.path.join(self.test_dir, "ledger.jsonl")
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_records_survive_reload_per_prompt_hash(self):
+        ledger = ExtractionLedger(self.path)
+        ledger.append("pdf1", "prompts-v1", {"screening_decision": "INCLUDE"})
+        ledger.append("pdf1", "prompts-v1", {"screening_decision": "EXCLUDE"})
+
+        reloaded = ExtractionLedger(self.path)
+        self.assertEqual(reloaded.get("pdf1", "prompts-v1"), {"screening_decision": "EXCLUDE"})
+        self.assertIsNone(reloaded.get("pdf1", "prompts-v2"))
+
+    def test_torn_last_line_is_ignored(self):
+        ExtractionLedger(self.path).append("pdf1", "p", {"ok": True})
+        with open(self.path, "a") as f:
+            f.write('{"pdf_sha256": "pdf2", "prompt_ha')  # Crash mid-write
+
+        ledger = ExtractionLedger(self.path)
+        self.assertIsNone(ledger.get("pdf2", "p"))
+        ledger.append("pdf3", "p", {"ok": True})
+
+        reloaded = ExtractionLedger(self.path)
+        self.assertEqual(reloaded.get("pdf1", "p"), {"ok": True})
+        self.assertEqual(reloaded.get("pdf3", "p"), {"ok": True})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot.figure_renderer import FigureRenderer
+
+class TestFigureRenderer(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.figures = {
+            "prisma": ("prisma_flow", {"counts": [120, 80, 30, 12]}),
+            "years": ("bar", {"labels": ["2022", "2023"], "counts": [4, 8], "title": "By Year"}),
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_skips_up_to_date_figures(self):
+        renderer = FigureRenderer(self.output_dir, fmt="svg", max_workers=2)
+        paths = renderer.render(self.figures)
+        self.assertTrue(all(os.path.exists(p) and p.endswith(".svg") for p in paths.values()))
+        mtimes = {name: os.path.getmtime(p) for name, p in paths.items()}
+        os.utime(paths["years"], (0, 0))
+
+        # A fresh renderer reads the manifest: only the changed figure is stale
+        renderer = FigureRenderer(self.output_dir, fmt="svg")
+        self.assertTrue(renderer.is_current("prisma", *self.figures["prisma"]))
+        self.figures["years"][1]["counts"] = [4, 9]
+        self.assertFalse(renderer.is_current("years", *self.figures["years"]))
+        renderer.render(self.figures)
+        self.assertEqual(os.path.getmtime(paths["prisma"]), mtimes["prisma"])
+        self.assertNotEqual(os.path.getmtime(paths["years"]), 0)
+
+    def test_format_is_part_of_the_hash(self):
+        FigureRenderer(self.output_dir, fmt="png", dpi=50).render(self.figures)
+        pdf = FigureRenderer(self.output_dir, fmt="pdf")
+        self.assertFalse(pdf.is_current("prisma", *self.figures["prisma"]))
+        with self.assertRaises(ValueError):
+            FigureRenderer(self.output_dir, fmt="jpg")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import json
+import os
+import sys
+from types import SimpleNamespace
+from unittest import mock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot.extractor import SLRExtractor
+from literature_autopilot.pdf_text import PDFTextExtractor
+
+EXTRACTION = {"Year": 2023, "improvements": {"baseline_comparisons": [{"baseline_score": "40%", "method_score": 50}]}}
+AMSTAR = {"Q1": {"status": "YES", "reason": "..."}, "overall_score": "LOW"}
+
+def response(payload):
+    text = payload if isinstance(payload, str) else "```json" + json.dumps(payload) + "```"
+    return SimpleNamespace(text=text, usage_metadata=SimpleNamespace(prompt_token_count=100, candidates_token_count=10))
+
+class TestFusedExtraction(unittest.TestCase):
+    def setUp(self):
+        self.extractor = SLRExtractor(extraction_mode="fused")
+        self.extractor.model = mock.MagicMock()
+        self.uploaded = object()
+        patcher = mock.patch.object(SLRExtractor, "_upload_pdf", return_value=self.uploaded)
+        self.upload = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_single_call(self):
+        self.extractor.model.generate_content.return_value = response({
+            "screening": {"screening_decision": "INCLUDE", "reason": "on topic"},
+            "extraction": dict(EXTRACTION), "amstar_2_assessment": AMSTAR})
+        result = self.extractor.process_paper("paper.pdf")
+        self.assertEqual(self.extractor.model.generate_content.call_count, 1)
+        self.assertIs(self.extractor.model.generate_content.call_args[0][0][1], self.uploaded)
+        self.assertEqual(result["screening_decision"], "INCLUDE")
+        self.assertEqual(result["amstar_2_assessment"], AMSTAR)
+        self.assertEqual(result["validation_errors"], [])
+        self.assertEqual(self.extractor.usage["calls"], 1)
+        self.assertEqual(self.extractor.usage["prompt_tokens"], 100)
+
+    def test_excluded_paper_skips_extraction(self):
+        self.extractor.model.generate_content.return_value = response({
+            "screening": {"screening_decision": "EXCLUDE", "reason": "survey"}, "extraction": None, "amstar_2_assessment": None})
+        self.assertEqual(self.extractor.process_paper("paper.pdf"), {"screening_decision": "EXCLUDE", "reason": "survey"})
+        self.assertEqual(self.extractor.model.generate_content.call_count, 1)
+
+    def test_unparseable_response_falls_back_to_staged(self):
+        self.extractor.model.generate_content.side_effect = [
+            response("Sorry, I cannot help with that."),
+            response({"screening_decision": "INCLUDE"}), response(dict(EXTRACTION)), response(AMSTAR)]
+        result = self.extractor.process_paper("paper.pdf")
+        self.assertEqual(self.extractor.model.generate_content.call_count, 4)
+        self.assertEqual(result["amstar_2_assessment"], AMSTAR)
+        self.assertEqual(result["screening_decision"], "INCLUDE")
+        self.upload.assert_called_once()  # The staged fallback reuses the upload
+
+    def test_missing_section_falls_back_to_staged(self):
+        self.extractor.model.generate_content.side_effect = [
+            response({"screening": {"screening_decision": "INCLUDE"}, "extraction": dict(EXTRACTION), "amstar_2_assessment": None}),
+            response({"screening_decision": "INCLUDE"}), response(dict(EXTRACTION)), response(AMSTAR)]
+        result = self.extractor.process_paper("paper.pdf")
+        self.assertEqual(self.extractor.model.generate_content.call_count, 4)
+        self.assertEqual(result["amstar_2_assessment"], AMSTAR)
+
+    def test_staged_error_is_reported(self):
+        self.extractor.model.generate_content.side_effect = [response("not json"), RuntimeError("boom")]
+        self.assertEqual(self.extractor.process_paper("paper.pdf"), {"error": "Stage 1 Error: boom"})
+
+    def test_local_mode_sends_screening_and_extraction_sections(self):
+        self.extractor.pdf_mode = "local"
+        text = ("Abstract\nWe propose X.\n1 Introduction\nWhy it matters.\n2 Methods\n" + "Details. " * 300 +
+                "\n3 Results\nTable 1: Accuracy\nX 80\n4 Conclusion\nIt works.")
+        self.extractor.model.generate_content.return_value = response({
+            "screening": {"screening_decision": "EXCLUDE", "reason": "survey"}, "extraction": None, "amstar_2_assessment": None})
+        with mock.patch.object(PDFTextExtractor, "extract_text", return_value=text):
+            self.extractor.process_paper("paper.pdf")
+        context = self.extractor.model.generate_content.call_args[0][0][1]
+        for section in ["Abstract", "Introduction", "Methods", "Results", "Tables", "Conclusion"]:
+            self.assertEqual(context.count(f"## {section}\n"), 1, section)
+        self.upload.assert_not_called()
+
+class TestFieldAgreement(unittest.TestCase):
+    def test_compares_short_leaves(self):
+        a = {"Year": 2023, "score": "40%", "mechanism": "SRP", "summary": "x" * 50, "reason": "a"}
+        b = {"Year": "2023", "score": 40.0, "mechanism": "RE", "summary": "y" * 50, "reason": "b"}
+        self.assertAlmostEqual(SLRExtractor.field_agreement(a, b), 2 / 3)
+        self.assertEqual(SLRExtractor.field_agreement({}, {}), 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
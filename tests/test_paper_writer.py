@@ -0,0 +1,50 @@
+import unittest
+import json
+import os
+import sys
+from unittest.mock import MagicMock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot.paper_writer import PaperWriter
+
+STUDIES = [
+    {"paper_title": "Self-Refine", "Authors": "Aman Madaan, Niket Tandon", "Year": 2023},
+    {"paper_title": "Reflexion", "Authors": "Noah Shinn, Federico Cassano", "Year": 2023},
+]
+
+class TestFixCitations(unittest.TestCase):
+    def setUp(self):
+        self.writer = PaperWriter()
+        self.writer.CITATION_CACHE_FILE = None
+        self.writer.model = MagicMock()
+        self.writer.model.generate_content.return_value.text = json.dumps({"sentences": {"0": "Refinement helps (Madaan et al., 2023)."}})
+
+    def test_non_citations_and_near_matches_pass_through(self):
+        text = ("We searched studies published (January 2022 – May 2025) with (N = 1000) records.\n"
+                "Reflection improves agents (Shinn et al., 2024; Madan et al., 2023).\n")
+        self.assertEqual(self.writer.fix_citations("Methodology", text, STUDIES), text)
+        self.writer.model.generate_content.assert_not_called()
+
+    def test_regenerates_hallucinated_sentence_only(self):
+        text = "We searched studies published (January 2022 – May 2025).\nRefinement helps (Ghost et al., 2021).\n"
+        fixed = self.writer.fix_citations("Methodology", text, STUDIES)
+        self.assertEqual(fixed, "We searched studies published (January 2022 – May 2025).\nRefinement helps (Madaan et al., 2023).\n")
+        prompt = self.writer.model.generate_content.call_args[0][0]
+        self.assertIn("Ghost et al., 2021", prompt)
+        self.assertNotIn("January", prompt)
+
+    def test_final_review_reuses_write_time_checks(self):
+        section = "## 3. Analysis\n\nRefinement helps (Ghost et al., 2021).\n### 3.1 Math\n\nAlso (Phantom et al., 2020)."
+        self.writer.model.generate_content.return_value.text = json.dumps({"sentences": {"0": "Refinement helps (Madaan et al., 2023).", "1": "Also (Phantom et al., 2020)."}})
+        written = self.writer.fix_paper_citations(section, STUDIES)
+        self.assertEqual(self.writer.model.generate_content.call_count, 1)
+
+        # The assembled paper splits into the same chunks; the unresolved one is not sent again
+        paper = "# Abstract\n\nSummary.\n\n" + written + "\n\n"
+        self.assertEqual(self.writer.fix_paper_citations(paper, STUDIES), paper)
+        self.assertEqual(self.writer.model.generate_content.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
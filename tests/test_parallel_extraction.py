@@ -0,0 +1,139 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot import pipeline, llm_utils
+from literature_autopilot.pipeline import SLRPipeline
+from literature_autopilot.extraction_ledger import ExtractionLedger
+from literature_autopilot.stage_runner import hash_file
+from literature_autopilot.pdf_store import PDFStore
+from literature_autopilot.search_modules import Paper
+from literature_autopilot.llm_utils import RotatableModel
+
+class FakeExtractor:
+    calls = []
+    lock = threading.Lock()
+
+    def __init__(self, **kwargs):
+        pass
+
+    def process_paper(self, pdf_path):
+        with self.lock:
+            self.calls.append(os.path.basename(pdf_path))
+        if pdf_path.endswith("broken.pdf"):
+            raise RuntimeError("worker crashed")
+        if pdf_path.endswith("failed.pdf"):
+            return {"error": "Stage 1 Error: bad JSON"}
+        return {"screening_decision": "INCLUDE", "source": os.path.basename(pdf_path)}
+
+class TestParallelExtraction(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        FakeExtractor.calls = []
+
+        self.pipeline = SLRPipeline.__new__(SLRPipeline)
+        self.pipeline.config = {"extraction": {"model": "m", "pdf_mode": "local", "max_workers": 4}}
+        self.pipeline.force = set()
+        papers = []
+        for name, content in [("a", b"A"), ("copy_of_a", b"A"), ("cached", b"C"), ("broken", b"B"), ("failed", b"F"), ("z", b"Z")]:
+            with open(f"{name}.pdf", "wb") as f:
+                f.write(content)
+            papers.append(SimpleNamespace(title=f"Paper {name}", pdf_path=f"{name}.pdf"))
+        self.pipeline.final_papers = papers
+        ExtractionLedger().append(hash_file("cached.pdf"), self.pipeline._extraction_prompt_hash(), {"source": "ledger"})
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_extracts_each_pdf_once_and_keeps_order(self):
+        with mock.patch.object(pipeline, "SLRExtractor", FakeExtractor):
+            self.pipeline.step_extract_data()
+
+        # Ledger hits are not extracted again, duplicate PDFs only once
+        self.assertEqual(sorted(FakeExtractor.calls), ["a.pdf", "broken.pdf", "failed.pdf", "z.pdf"])
+        self.assertEqual([d["paper_title"] for d in self.pipeline.extracted_data], ["Paper a", "Paper copy_of_a", "Paper cached", "Paper z"])
+        self.assertEqual([d["source"] for d in self.pipeline.extracted_data], ["a.pdf", "a.pdf", "ledger", "z.pdf"])
+        with open("slr_extracted_data.json") as f:
+            self.assertEqual(json.load(f), self.pipeline.extracted_data)
+
+    def test_failed_papers_are_retried_next_run(self):
+        with mock.patch.object(pipeline, "SLRExtractor", FakeExtractor):
+            self.pipeline.step_extract_data()
+            FakeExtractor.calls = []
+            self.pipeline.step_extract_data()
+        self.assertEqual(sorted(FakeExtractor.calls), ["broken.pdf", "failed.pdf"])
+        self.assertEqual(len(self.pipeline.extracted_data), 4)
+
+    def test_upload_mode_prefetches_only_pending_pdfs(self):
+        self.pipeline.config["extraction"]["pdf_mode"] = "upload"
+        self.pipeline.config["extraction"]["upload_workers"] = 2
+        ExtractionLedger().append(hash_file("cached.pdf"), self.pipeline._extraction_prompt_hash(), {"source": "ledger"})
+        registry = mock.MagicMock()
+        with mock.patch.object(pipeline, "SLRExtractor", FakeExtractor), \
+             mock.patch.object(pipeline, "GeminiUploadRegistry", return_value=registry) as registry_class:
+            self.pipeline.step_extract_data()
+        registry_class.assert_called_once_with(max_workers=2)
+        self.assertEqual(sorted(registry.prefetch.call_args[0][0]), ["a.pdf", "broken.pdf", "failed.pdf", "z.pdf"])
+        registry.cleanup_orphans.assert_called_once()
+
+class TestSkippedDownload(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.pipeline = SLRPipeline.__new__(SLRPipeline)
+        self.pipeline.config = {"extraction": {"model": "m", "pdf_mode": "local"}}
+        self.pipeline.force = {"extract"}
+        self.paper = Paper("Self-Refine", ["Aman Madaan"], 2023, "", "https://example.org", doi="10.1/self-refine")
+        self.pipeline.final_papers = [self.paper]
+        self.previous = [{"paper_title": "Self-Refine", "source": "earlier run"}]
+        with open("slr_extracted_data.json", "w") as f:
+            json.dump(self.previous, f)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_pdf_paths_restored_from_store(self):
+        with open("download.pdf", "wb") as f:
+            f.write(b"%PDF-1.4 self-refine")
+        stored = PDFStore().add("download.pdf", self.paper)
+        FakeExtractor.calls = []
+        with mock.patch.object(pipeline, "SLRExtractor", FakeExtractor):
+            self.pipeline.step_extract_data()
+        self.assertEqual(self.paper.pdf_path, stored)
+        self.assertEqual(FakeExtractor.calls, [os.path.basename(stored)])
+
+    def test_existing_extraction_kept_without_pdfs(self):
+        with mock.patch.object(pipeline, "SLRExtractor") as extractor:
+            self.pipeline.step_extract_data()
+        extractor.assert_not_called()
+        self.assertEqual(self.pipeline.extracted_data, self.previous)
+        with open("slr_extracted_data.json") as f:
+            self.assertEqual(json.load(f), self.previous)
+
+class TestKeyRotation(unittest.TestCase):
+    def test_only_first_failure_on_a_key_rotates(self):
+        with mock.patch.object(llm_utils, "GEMINI_KEYS", ["k1", "k2", "k3"]), \
+             mock.patch.object(llm_utils.genai, "configure"), \
+             mock.patch.object(llm_utils.genai, "GenerativeModel"):
+            model = RotatableModel("m")
+            model.rotate_key(failed_index=0)
+            model.rotate_key(failed_index=0)  # A second worker that also failed on key 0
+            self.assertEqual(model.key_index, 1)
+            model.rotate_key(failed_index=1)
+            self.assertEqual(model.key_index, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import requests
+from types import SimpleNamespace
+from unittest import mock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot import pipeline
+from literature_autopilot.pipeline import SLRPipeline
+from literature_autopilot.paper_writer import PaperWriter
+
+SECTIONS = list(PaperWriter.DETAILED_STRUCTURE)
+BODY = ["1. Introduction", "2. Methodology", "3. Analysis", "4. Discussion"]
+
+class TestParallelWriting(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+
+        self.pipeline = SLRPipeline.__new__(SLRPipeline)
+        self.pipeline.config = {"writing": {"model": "m", "max_workers": 4}, "analysis": {"run_citation_validator": False}}
+        self.pipeline.visualizer = None
+        self.pipeline.extracted_data = [{"Title": "Self-Refine", "Source": "arXiv"}]
+
+        self.writer = mock.MagicMock(DETAILED_STRUCTURE=PaperWriter.DETAILED_STRUCTURE)
+        self.writer.generate_structure.return_value = "Plan"
+        self.writer.summarize_section.side_effect = lambda section, text: f"short {section}"
+        self.summaries = {}
+        self.lock = threading.Lock()
+        self.failures = set()
+
+        def write_section(section, instructions, data, previous_summary=""):
+            with self.lock:
+                self.summaries[section] = previous_summary
+                if section in self.failures:
+                    self.failures.discard(section)
+                    raise RuntimeError("429 quota")
+            return f"# {section}"
+        self.writer.write_section.side_effect = write_section
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def write(self, mode):
+        self.pipeline.config["writing"]["mode"] = mode
+        with mock.patch.object(pipeline, "PaperWriter", return_value=self.writer):
+            self.pipeline.step_write_paper()
+
+    def test_parallel_keeps_section_order(self):
+        self.write("parallel")
+        self.assertEqual(self.pipeline.draft_paper, "".join(f"# {s}\n\n" for s in SECTIONS))
+        self.writer.enrich_venues.assert_called_once_with(self.pipeline.extracted_data)
+        self.writer.summarize_section.assert_not_called()
+        with open("final_paper.md") as f:
+            self.assertEqual(f.read(), self.pipeline.draft_paper)
+
+    def test_dependency_aware_writes_synthesis_last(self):
+        self.write("dependency_aware")
+        self.assertEqual(self.pipeline.draft_paper, "".join(f"# {s}\n\n" for s in SECTIONS))
+        self.assertEqual(sorted(c[0][0] for c in self.writer.summarize_section.call_args_list), BODY)
+        expected = "\n".join(f"Summary of {s}: short {s}" for s in BODY)
+        self.assertEqual(self.summaries["Abstract"], expected)
+        self.assertEqual(self.summaries["5. Conclusion"], expected)
+        self.assertEqual(self.summaries["3. Analysis"], "")
+
+    def test_failed_section_is_retried_alone(self):
+        self.failures = {"3. Analysis"}
+        self.write("parallel")
+        self.assertEqual(self.pipeline.draft_paper, "".join(f"# {s}\n\n" for s in SECTIONS))
+        self.assertEqual(self.writer.write_section.call_count, len(SECTIONS) + 1)
+
+class TestSectionHelpers(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.writer = PaperWriter()
+        self.writer.model = mock.MagicMock()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_summary_falls_back_to_opening_words(self):
+        self.writer.model.generate_content.side_effect = RuntimeError("timeout")
+        summary = self.writer.summarize_section("Analysis", "## Analysis\n\nSelf-refinement helps.\nMostly on math.", max_words=3)
+        self.assertEqual(summary, "Self-refinement helps. Mostly")
+        self.writer.model.generate_content.side_effect = None
+        self.writer.model.generate_content.return_value = SimpleNamespace(text=" Refinement helps. ")
+        self.assertEqual(self.writer.summarize_section("Analysis", "text"), "Refinement helps.")
+
+    def test_enrich_venues_uses_cache(self):
+        records = [{"Title": "Self-Refine", "Source": "arXiv", "URL": "https://arxiv.org/abs/2303.17651"},
+                   {"Title": "Preprint Only", "Source": "ArXiv"},
+                   {"Title": "Journal Paper", "Source": "ACL Anthology"}]
+        responses = {"/paper/batch": SimpleNamespace(status_code=200, json=lambda: [{"venue": "NeurIPS", "year": 2023}]),
+                     "/paper/search/match": SimpleNamespace(status_code=404, json=lambda: {})}
+        request = lambda method, url, **kwargs: responses[url[url.index("/paper"):]]
+        with mock.patch("literature_autopilot.venue_normalizer.requests.request", side_effect=request) as fake:
+            self.writer.enrich_venues(records)
+            self.assertEqual(fake.call_count, 2)  # One ID batch, one title search for the paper without an ID
+            self.writer.enrich_venues(records)
+            self.assertEqual(fake.call_count, 2)
+        self.assertEqual(records[0]["OfficialVenue"], "NeurIPS 2023")
+        self.assertNotIn("OfficialVenue", records[1])
+        self.assertNotIn("OfficialVenue", records[2])
+
+        # A fresh writer reads the cached venues and misses from disk
+        with mock.patch("literature_autopilot.venue_normalizer.requests.request") as fake:
+            writer = PaperWriter()
+            records = [{"Title": "Self-Refine", "Source": "arXiv"}, {"Title": "Preprint Only", "Source": "arXiv"}]
+            writer.enrich_venues(records)
+        fake.assert_not_called()
+        self.assertEqual(records[0]["OfficialVenue"], "NeurIPS 2023")
+
+    def test_enrich_venues_failed_lookup_is_not_cached(self):
+        records = [{"Title": "Preprint Only", "Source": "arXiv"}]
+        offline = requests.RequestException("offline")
+        with mock.patch("literature_autopilot.venue_normalizer.requests.request", side_effect=offline):
+            self.writer.enrich_venues(records)
+        self.assertNotIn("OfficialVenue", records[0])
+        self.assertIsNone(self.writer.venues._cached("Preprint Only"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,237 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import threading
+from unittest import mock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot.pdf_retriever import PDFRetriever, ArxivResolver, HostLimiter
+from literature_autopilot.search_modules import Paper
+
+PDF_BYTES = b"%PDF-1.4\n" + b"0" * 200 + b"\n%%EOF\n"
+
+class FakeResponse:
+    def __init__(self, status_code, body, headers=None):
+        self.status_code = status_code
+        self.headers = dict({"Content-Type": "application/pdf"}, **(headers or {}))
+        self.body = body
+        self.closed = False
+
+    def iter_content(self, chunk_size=8192):
+        yield self.body
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class SlowResponse(FakeResponse):
+    """Streams one chunk at a time, each only after the test releases it."""
+    def __init__(self, body):
+        super().__init__(200, body)
+        self.release = threading.Event()
+        self.chunks_sent = 0
+        self.closed = threading.Event()
+
+    def iter_content(self, chunk_size=8192):
+        for i in range(0, len(self.body), 16):
+            self.release.wait(5)
+            self.chunks_sent += 1
+            yield self.body[i:i + 16]
+
+    def close(self):
+        self.closed.set()
+
+class TestPDFRetriever(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_pdf_retriever_output"
+        self.retriever = PDFRetriever(download_dir=self.test_dir)
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _write(self, name, data):
+        path = os.path.join(self.test_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_pdf_validation(self):
+        self.assertTrue(PDFRetriever.is_valid_pdf(self._write("ok.pdf", PDF_BYTES)))
+        self.assertFalse(PDFRetriever.is_valid_pdf(self._write("truncated.pdf", PDF_BYTES[:100])))
+        self.assertFalse(PDFRetriever.is_valid_pdf(self._write("html.pdf", b"<html>" + PDF_BYTES)))
+
+    def test_truncated_legacy_file_is_not_treated_as_done(self):
+        paper = Paper("A Paper", [], 2023, "", None)
+        path = self._write("A_Paper.pdf", PDF_BYTES[:100])
+        with mock.patch.object(self.retriever, "_download_sequential", return_value=None):
+            self.assertIsNone(self.retriever.download_paper(paper, race=False))
+        self.assertFalse(os.path.exists(path))
+
+    def test_legacy_file_adopted_only_with_matching_identifier(self):
+        path = self._write("Self_Refine.pdf", PDF_BYTES)
+        preprint = Paper("Self Refine", [], 2023, "", "https://arxiv.org/abs/2303.17651")
+        namesake = Paper("Self Refine", [], 2024, "", None, doi="10.5555/other")
+        first_page = "Self-Refine ... arXiv:2303.17651v2 [cs.CL] 25 May 2023"
+        with mock.patch("literature_autopilot.pdf_retriever.PDFTextExtractor.extract_text", return_value=first_page), \
+             mock.patch.object(self.retriever, "_download_sequential", return_value=None) as download:
+            self.assertIsNone(self.retriever.download_paper(namesake, race=False))
+            self.assertTrue(os.path.exists(path))
+            self.assertIsNone(self.retriever.download_paper(Paper("Self Refine", [], 2023, "", None), race=False))
+            self.assertEqual(download.call_count, 2)
+            stored = self.retriever.download_paper(preprint, race=False)
+        self.assertEqual(download.call_count, 2)
+        self.assertEqual(self.retriever.store.lookup(preprint), stored)
+        self.assertFalse(os.path.exists(path))
+
+    def test_store_deduplicates_identical_pdfs(self):
+        paper_a = Paper("Preprint Title", [], 2023, "", None, doi="10.48550/arXiv.2303.17651")
+        paper_b = Paper("Conference Title", [], 2023, "", None, doi="10.5555/CONF.1")
+        stored_a = self.retriever.store.add(self._write("a.pdf", PDF_BYTES), paper_a)
+        stored_b = self.retriever.store.add(self._write("b.pdf", PDF_BYTES), paper_b)
+
+        self.assertEqual(stored_a, stored_b)
+        self.assertEqual(len(os.listdir(self.retriever.store.objects_dir)), 1)
+        self.assertEqual(self.retriever.store.lookup(Paper("conference title", [], 2023, "", None)), stored_a)
+        self.assertEqual(self.retriever.store.lookup(Paper("Other", [], 2023, "", None, doi="10.5555/conf.1")), stored_a)
+        self.assertEqual(self.retriever.download_paper(paper_b), stored_a)
+
+    def test_similar_titles_do_not_share_a_pdf(self):
+        store = self.retriever.store
+        stored = store.add(self._write("a.pdf", PDF_BYTES), Paper("Self-Refine", ["Aman Madaan"], 2023, "", None))
+        self.assertEqual(store.lookup(Paper("self refine", ["A. Madaan"], 2023, "", None)), stored)
+        self.assertIsNone(store.lookup(Paper("Self Refine?", ["Jane Doe"], 2023, "", None)))
+        self.assertIsNone(store.lookup(Paper("Self-Refine", ["Aman Madaan"], 2024, "", None)))
+        # Papers with their own identifier are never matched by title
+        self.assertIsNone(store.lookup(Paper("Self-Refine", ["Aman Madaan"], 2023, "", None, doi="10.5555/other")))
+        self.assertIsNone(store.lookup(Paper("Untitled", [], None, "", None)))
+
+        arxiv = store.add(self._write("b.pdf", PDF_BYTES + b" "), Paper("X", [], 2023, "", "https://arxiv.org/abs/2303.17651v2"))
+        self.assertEqual(store.lookup(Paper("Y", [], 2024, "", None, doi="10.48550/arXiv.2303.17651")), arxiv)
+
+    def test_resumes_partial_download_with_range(self):
+        save_path = os.path.join(self.test_dir, "paper.pdf")
+        self._write("paper.pdf.download", PDF_BYTES[:50])
+        self._write("paper.pdf.download.json", json.dumps({"url": "https://example.org/p.pdf", "etag": "\"v1\"",
+                                                            "length": str(len(PDF_BYTES))}).encode())
+
+        with mock.patch("literature_autopilot.pdf_retriever.requests.get",
+                        return_value=FakeResponse(206, PDF_BYTES[50:], {"Content-Range": f"bytes 50-{len(PDF_BYTES) - 1}/{len(PDF_BYTES)}"})) as fake_get:
+            self.assertTrue(self.retriever._download_from_url("https://example.org/p.pdf", save_path))
+
+        self.assertEqual(fake_get.call_args.kwargs["headers"], {"Range": "bytes=50-", "If-Range": "\"v1\""})
+        with open(save_path, "rb") as f:
+            self.assertEqual(f.read(), PDF_BYTES)
+        self.assertFalse(os.path.exists(save_path + ".download"))
+        self.assertFalse(os.path.exists(save_path + ".download.json"))
+
+    def test_partial_from_another_url_is_not_resumed(self):
+        save_path = os.path.join(self.test_dir, "paper.pdf")
+        other_pdf = b"%PDF-1.7\n" + b"1" * 300 + b"\n%%EOF\n"
+        self._write("paper.pdf.download", other_pdf[:50])
+        self._write("paper.pdf.download.json", json.dumps({"url": "https://arxiv.org/pdf/1234.5678"}).encode())
+
+        with mock.patch("literature_autopilot.pdf_retriever.requests.get",
+                        return_value=FakeResponse(200, PDF_BYTES)) as fake_get:
+            self.assertTrue(self.retriever._download_from_url("https://example.org/p.pdf", save_path))
+
+        self.assertEqual(fake_get.call_args.kwargs["headers"], {})
+        with open(save_path, "rb") as f:
+            self.assertEqual(f.read(), PDF_BYTES)
+
+    def test_responses_closed_on_failure_and_restart(self):
+        save_path = os.path.join(self.test_dir, "paper.pdf")
+        self._write("paper.pdf.download", PDF_BYTES[:50])
+        self._write("paper.pdf.download.json", json.dumps({"url": "https://example.org/p.pdf",
+                                                            "length": str(len(PDF_BYTES))}).encode())
+        # The server copy changed size, so the resumed response is dropped and the download restarts
+        responses = [FakeResponse(206, b"x", {"Content-Range": "bytes 50-999/1000"}), FakeResponse(403, b"")]
+        with mock.patch("literature_autopilot.pdf_retriever.requests.get", side_effect=list(responses)):
+            self.assertFalse(self.retriever._download_from_url("https://example.org/p.pdf", save_path))
+        self.assertTrue(all(r.closed for r in responses))
+
+    def test_race_losers_stop_and_do_not_publish(self):
+        paper = Paper("Raced Paper", [], 2023, "", "https://example.org/raced.pdf")
+        slow = SlowResponse(PDF_BYTES)
+
+        arxiv_started = threading.Event()
+
+        def fake_get(url, **kwargs):
+            if "arxiv.org" in url:
+                arxiv_started.set()
+                return slow
+            # The direct URL wins, but only once the arXiv download is under way
+            arxiv_started.wait(5)
+            return FakeResponse(200, PDF_BYTES)
+
+        with mock.patch.object(self.retriever.arxiv_resolver, "resolve", return_value={paper.title: "2303.17651"}), \
+             mock.patch("literature_autopilot.pdf_retriever.requests.get", side_effect=fake_get):
+            stored = self.retriever.download_paper(paper, race=True)
+            # The arXiv loser is mid-stream; let it continue so it reaches the cancel check
+            slow.release.set()
+            self.assertTrue(slow.closed.wait(5))
+
+        self.assertTrue(PDFRetriever.is_valid_pdf(stored))
+        self.assertLess(slow.chunks_sent, len(PDF_BYTES) // 16)
+        for _ in range(50):
+            if not os.listdir(self.retriever.incoming_dir):
+                break
+            threading.Event().wait(0.05)
+        self.assertEqual(os.listdir(self.retriever.incoming_dir), [])
+
+class TestArxivResolver(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_arxiv_resolver_output"
+        os.makedirs(self.test_dir, exist_ok=True)
+        self.cache_path = os.path.join(self.test_dir, "arxiv_index.json")
+        self.papers = [Paper("Self-Refine: Iterative Refinement with Self-Feedback", [], 2023, "", None),
+                       Paper("A Paper That Is Not On ArXiv At All", [], 2023, "", None)]
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _resolver(self, **kwargs):
+        return ArxivResolver(self.cache_path, HostLimiter(intervals={"arxiv.org": 0}), **kwargs)
+
+    def test_failed_search_is_not_cached(self):
+        resolver = self._resolver()
+        with mock.patch.object(resolver.client, "results", side_effect=ConnectionError("503")):
+            self.assertEqual(resolver.resolve(self.papers), {p.title: None for p in self.papers})
+        with open(self.cache_path) as f:
+            cache = json.load(f)
+        self.assertEqual((cache["titles"], cache["misses"]), ({}, {}))
+
+        hit = mock.Mock(title=self.papers[0].title, pdf_url="https://arxiv.org/pdf/2303.17651v2")
+        hit.get_short_id.return_value = "2303.17651v2"
+        resolver = self._resolver()
+        with mock.patch.object(resolver.client, "results", return_value=[hit]) as results:
+            ids = resolver.resolve(self.papers)
+        self.assertEqual(ids[self.papers[0].title], "2303.17651")
+        self.assertIsNone(ids[self.papers[1].title])
+        self.assertEqual(results.call_count, 1)  # The title search already confirms the PDF URL
+
+    def test_misses_expire(self):
+        with mock.patch.object(ArxivResolver, "_lookup_ids"):
+            resolver = self._resolver()
+            with mock.patch.object(resolver.client, "results", return_value=[]) as results:
+                resolver.resolve(self.papers[1:])
+                resolver.resolve(self.papers[1:])
+            self.assertEqual(results.call_count, 1)
+
+            # A fresh resolver reads the cached miss; once it is older than the TTL it is searched again
+            resolver = self._resolver(miss_ttl=0)
+            with mock.patch.object(resolver.client, "results", return_value=[]) as results:
+                resolver.resolve(self.papers[1:])
+            self.assertEqual(results.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
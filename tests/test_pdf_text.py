@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+from types import SimpleNamespace
+from unittest import mock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot.pdf_text import PDFTextExtractor
+from literature_autopilot.extractor import SLRExtractor
+
+PAPER = ("Title of Paper\nAlice Smith\nAbstract\nWe propose X.\n1 Introduction\nIntro text.\nModel\n"
+         "2 Model\nWe use a model.\n3 Results\nTable 1: Accuracy on GSM8K\nMethod 80\nBaseline 70\n"
+         "4 Conclusion\nDone.\nReferences\n[1] Ref.")
+
+class TestPDFTextExtractor(unittest.TestCase):
+    def test_clean_text(self):
+        self.assertEqual(PDFTextExtractor.clean_text("improve-\nment of\x0c12\nthe   model"), "improvement of\nthe model")
+
+    def test_split_sections(self):
+        sections = PDFTextExtractor.split_sections(PAPER)
+        self.assertEqual(sections["Abstract"], "We propose X.")
+        # A bare "Model" line is a label, only "2 Model" starts the Methods section
+        self.assertEqual(sections["Introduction"], "Intro text.\nModel")
+        self.assertEqual(sections["Methods"], "We use a model.")
+        self.assertEqual(sections["Tables"], "Table 1: Accuracy on GSM8K\nMethod 80\nBaseline 70")
+        self.assertEqual(sections["References"], "[1] Ref.")
+
+    def test_build_context_splits_budget(self):
+        context = PDFTextExtractor.build_context({"Abstract": "a" * 100, "Methods": "m" * 10}, ["Abstract", "Methods", "Results"], max_chars=100)
+        self.assertEqual(context, "## Abstract\n" + "a" * 50 + "\n[...truncated...]\n\n## Methods\n" + "m" * 10)
+
+    def test_stage_contexts(self):
+        with mock.patch.object(PDFTextExtractor, "extract_text", return_value=PAPER):
+            contexts = PDFTextExtractor.stage_contexts("paper.pdf", min_chars=10)
+        self.assertIn("## Introduction", contexts["prescreen"])
+        self.assertNotIn("## Methods", contexts["prescreen"])
+        self.assertIn("## Tables", contexts["extraction"])
+        self.assertNotIn("[1] Ref.", contexts["extraction"])
+        with mock.patch.object(PDFTextExtractor, "extract_text", return_value="scanned"):
+            self.assertRaises(ValueError, PDFTextExtractor.stage_contexts, "paper.pdf")
+
+class TestLocalPdfMode(unittest.TestCase):
+    def setUp(self):
+        self.extractor = SLRExtractor(pdf_mode="local")
+        self.extractor.model = mock.MagicMock()
+        self.extractor.model.generate_content.return_value = SimpleNamespace(text='{"screening_decision": "EXCLUDE", "reason": "off topic"}')
+
+    def test_sends_sections_instead_of_uploading(self):
+        with mock.patch.object(PDFTextExtractor, "stage_contexts", return_value={"prescreen": "P", "extraction": "E", "amstar": "A"}), \
+             mock.patch.object(SLRExtractor, "_upload_pdf") as upload:
+            result = self.extractor.process_paper("paper.pdf")
+        self.assertEqual(result["screening_decision"], "EXCLUDE")
+        upload.assert_not_called()
+        self.assertEqual(self.extractor.model.generate_content.call_args[0][0][1], "PAPER TEXT (extracted sections):\nP")
+
+    def test_falls_back_to_upload(self):
+        uploaded = object()
+        with mock.patch.object(PDFTextExtractor, "stage_contexts", side_effect=ValueError("Only 7 characters of text extracted")), \
+             mock.patch.object(SLRExtractor, "_upload_pdf", return_value=uploaded) as upload:
+            self.extractor.process_paper("paper.pdf")
+        upload.assert_called_once_with("paper.pdf")
+        self.assertIs(self.extractor.model.generate_content.call_args[0][0][1], uploaded)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -69,6 +69,8 @@ class TestPipelineIntegration(unittest.TestCase):
             os.remove("slr_extracted_data.json")
         if os.path.exists("final_paper.md"):
             os.remove("final_paper.md")
+        if os.path.exists("slr_evidence_table.csv"):
+            os.remove("slr_evidence_table.csv")
         if os.path.exists("slr_pipeline.log"):
             # Clean up log file if created
             pass
@@ -0,0 +1,110 @@
+import unittest
+import os
+import sys
+import json
+from unittest import mock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot import prisma_checker
+from literature_autopilot.prisma_checker import PrismaChecker
+
+CHECKLIST = {
+    "Title": {"item": 1, "required": True},
+    "Eligibility Criteria": {"item": 5, "required": True},
+    "Information Sources": {"item": 6, "required": True},
+    "Limitations": {"item": 17, "required": True},
+    "Funding": {"item": 21, "required": True},
+}
+
+PAPER = """# A Systematic Review
+
+# 2. Methodology
+
+## 2.1 Eligibility Criteria
+
+Studies were included if they evaluated LLMs. We searched arXiv and Semantic Scholar.
+
+# 4. Discussion
+
+Our work has some limitations.
+"""
+
+class FakeModel:
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        class Response:
+            text = json.dumps({"verdicts": {"0": True}})
+        return Response()
+
+class TestPrismaChecker(unittest.TestCase):
+    def test_resolves_clear_items_locally(self):
+        found = PrismaChecker.scan_section(PAPER.split("# 4.")[0])
+        self.assertEqual(found["Eligibility Criteria"]["status"], "present")
+        self.assertEqual(found["Information Sources"]["status"], "present")
+        self.assertNotIn("Funding", found)
+
+    def test_only_ambiguous_items_reach_the_llm_once(self):
+        model = FakeModel()
+        checker = PrismaChecker(CHECKLIST, model=model, cache_path=None)
+        result = checker.check(PAPER)
+        self.assertEqual(result["missing_items"], ["Funding"])
+        self.assertEqual(result["checklist"]["Limitations"]["location"], "4. Discussion")
+        self.assertEqual(len(model.prompts), 1)
+        self.assertIn("Our work has some limitations.", model.prompts[0])
+        self.assertNotIn("Semantic Scholar", model.prompts[0])
+
+        # Unchanged sections are answered from the cache
+        self.assertEqual(checker.check(PAPER)["llm_checked"], 0)
+        self.assertEqual(len(model.prompts), 1)
+
+    def test_incidental_mentions_do_not_settle_items(self):
+        section = """# 3. Analysis
+
+## 3.1 Claims and Evidence
+
+Self-Refine (Madaan et al., 2023, arXiv:2303.17651) improves accuracy by 8 percentage points.
+
+![PRISMA 2020 Flow Diagram](images/prisma_flow_diagram.png)
+
+| Mechanism | Relative Improvement [95% CI] |
+| :--- | ---: |
+| Debate | +12.0% pooled over 5 studies |
+"""
+        found = PrismaChecker.scan_section(section)
+        for item in ("Objectives", "Information Sources", "Study Selection Process", "Effect Measures", "Synthesis Methods"):
+            self.assertNotEqual(found.get(item, {}).get("status"), "present", item)
+        self.assertEqual(found["Information Sources"]["status"], "candidate")
+
+    def test_reporting_phrases_settle_items(self):
+        found = PrismaChecker.scan_section(
+            "We searched arXiv, Scopus and the ACM Digital Library in May 2025. Two reviewers screened titles and abstracts. "
+            "The effect measure was the log response ratio. Effects were pooled using a random-effects model.", parent="2. Methodology")
+        for item in ("Information Sources", "Study Selection Process", "Effect Measures", "Synthesis Methods"):
+            self.assertEqual(found[item]["status"], "present", item)
+
+    def test_search_phrases_outside_methods_go_to_the_llm(self):
+        section = "## 4.2 Future Work\n\nBoolean search strings over arXiv rarely capture agent papers; we searched Scopus too."
+        found = PrismaChecker.scan_section(section, parent="4. Discussion")
+        self.assertEqual(found["Search Strategy"]["status"], "candidate")
+        self.assertEqual(found["Information Sources"]["status"], "candidate")
+        self.assertIn("Boolean search strings", found["Search Strategy"]["excerpts"][0])
+        found = PrismaChecker.scan_section(section, parent="2. Methodology")
+        self.assertEqual(found["Search Strategy"]["status"], "present")
+        self.assertEqual(PrismaChecker.scan_section("We use boolean flags in the tool API.", parent="2. Methodology")["Search Strategy"]["status"], "candidate")
+
+    def test_cache_keeps_recent_sections_only(self):
+        checker = PrismaChecker(CHECKLIST, cache_path=None)
+        with mock.patch.object(prisma_checker, "MAX_CACHED_SECTIONS", 3):
+            checker.check(PAPER)
+            self.assertEqual(len(checker.cache), 3)
+            sections = list(checker.cache)
+            checker.check("# Appendix\n\nFull search strings.\n")
+            self.assertEqual(list(checker.cache)[:2], sections[1:])
+
+if __name__ == '__main__':
+    unittest.main()
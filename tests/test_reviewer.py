@@ -0,0 +1,69 @@
+import unittest
+import json
+import os
+import sys
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot.reviewer import MultiAgentReviewer
+
+CRITICS = {
+    "notoriously pedantic": "HAWK",
+    "senior editor": "ARCHITECT",
+    "ruthless copyeditor": "STYLE",
+    'You are the "FactChecker"': "FACTS",
+}
+DRAFT = "Self-refinement improved accuracy in all reviewed studies (Madaan et al., 2023)."
+
+class TestConcurrentCritics(unittest.TestCase):
+    def setUp(self):
+        self.reviewer = MultiAgentReviewer(context_token_budget=None)
+        self.reviewer.model = mock.MagicMock()
+        self.moderator_prompts = []
+        self.failing = set()
+
+    def respond(self, barrier=None):
+        def generate_content(prompt):
+            for marker, name in CRITICS.items():
+                if marker in prompt:
+                    if barrier:
+                        barrier.wait()  # Only passes if all critics are in flight at once
+                    if name in self.failing:
+                        raise RuntimeError("500 internal error")
+                    return SimpleNamespace(text=f"{name} CRITIQUE")
+            self.moderator_prompts.append(prompt)
+            return SimpleNamespace(text=json.dumps({"convergence_status": "CONVERGENCE REACHED"}))
+        return generate_content
+
+    def test_critics_run_concurrently(self):
+        self.reviewer.model.generate_content.side_effect = self.respond(threading.Barrier(4, timeout=5))
+        result = self.reviewer.review_section("Analysis", DRAFT, source_data=[{"Title": "Self-Refine", "Year": 2023}])
+        self.assertEqual(result, DRAFT)
+        self.assertEqual(self.reviewer.model.generate_content.call_count, 5)
+        # Each critique reaches the moderator under its own heading
+        moderator = self.moderator_prompts[0]
+        for name, label in [("HAWK", "Methodological Hawk"), ("ARCHITECT", "Narrative Architect"),
+                            ("STYLE", "StyleCritic"), ("FACTS", "FactChecker (CRITICAL)")]:
+            self.assertIn(f"**Critique from {label}**: {name} CRITIQUE", moderator)
+
+    def test_fact_checker_skipped_without_source_data(self):
+        self.reviewer.model.generate_content.side_effect = self.respond(threading.Barrier(3, timeout=5))
+        self.reviewer.review_section("Analysis", DRAFT)
+        self.assertEqual(self.reviewer.model.generate_content.call_count, 4)
+        self.assertIn("NO FACTUAL ISSUES (No source data provided)", self.moderator_prompts[0])
+
+    def test_failing_critic_does_not_stop_the_others(self):
+        self.failing = {"ARCHITECT"}
+        self.reviewer.model.generate_content.side_effect = self.respond()
+        self.assertEqual(self.reviewer.review_section("Analysis", DRAFT, source_data=[{"Title": "Self-Refine"}]), DRAFT)
+        moderator = self.moderator_prompts[0]
+        self.assertIn("**Critique from Narrative Architect**: Error generating response.", moderator)
+        self.assertIn("**Critique from Methodological Hawk**: HAWK CRITIQUE", moderator)
+        self.assertIn("FACTS CRITIQUE", moderator)
+
+if __name__ == '__main__':
+    unittest.main()
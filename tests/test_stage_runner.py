@@ -0,0 +1,81 @@
+import unittest
+import os
+import shutil
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot.stage_runner import StageRunner, Stage
+
+class TestStageRunner(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_stage_runner_output"
+        os.makedirs(self.test_dir, exist_ok=True)
+        self.state_path = os.path.join(self.test_dir, "state.json")
+        self.prompt_path = os.path.join(self.test_dir, "prompt.md")
+        self.output_path = os.path.join(self.test_dir, "output.txt")
+        self.downstream_path = os.path.join(self.test_dir, "downstream.txt")
+        with open(self.prompt_path, "w") as f:
+            f.write("Prompt v1")
+        self.config = {"extraction": {"model": "model-a"}}
+        self.runs = []
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _build_runner(self):
+        def run_upstream():
+            self.runs.append("upstream")
+            with open(self.output_path, "w") as f:
+                f.write("result")
+
+        def run_downstream():
+            self.runs.append("downstream")
+            with open(self.downstream_path, "w") as f:
+                f.write("derived")
+
+        runner = StageRunner(self.config, state_path=self.state_path)
+        runner.add_stage(Stage("upstream", run_upstream, config_keys=["extraction.model"],
+                               input_files=[self.prompt_path], outputs=[self.output_path]))
+        runner.add_stage(Stage("downstream", run_downstream, input_files=[self.output_path],
+                               outputs=[self.downstream_path]))
+        return runner
+
+    def test_skips_when_inputs_unchanged(self):
+        self._build_runner().run()
+        self._build_runner().run()
+        self.assertEqual(self.runs, ["upstream", "downstream"])
+
+    def test_reruns_on_prompt_change(self):
+        self._build_runner().run()
+        with open(self.prompt_path, "w") as f:
+            f.write("Prompt v2")
+        self._build_runner().run()
+        # Upstream reruns but writes identical bytes, so downstream stays fresh
+        self.assertEqual(self.runs, ["upstream", "downstream", "upstream"])
+
+    def test_reruns_on_config_change(self):
+        self._build_runner().run()
+        self.config["extraction"]["model"] = "model-b"
+        self._build_runner().run()
+        self.assertEqual(self.runs.count("upstream"), 2)
+
+    def test_reruns_on_missing_output_and_force(self):
+        self._build_runner().run()
+        os.remove(self.downstream_path)
+        self._build_runner().run()
+        self._build_runner().run(force=["upstream"])
+        self.assertEqual(self.runs, ["upstream", "downstream", "downstream", "upstream"])
+
+    def test_disabled_stage_without_outputs_still_loads(self):
+        loads = []
+        runner = self._build_runner()
+        runner.add_stage(Stage("download", lambda: self.runs.append("download"), load=lambda: loads.append("download")))
+        runner.run(enabled=["upstream"])
+        self.assertEqual(self.runs, ["upstream"])
+        self.assertEqual(loads, ["download"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot.style_linter import StyleLinter
+
+class TestStyleLinter(unittest.TestCase):
+    def setUp(self):
+        self.linter = StyleLinter()
+
+    def rules(self, text, section_name=None):
+        return [v.rule for v in self.linter.lint(text, section_name)]
+
+    def test_detects_rule_violations_with_offsets(self):
+        text = "We delve into this, as Smith et al (2023) showed in Abb. 2. We reviewed N studies with **bold** claims."
+        violations = self.linter.lint(text)
+        self.assertEqual([v.rule for v in violations],
+                         ["banned_word", "et_al_dot", "figure_label", "placeholder", "bold_text"])
+        self.assertEqual(text[violations[0].start:violations[0].end], "delve")
+
+    def test_sentence_length_ignores_abbreviations(self):
+        short = "Prior work (e.g. Smith et al., 2023) improved accuracy by 3.5% on GSM8K."
+        self.assertEqual(self.rules(short), [])
+        self.assertEqual(self.rules(" ".join(["word"] * 26) + "."), ["long_sentence"])
+
+    def test_bullets_only_flagged_in_prose_sections(self):
+        text = "# Methodology\n\n- Search in arXiv\n\n# Discussion\n\n- A bullet point\n"
+        violations = self.linter.lint(text)
+        self.assertEqual([v.rule for v in violations], ["bullet_in_body"])
+        self.assertGreater(violations[0].start, text.index("# Discussion"))
+
+    def test_autofix_leaves_tables_alone(self):
+        text = "Results — see Abb. 1 (Lee et al, 2024).\n\n| A | B |\n|---|---|"
+        self.assertEqual(StyleLinter.autofix(text), "Results, see Figure 1 (Lee et al., 2024).\n\n| A | B |\n|---|---|")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import json
+import os
+import sys
+import time
+import tempfile
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot import upload_registry
+from literature_autopilot.upload_registry import GeminiUploadRegistry
+
+def fake_upload(path, display_name=None):
+    time.sleep(0.01)
+    return SimpleNamespace(name=f"files/{display_name[:12]}", state=SimpleNamespace(name="ACTIVE"), expiration_time=None)
+
+class TestGeminiUploadRegistry(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "uploads.json")
+        self.pdfs = []
+        for i in range(24):
+            pdf = os.path.join(self.test_dir, f"{i}.pdf")
+            with open(pdf, "wb") as f:
+                f.write(b"%%PDF-1.4 paper %d %%%%EOF" % i)
+            self.pdfs.append(pdf)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_concurrent_uploads_are_all_recorded(self):
+        real_dump = json.dump
+
+        def slow_dump(obj, f, **kwargs):
+            # Iterating slowly widens the window in which another thread could mutate the dict
+            for _ in obj:
+                time.sleep(0.001)
+            real_dump(obj, f, **kwargs)
+
+        registry = GeminiUploadRegistry(self.path, max_workers=8)
+        with mock.patch.object(upload_registry.genai, "upload_file", side_effect=fake_upload) as upload, \
+             mock.patch.object(upload_registry.genai, "list_files", return_value=[]), \
+             mock.patch.object(upload_registry.json, "dump", side_effect=slow_dump):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                cleanup = [pool.submit(registry.cleanup_orphans) for _ in range(4)]
+                files = registry.prefetch(self.pdfs)
+                for future in cleanup:
+                    future.result()
+
+        self.assertEqual(len(files), len(self.pdfs))
+        self.assertEqual(upload.call_count, len(self.pdfs))
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)), len(self.pdfs))
+
+    def test_live_upload_is_reused(self):
+        registry = GeminiUploadRegistry(self.path)
+        active = SimpleNamespace(name="files/x", state=SimpleNamespace(name="ACTIVE"))
+        with mock.patch.object(upload_registry.genai, "upload_file", side_effect=fake_upload) as upload, \
+             mock.patch.object(upload_registry.genai, "get_file", return_value=active):
+            registry.get(self.pdfs[0])
+            self.assertIs(GeminiUploadRegistry(self.path).get(self.pdfs[0]), active)
+        self.assertEqual(upload.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
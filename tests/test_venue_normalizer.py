@@ -0,0 +1,53 @@
+import unittest
+import os
+import shutil
+import sys
+from unittest import mock
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from literature_autopilot.venue_normalizer import VenueNormalizer
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+class TestVenueNormalizer(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_venue_normalizer_output"
+        os.makedirs(self.test_dir, exist_ok=True)
+        self.cache_path = os.path.join(self.test_dir, "venues.json")
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def fake_request(self, method, url, **kwargs):
+        if url.endswith("/paper/batch"):
+            return FakeResponse(200, [{"venue": "NeurIPS", "year": 2023, "publicationVenue": None}, None])
+        return FakeResponse(200, {"data": [{"venue": "arXiv", "year": 2024}]})
+
+    def test_batch_resolution_is_cached(self):
+        titles = ["Self-Refine", "Unknown Id Paper", "Preprint Only"]
+        ids = {"Self-Refine": "2303.17651", "Unknown Id Paper": "2401.00001"}
+        with mock.patch("literature_autopilot.venue_normalizer.requests.request", side_effect=self.fake_request) as fake:
+            resolved = VenueNormalizer(self.cache_path).resolve(titles, ids)
+        # One batch call for both IDs, one title match for the paper without an ID
+        self.assertEqual(fake.call_count, 2)
+        self.assertEqual(resolved["Self-Refine"]["venue"], "NeurIPS")
+        self.assertIsNone(resolved["Unknown Id Paper"]["venue"])
+        self.assertIsNone(resolved["Preprint Only"]["venue"])
+
+        with mock.patch("literature_autopilot.venue_normalizer.requests.request") as fake:
+            venues = VenueNormalizer(self.cache_path)
+            self.assertEqual(venues.venue_with_year("self-refine"), "NeurIPS 2023")
+            self.assertIsNone(venues.lookup("Preprint Only"))
+        fake.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()